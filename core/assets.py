@@ -0,0 +1,253 @@
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pygame
+from core import memory, settings
+
+
+def decode_image(path, alpha=True, scale_by=None, scale=None, size=None, height=None):
+    """Carga el PNG desde disco y aplica la transformación pedida (ver AssetCache.image)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"[AssetCache] Imagen no encontrada: {path}")
+
+    img = pygame.image.load(path)
+    img = img.convert_alpha() if alpha else img.convert()
+
+    if scale_by is not None:
+        img = pygame.transform.scale_by(img, scale_by)
+    if scale is not None:
+        img = pygame.transform.scale(img, (int(img.get_width() * scale), int(img.get_height() * scale)))
+    if height is not None:
+        factor = height / img.get_height()
+        img = pygame.transform.scale(img, (int(img.get_width() * factor), height))
+    if size is not None:
+        img = pygame.transform.scale(img, size)
+    return img
+
+
+def blob_id(key):
+    """Nombre estable de una clave de la cache (el mismo en todas las plataformas)"""
+    path, alpha, scale_by, scale, size, height = key
+    # 3 y 3.0 son la misma escala (el JSON y el bundle compilado pueden traer una u otra)
+    scale_by = float(scale_by) if scale_by is not None else None
+    scale = float(scale) if scale is not None else None
+    text = json.dumps([path.replace(os.sep, "/"), alpha, scale_by, scale, list(size) if size else None, height])
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# Imágenes horneadas por python -m core.bake: píxeles crudos ya escalados, en el formato
+# del display, que se mapean a memoria en vez de decodificar el PNG
+class BakedImages:
+    FORMAT = "BGRA"  # orden de bytes de una superficie convert_alpha() de 32 bits
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._manifest = None
+        self._alpha_ok = None  # el display usa el mismo formato que los blobs
+        self._lock = threading.Lock()
+
+        # Contadores
+        self.hits = 0
+        self.stale = 0
+
+    def manifest(self):
+        with self._lock:
+            if self._manifest is None:
+                path = os.path.join(self.folder, "manifest.json")
+                self._manifest = {}
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        self._manifest = json.load(f).get("images", {})
+            return self._manifest
+
+    def reload(self):
+        """Vuelve a leer el manifiesto (después de hornear de nuevo)"""
+        with self._lock:
+            self._manifest = None
+
+    def _same_format(self):
+        """Los blobs con alpha se usan tal cual solo si convert_alpha() daría el mismo formato"""
+        if self._alpha_ok is None:
+            probe = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+            blob = pygame.image.frombuffer(bytearray(4), (1, 1), self.FORMAT)
+            self._alpha_ok = probe.get_bitsize() == 32 and probe.get_masks() == blob.get_masks()
+        return self._alpha_ok
+
+    def load(self, key):
+        """Superficie horneada para la clave, o None si no hay blob o el PNG es más nuevo"""
+        entry = self.manifest().get(blob_id(key))
+        if entry is None:
+            return None
+        blob_path = os.path.join(self.folder, entry["file"])
+        try:
+            source = os.stat(key[0])
+            blob = os.stat(blob_path)
+        except OSError:
+            return None
+        if source.st_mtime_ns > blob.st_mtime_ns or source.st_size != entry["source_bytes"]:
+            self.stale += 1
+            return None
+
+        alpha = key[1]
+        if alpha and not self._same_format():
+            return None
+        w, h = entry["size"]
+        if blob.st_size != w * h * 4:
+            return None
+
+        # ACCESS_COPY: las páginas se leen del archivo a demanda y si alguien dibuja
+        # sobre la superficie se copian en privado (el blob en disco no cambia)
+        with open(blob_path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        img = pygame.image.frombuffer(buffer, (w, h), self.FORMAT)
+        if not alpha:
+            img = img.convert()  # sin alpha no hay formato de frombuffer igual al del display
+        self.hits += 1
+        return img
+
+    def stats(self):
+        return {"hits": self.hits, "stale": self.stale, "images": len(self._manifest or {})}
+
+
+# Cache compartida de imágenes para todo el juego
+class AssetCache:
+    def __init__(self, budget_bytes):
+        """
+        budget_bytes = memoria máxima (aprox.) que pueden ocupar las superficies cacheadas.
+        Cuando se supera, se descartan las imágenes usadas hace más tiempo (LRU).
+        """
+        self.budget_bytes = budget_bytes
+        self.baked = None              # BakedImages con los píxeles ya escalados (o None)
+        self._entries = OrderedDict()  # clave -> (superficie, bytes)
+        self._lock = threading.Lock()  # la cache se usa también desde hilos de precarga
+
+        # Contadores
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(path, alpha=True, scale_by=None, scale=None, size=None, height=None):
+        """
+        Clave de la cache: ruta + transformación + modo de conversión.
+        scale 1.0 equivale a no escalar, así comparten entrada.
+        """
+        if scale == 1.0:
+            scale = None
+        if scale_by == 1.0:
+            scale_by = None
+        size = tuple(size) if size else None
+        return (os.path.normpath(path), bool(alpha), scale_by, scale, size, height)
+
+    def image(self, path, alpha=True, scale_by=None, scale=None, size=None, height=None):
+        """
+        Devuelve la imagen ya convertida y transformada.
+        alpha    → convert_alpha() (True) o convert() (False)
+        scale_by → pygame.transform.scale_by(img, scale_by)
+        scale    → escala a (int(w*scale), int(h*scale)) con transform.scale
+        size     → tamaño final exacto (w, h)
+        height   → alto final fijo manteniendo la proporción
+        """
+        key = self.make_key(path, alpha, scale_by, scale, size, height)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)  # marcar como usada recientemente
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # La decodificación se hace fuera del lock para no frenar a otros hilos
+        surface = self._build(*key)
+        with self._lock:
+            self._store(key, surface)
+        return surface
+
+    def build(self, path, alpha=True, scale_by=None, scale=None, size=None, height=None):
+        """
+        Carga y transforma una imagen igual que image() pero sin guardarla en la cache
+        (para quien se queda con su propia copia, como los atlas de core/atlas.py).
+        """
+        return self._build(*self.make_key(path, alpha, scale_by, scale, size, height))
+
+    def _build(self, path, alpha, scale_by, scale, size, height):
+        """Usa la versión horneada (python -m core.bake) si está al día; si no, decodifica el PNG"""
+        if self.baked is not None:
+            img = self.baked.load((path, alpha, scale_by, scale, size, height))
+            if img is not None:
+                return img
+        return decode_image(path, alpha, scale_by, scale, size, height)
+
+    def _store(self, key, surface):
+        """Guarda la superficie y libera las menos usadas si se pasa del presupuesto"""
+        nbytes = surface.get_bytesize() * surface.get_width() * surface.get_height()
+        old = self._entries.pop(key, None)  # otro hilo pudo haberla cargado a la vez
+        if old is not None:
+            self.bytes -= old[1]
+        self._entries[key] = (surface, nbytes)
+        self.bytes += nbytes
+        memory.track(surface, "cache", key[0])
+
+        # Nunca se descarta la entrada recién agregada
+        while self.bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, old_bytes) = self._entries.popitem(last=False)
+            self.bytes -= old_bytes
+            self.evictions += 1
+
+    def release_unused(self, nbytes):
+        """
+        Suelta las imágenes usadas hace más tiempo que solo tiene la cache (nadie más las
+        referencia, así que se liberan de verdad) hasta juntar `nbytes`. Devuelve los bytes soltados.
+        """
+        freed = 0
+        with self._lock:
+            for key in list(self._entries):
+                if freed >= nbytes:
+                    break
+                surface, size = self._entries[key]
+                # Referencias: la tupla de la entrada, la variable local y el argumento de getrefcount
+                if sys.getrefcount(surface) > 3:
+                    continue
+                del self._entries[key]
+                self.bytes -= size
+                self.evictions += 1
+                freed += size
+        return freed
+
+    def clear(self):
+        """Vacía la cache (los contadores de hits/misses se mantienen)"""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Devuelve los contadores actuales"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "budget_bytes": self.budget_bytes,
+            "evictions": self.evictions,
+            "baked": self.baked.stats() if self.baked is not None else None,
+        }
+
+
+# Instancia única compartida por todo el juego
+cache = AssetCache(settings.ASSET_CACHE_BUDGET_MB * 1024 * 1024)
+if settings.BAKED_ASSETS:
+    cache.baked = BakedImages(settings.BAKE_DIR)
+# Si las superficies se pasan del presupuesto, lo primero que se suelta es lo que solo tiene la cache
+memory.tracker.add_releaser("cache de imágenes", cache.release_unused)
+
+
+def load_image(path, alpha=True, scale_by=None, scale=None, size=None, height=None):
+    """Atajo para cargar una imagen a través de la cache compartida"""
+    return cache.image(path, alpha, scale_by, scale, size, height)
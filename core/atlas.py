@@ -0,0 +1,281 @@
+"""
+Atlas de sprites: todos los frames de un personaje (o de un grupo de NPCs) en una sola
+hoja ya escalada. Las animaciones apuntan a subsuperficies de esa hoja por nombre e índice,
+así cada frame existe una sola vez en memoria y armar un personaje es solo buscar.
+
+La metadata de cada atlas vive en assets/atlas/<nombre>.json:
+    folder     → carpeta de los PNG de origen
+    scale_by   → escala de todo el atlas (opcional)
+    frames     → nombre -> {"file", "scale_by"/"scale"} (opcional; si un frame no está,
+                 se toma <folder>/<nombre>.png con la escala del atlas)
+    animations → animación -> lista de nombres de frame (opcional)
+
+Para agregar un personaje nuevo alcanza con escribir su JSON.
+
+Uso:
+    python -m core.atlas            # compila la hoja de cada atlas
+    python -m core.atlas lenard ... # solo esos atlas
+
+Las hojas compiladas quedan en assets/atlas/compilados/ (<nombre>.png + <nombre>.json).
+Si algún PNG de origen o la metadata cambiaron, la hoja deja de usarse hasta volver a
+compilarla y el atlas se arma en memoria a partir de los PNG sueltos.
+"""
+import json
+import os
+import sys
+import threading
+
+import pygame
+from core import memory, settings
+from core.assets import cache, load_image
+
+COMPILED_DIR = os.path.join(settings.ATLAS_DIR, "compilados")
+PADDING = 1  # píxeles libres entre frames (evita que se mezclen al escalar una subsuperficie)
+
+
+def read_meta(name, atlas_dir=None):
+    """Lee la metadata de un atlas"""
+    path = os.path.join(atlas_dir or settings.ATLAS_DIR, f"{name}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Atlas no encontrado: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def frame_specs(meta):
+    """
+    Frames únicos del atlas: nombre -> (ruta del PNG, scale_by, scale).
+    Un frame que aparece varias veces en las animaciones se carga una sola vez.
+    """
+    folder = meta.get("folder", "")
+    specs = {}
+    for name, spec in meta.get("frames", {}).items():
+        specs[name] = (os.path.join(folder, spec.get("file", f"{name}.png")),
+                       spec.get("scale_by", meta.get("scale_by")),
+                       spec.get("scale"))
+    for frames in meta.get("animations", {}).values():
+        for name in frames:
+            if name not in specs:
+                specs[name] = (os.path.join(folder, f"{name}.png"), meta.get("scale_by"), None)
+    return specs
+
+
+def _source_stamps(specs):
+    stamps = {}
+    for path, _, _ in specs.values():
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Imagen no encontrada: {path}")
+        st = os.stat(path)
+        stamps[path] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+
+def _build_frames(specs):
+    """Carga y escala cada frame por separado (igual que load_image, pero sin cachearlos)"""
+    _source_stamps(specs)  # mismo error que antes si falta un PNG
+    return {name: cache.build(path, scale_by=scale_by, scale=scale)
+            for name, (path, scale_by, scale) in specs.items()}
+
+
+def pack(images, max_width=None):
+    """
+    Acomoda los frames en estantes (filas) de izquierda a derecha, los más altos primero.
+    Devuelve (hoja, rects) con rects = nombre -> pygame.Rect dentro de la hoja.
+    """
+    max_width = max([max_width or settings.ATLAS_MAX_WIDTH] + [img.get_width() for img in images.values()])
+    order = sorted(images, key=lambda n: (-images[n].get_height(), -images[n].get_width(), n))
+
+    rects = {}
+    x = y = shelf_h = width = 0
+    for name in order:
+        w, h = images[name].get_size()
+        if x > 0 and x + w > max_width:
+            y += shelf_h + PADDING
+            x = shelf_h = 0
+        rects[name] = pygame.Rect(x, y, w, h)
+        x += w + PADDING
+        shelf_h = max(shelf_h, h)
+        width = max(width, x - PADDING)
+
+    sheet = pygame.Surface((max(1, width), max(1, y + shelf_h)), pygame.SRCALPHA)
+    for name, rect in rects.items():
+        # BLEND_RGBA_MAX sobre la hoja vacía copia los píxeles tal cual (un blit normal
+        # mezclaría el color con la transparencia en los bordes semitransparentes)
+        sheet.blit(images[name], rect, special_flags=pygame.BLEND_RGBA_MAX)
+    return sheet, rects
+
+
+def compile_atlas(name, atlas_dir=None, out_dir=None):
+    """Arma la hoja de un atlas y la guarda junto con su índice. Devuelve (cantidad de frames, tamaño)"""
+    out_dir = out_dir or COMPILED_DIR
+    meta = read_meta(name, atlas_dir)
+    specs = frame_specs(meta)
+    sheet, rects = pack(_build_frames(specs))
+
+    os.makedirs(out_dir, exist_ok=True)
+    pygame.image.save(sheet, os.path.join(out_dir, f"{name}.png"))
+    index = {
+        "meta": meta,
+        "sources": _source_stamps(specs),
+        "rects": {n: list(r) for n, r in rects.items()},
+    }
+    with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return len(rects), sheet.get_size()
+
+
+def _load_compiled(name, meta, specs, out_dir):
+    """(hoja, rects) de la hoja compilada si está al día con la metadata y los PNG; si no, None"""
+    index_path = os.path.join(out_dir, f"{name}.json")
+    sheet_path = os.path.join(out_dir, f"{name}.png")
+    if not os.path.exists(index_path) or not os.path.exists(sheet_path):
+        return None
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("meta") != meta or index.get("sources") != _source_stamps(specs):
+        return None
+    sheet = cache.build(sheet_path)  # horneada si hay (python -m core.bake)
+    return sheet, {n: pygame.Rect(r) for n, r in index["rects"].items()}
+
+
+# Hoja de frames de un personaje con sus animaciones
+class Atlas:
+    def __init__(self, name, meta, sheet=None, rects=None, images=None):
+        """
+        Se arma con una hoja + rects (modo normal) o con imágenes sueltas
+        (ATLAS_ENABLED = False: cada frame por su lado, a través de la cache de imágenes).
+        """
+        self.name = name
+        self.meta = meta
+        self.sheet = sheet
+        self.rects = rects or {}
+        self._frames = dict(images or {})  # nombre -> superficie (subsuperficies creadas a demanda)
+        self.animations = {anim: [self.frame(n) for n in frames]
+                           for anim, frames in meta.get("animations", {}).items()}
+        for surface in [sheet] if sheet is not None else self._frames.values():
+            memory.track(surface, f"personaje:{name}", name)
+
+    def frame(self, name):
+        """Frame por nombre (siempre el mismo objeto, así el renderer lo reconoce entre frames)"""
+        surface = self._frames.get(name)
+        if surface is None:
+            if name not in self.rects:
+                raise KeyError(f"[Atlas {self.name}] Frame inexistente: {name}")
+            surface = self.sheet.subsurface(self.rects[name])
+            self._frames[name] = surface
+        return surface
+
+    def animation(self, name, index=None):
+        """Lista de frames de una animación, o uno solo si se pasa el índice (da la vuelta)"""
+        frames = self.animations[name]
+        return frames if index is None else frames[int(index) % len(frames)]
+
+    def stats(self):
+        if self.sheet is not None:
+            w, h = self.sheet.get_size()
+            nbytes = self.sheet.get_bytesize() * w * h
+        else:
+            nbytes = sum(s.get_bytesize() * s.get_width() * s.get_height() for s in self._frames.values())
+        return {"frames": len(self.rects) or len(self._frames), "bytes": nbytes,
+                "sheet": self.sheet.get_size() if self.sheet is not None else None}
+
+
+_atlases = {}                # nombre -> Atlas ya cargado
+_sprite_index = None         # (ruta, escala) -> (atlas, frame), para los NPCs
+_lock = threading.RLock()    # los mapas (y sus NPCs) también se arman en el hilo de precarga
+
+
+def load_atlas(name):
+    """Atlas por nombre (se arma una sola vez y queda compartido)"""
+    with _lock:
+        atlas = _atlases.get(name)
+        if atlas is not None:
+            return atlas
+
+        meta = read_meta(name)
+        specs = frame_specs(meta)
+        if not settings.ATLAS_ENABLED:
+            images = {n: load_image(path, scale_by=scale_by, scale=scale)
+                      for n, (path, scale_by, scale) in specs.items()}
+            atlas = Atlas(name, meta, images=images)
+        else:
+            compiled = _load_compiled(name, meta, specs, COMPILED_DIR)
+            sheet, rects = compiled or pack(_build_frames(specs))
+            atlas = Atlas(name, meta, sheet, rects)
+        _atlases[name] = atlas
+        return atlas
+
+
+def _index_sprites():
+    """Recorre la metadata de todos los atlas: (ruta del PNG, escala) -> (atlas, frame)"""
+    index = {}
+    if not os.path.isdir(settings.ATLAS_DIR):
+        return index
+    for file in sorted(os.listdir(settings.ATLAS_DIR)):
+        if not file.endswith(".json"):
+            continue
+        name = os.path.splitext(file)[0]
+        for frame, (path, scale_by, scale) in frame_specs(read_meta(name)).items():
+            if scale_by in (None, 1.0):
+                index[(os.path.normpath(path), float(scale or 1.0))] = (name, frame)
+    return index
+
+
+def find_sprite(path, scale=1.0):
+    """
+    Frame de atlas que corresponde a `path` escalado por `scale` (como en los JSON de mapas),
+    o None si ningún atlas lo tiene.
+    """
+    global _sprite_index
+    with _lock:
+        if _sprite_index is None:
+            _sprite_index = _index_sprites()
+        found = _sprite_index.get((os.path.normpath(path), float(scale or 1.0)))
+        if found is None:
+            return None
+        return load_atlas(found[0]).frame(found[1])
+
+
+def sprite(path, scale=1.0):
+    """Sprite de un NPC: el frame del atlas si hay uno, si no la imagen suelta de la cache"""
+    image = find_sprite(path, scale)
+    return image if image is not None else load_image(path, scale=scale)
+
+
+def clear():
+    """Olvida los atlas cargados (se vuelven a armar al pedirlos)"""
+    global _sprite_index
+    with _lock:
+        _atlases.clear()
+        _sprite_index = None
+
+
+def stats():
+    with _lock:
+        return {name: atlas.stats() for name, atlas in _atlases.items()}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))  # convert_alpha() necesita un display
+
+    names = argv or sorted(os.path.splitext(f)[0] for f in os.listdir(settings.ATLAS_DIR) if f.endswith(".json"))
+    count = 0
+    for name in names:
+        try:
+            frames, (w, h) = compile_atlas(name)
+        except FileNotFoundError as e:
+            print(f"{name}: {e}")
+            continue
+        print(f"{name}: {frames} frames en una hoja de {w}x{h}")
+        count += 1
+
+    print(f"{count} atlas compilados en {COMPILED_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""
+Horneado de imágenes: decodifica y escala de antemano, en todos los núcleos, cada imagen
+que el juego carga con load_image (mapas, NPCs, retratos, atlas, diálogo y menú) y guarda
+los píxeles crudos en el formato del display + un manifiesto con el hash de cada PNG.
+
+En el juego la cache de imágenes mapea esos blobs a memoria (pygame.image.frombuffer)
+en vez de decodificar el PNG; si el PNG es más nuevo que su blob se usa el PNG.
+
+Uso:
+    python -m core.bake             # hornea lo que cambió desde la última vez
+    python -m core.bake --force     # hornea todo de nuevo
+    python -m core.bake --jobs 4    # cantidad de procesos (por defecto, uno por núcleo)
+
+Los blobs quedan en assets/compilados/imagenes/ (BAKE_DIR).
+"""
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+from core import settings
+from core.assets import AssetCache, BakedImages, blob_id, decode_image
+from mundos.map_compiler import MAPS_DIR
+from ui.dialogue import BOX_HEIGHT as DIALOGUE_BOX_HEIGHT
+
+
+# Mismas transformaciones que usa ui/menu.py
+MENU_IMAGES = [
+    (os.path.join("assets", "images", "Cielo_fondo.png"), False, (settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)),
+    (os.path.join("assets", "images", "Lenard.png"), True, (400, 400)),
+    (os.path.join("assets", "images", "Pika.png"), True, (300, 300)),
+]
+
+
+def collect_keys():
+    """Claves de la cache (ver AssetCache.make_key) de todas las imágenes que carga el juego"""
+    keys = []
+    key = AssetCache.make_key
+
+    # Mapas: background, props, sprites de NPCs y retratos
+    for file in sorted(glob.glob(os.path.join(MAPS_DIR, "*.json"))):
+        with open(file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("background"):
+            keys.append(key(data["background"], alpha=False))
+        for prop in data.get("props", []):
+            keys.append(key(prop["image"]))
+        for npc in data.get("npcs", []):
+            keys.append(key(npc["sprite"], scale=npc.get("scale", 1.0)))
+            portrait = npc.get("portrait")
+            if portrait:
+                keys.append(key(portrait["path"], scale=portrait.get("scale", 1.0)))
+
+    # Atlas: cada frame suelto (por si la hoja no está compilada) y la hoja compilada
+    from core import atlas
+    if os.path.isdir(settings.ATLAS_DIR):
+        for file in sorted(os.listdir(settings.ATLAS_DIR)):
+            if not file.endswith(".json"):
+                continue
+            name = file[:-5]
+            for path, scale_by, scale in atlas.frame_specs(atlas.read_meta(name)).values():
+                keys.append(key(path, scale_by=scale_by, scale=scale))
+            keys.append(key(os.path.join(atlas.COMPILED_DIR, f"{name}.png")))
+
+    # Retratos de la base de diálogos (Lenard y Pika con cada humor)
+    from ui import dialogue_db
+    if os.path.exists(settings.DIALOGUE_DB):
+        for portrait in dialogue_db.read_source().get("portraits", {}).values():
+            for path in portrait.get("moods", {}).values():
+                keys.append(key(path, scale=portrait.get("scale", 1.0)))
+
+    # Diálogo: la caja del player define el tamaño de la del NPC
+    ui = os.path.join("assets", "ui_assets")
+    box_player = os.path.join(ui, "textboxplayer.png")
+    keys.append(key(box_player, height=DIALOGUE_BOX_HEIGHT))
+    if os.path.exists(box_player):
+        w, h = pygame.image.load(box_player).get_size()
+        factor = DIALOGUE_BOX_HEIGHT / h
+        size = (int(w * factor), DIALOGUE_BOX_HEIGHT)
+        keys.append(key(os.path.join(ui, "textboxnpc.png"), size=size))
+    keys.append(key(os.path.join("assets", "images", "Elfinal.png")))
+
+    for path, alpha, size in MENU_IMAGES:
+        keys.append(key(path, alpha=alpha, size=size))
+
+    # Sin repetidos y solo las que existen
+    unique = []
+    for k in keys:
+        if k not in unique and os.path.exists(k[0]):
+            unique.append(k)
+    return unique
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _init_worker():
+    """Cada proceso necesita su propio display (sin ventana) para convert()/convert_alpha()"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+
+def bake_one(key, out_dir):
+    """Decodifica y escala una imagen, escribe su blob y devuelve (id, entrada del manifiesto)"""
+    img = decode_image(*key)
+    ident = blob_id(key)
+    file = f"{ident}.raw"
+    with open(os.path.join(out_dir, file), "wb") as f:
+        f.write(pygame.image.tobytes(img, BakedImages.FORMAT))
+    return ident, {
+        "file": file,
+        "key": [key[0].replace(os.sep, "/"), key[1], key[2], key[3], list(key[4]) if key[4] else None, key[5]],
+        "size": list(img.get_size()),
+        "source_hash": file_hash(key[0]),
+        "source_bytes": os.path.getsize(key[0]),
+    }
+
+
+def bake(out_dir=None, jobs=None, force=False):
+    """Hornea las imágenes que cambiaron. Devuelve (horneadas, sin cambios)"""
+    out_dir = out_dir or settings.BAKE_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, "manifest.json")
+    old = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            old = json.load(f).get("images", {})
+
+    images = {}
+    pending = []
+    for key in collect_keys():
+        ident = blob_id(key)
+        entry = old.get(ident)
+        # Mismo contenido que la última vez: alcanza con tocar el blob para que no quede "más viejo"
+        if entry and os.path.exists(os.path.join(out_dir, entry["file"])) and entry["source_hash"] == file_hash(key[0]):
+            os.utime(os.path.join(out_dir, entry["file"]))
+            entry["source_bytes"] = os.path.getsize(key[0])
+            images[ident] = entry
+        else:
+            pending.append(key)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+            for ident, entry in pool.map(bake_one, pending, [out_dir] * len(pending)):
+                images[ident] = entry
+
+    # Blobs que ya no usa nadie
+    keep = {entry["file"] for entry in images.values()}
+    for file in os.listdir(out_dir):
+        if file.endswith(".raw") and file not in keep:
+            os.remove(os.path.join(out_dir, file))
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"format": BakedImages.FORMAT, "images": images}, f, ensure_ascii=False, indent=1)
+    return len(pending), len(images) - len(pending)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    jobs = None
+    if "--jobs" in argv:
+        jobs = int(argv[argv.index("--jobs") + 1])
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+
+    start = time.perf_counter()
+    baked, unchanged = bake(jobs=jobs, force="--force" in argv)
+    print(f"{baked} imágenes horneadas, {unchanged} sin cambios ({time.perf_counter() - start:.2f} s) en {settings.BAKE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""
+Benchmarks sin ventana de las partes calientes del juego:
+MapManager.load_map, MapManager.update, MapManager.draw, Player.move_both y DialogueSystem.draw.
+
+Se miden las zonas reales (zona1..zona11, como línea base) y mapas sintéticos de distintos
+tamaños (mundos/stress_maps.py). El resultado se guarda en JSON para comparar dos corridas.
+
+Uso (desde la raíz del proyecto):
+    python -m core.benchmark                              # guarda benchmark.json
+    python -m core.benchmark --out antes.json --repeat 50
+    python -m core.benchmark --compare antes.json despues.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import pygame
+from core import settings
+from ui import dialogue_db
+
+REAL_MAPS = [f"zona{i}" for i in range(1, 12)]
+
+# Métricas que se comparan entre corridas (todas: menos es mejor)
+METRICS = ["load_cold_ms", "load_warm_ms", "update_ms", "move_both_us", "draw_ms", "dialogue_draw_ms"]
+
+
+def _median_ms(fn, repeat, scale=1000.0):
+    """Mediana del tiempo de `fn()` en `repeat` llamadas (por defecto en milisegundos)"""
+    clock = time.perf_counter
+    times = []
+    for _ in range(repeat):
+        start = clock()
+        fn()
+        times.append(clock() - start)
+    return round(statistics.median(times) * scale, 4)
+
+
+def _test_position(current_map, hitbox):
+    """
+    Posición de la hitbox del player para medir: el centro del mapa o algún spawn,
+    siempre que no toque paredes, teleports ni bordes (no debe cambiar de mapa al medir).
+    """
+    width, height = current_map["width"], current_map["height"]
+    candidates = [(width // 2, height // 2)]
+    candidates += [(sp["x"], sp["y"]) for sp in current_map.get("spawn_points", {}).values()]
+    blockers = current_map["collision"] + current_map["teleports"]
+    for x, y in candidates:
+        rect = hitbox.copy()
+        rect.center = (int(x), int(y))
+        inside = rect.left > 0 and rect.top > 0 and rect.right < width and rect.bottom < height
+        if inside and rect.collidelist(blockers) == -1:
+            return rect.topleft
+    return (width // 2, height // 2)
+
+
+def _longest_dialogue(current_map):
+    npcs = [npc for npc in current_map["npcs"] if npc.dialogue_ref]
+    if not npcs:
+        return dialogue_db.lines(["Lenard: \nNo hay nadie con quien hablar aca. \nSigamos buscando al chico."])
+    return max(npcs, key=lambda npc: sum(len(line.text) for line in npc.dialogue)).dialogue
+
+
+def bench_map(game, name, maps_dir, repeat):
+    """Mide un mapa y devuelve sus tiempos y tamaños"""
+    from core import assets
+
+    scene = game.scene
+    map_manager = scene.map_manager
+    player = scene.player
+    companion = scene.companion
+    screen = game.screen
+    map_manager.maps_dir = maps_dir
+
+    # Carga en frío (cache de imágenes vacía) y en caliente
+    def load_cold():
+        assets.cache.clear()
+        map_manager.load_map(name)
+    result = {"load_cold_ms": _median_ms(load_cold, max(3, repeat // 5))}
+    result["load_warm_ms"] = _median_ms(lambda: map_manager.load_map(name), repeat)
+
+    current = map_manager.current_map
+    result["counts"] = {
+        "collision": len(current["collision"]),
+        "props": len(current["props"]),
+        "npcs": len(current["npcs"]),
+        "walking_npcs": sum(1 for npc in current["npcs"] if npc.walk_speed > 0 and npc.path),
+        "dialogue_chars": sum(len(line.text) for npc in current["npcs"] for line in npc.dialogue),
+    }
+
+    # Player parado en un lugar seguro
+    start = _test_position(current, player.hitbox)
+    player.hitbox.topleft = start
+    map_manager.sync_player_sprite(player)
+    map_manager.sync_companion_to_player(player)
+
+    # Update del mapa (NPCs, props, teleports, bordes)
+    dt = 1.0 / settings.SIM_HZ
+    result["update_ms"] = _median_ms(lambda: map_manager.update(player, dt), repeat * 4)
+    if map_manager.current_map is not current:
+        result["note"] = "el update cambió de mapa; los tiempos de update no son comparables"
+        map_manager.load_map(name)
+
+    # move_both en las 8 direcciones (en microsegundos por llamada)
+    collisions = map_manager.current_map["collision_index"]
+    moves = [(dx, dy) for dx in (-3, 0, 3) for dy in (-3, 0, 3) if dx or dy]
+
+    def move_all():
+        for dx, dy in moves:
+            player.hitbox.topleft = start
+            player.move_both(dx, dy, collisions)
+    result["move_both_us"] = round(_median_ms(move_all, repeat * 4, scale=1e6) / len(moves), 4)
+    player.hitbox.topleft = start
+    map_manager.sync_player_sprite(player)
+
+    # Dibujo completo del mapa
+    result["draw_ms"] = _median_ms(lambda: map_manager.draw(screen, player, companion), repeat)
+
+    # Caja de diálogo con el texto completo, recorriendo las líneas del NPC más largo
+    dialogue = game.dialogue
+    lines = _longest_dialogue(map_manager.current_map)
+    dialogue.start(lines, speaker="npc")
+    index = [0]
+
+    def draw_dialogue():
+        dialogue.set_line(lines[index[0] % len(lines)])
+        dialogue.cursor = len(dialogue.full_text)
+        index[0] += 1
+        dialogue.draw(screen)
+    result["dialogue_draw_ms"] = _median_ms(draw_dialogue, repeat)
+    dialogue.active = False
+    player.can_move = True
+
+    return result
+
+
+def run(out_path, repeat=30, stress=True):
+    """Corre todos los benchmarks y guarda el resultado en out_path"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    settings.PREFETCH_ENABLED = False  # medir la carga real, no el intercambio precargado
+    settings.DIRTY_RECTS = False
+    settings.PROFILER_ENABLED = False
+    pygame.init()
+
+    from core.game import Game
+    from mundos import stress_maps
+
+    game = Game()
+    real_dir = game.scene.map_manager.maps_dir
+    targets = [(name, real_dir) for name in REAL_MAPS if os.path.exists(os.path.join(real_dir, f"{name}.json"))]
+
+    stress_dir = tempfile.mkdtemp(prefix="quimera_stress_")
+    try:
+        if stress:
+            targets += [(name, stress_dir) for name in stress_maps.write_all(stress_dir)]
+
+        results = {}
+        for name, maps_dir in targets:
+            results[name] = bench_map(game, name, maps_dir, repeat)
+            r = results[name]
+            print(f"{name:<10} carga {r['load_cold_ms']:8.3f}/{r['load_warm_ms']:8.3f} ms  "
+                  f"update {r['update_ms']:7.3f} ms  move_both {r['move_both_us']:7.2f} us  "
+                  f"draw {r['draw_ms']:7.3f} ms  diálogo {r['dialogue_draw_ms']:7.3f} ms")
+    finally:
+        shutil.rmtree(stress_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "settings": {
+                "USE_COMPILED_MAPS": settings.USE_COMPILED_MAPS,
+                "PREBAKE_STATIC": settings.PREBAKE_STATIC,
+                "SPATIAL_CELL_SIZE": settings.SPATIAL_CELL_SIZE,
+            },
+        },
+        "results": results,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {out_path}")
+    return report
+
+
+def compare(old_path, new_path, threshold=0.10):
+    """
+    Compara dos corridas e imprime la diferencia de cada métrica.
+    Devuelve 1 si alguna empeoró más que `threshold` (10% por defecto).
+    """
+    for path in (old_path, new_path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No se encontró el resultado: {path}")
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = json.load(f)["results"]
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    regressions = 0
+    for name in new:
+        if name not in old:
+            print(f"{name}: sin datos en {old_path}")
+            continue
+        for metric in METRICS:
+            a, b = old[name].get(metric), new[name].get(metric)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            mark = ""
+            if change > threshold:
+                mark = "  <-- REGRESIÓN"
+                regressions += 1
+            print(f"{name:<10} {metric:<17} {a:10.3f} -> {b:10.3f}  {change * 100:+7.1f}%{mark}")
+
+    print(f"{regressions} regresiones (umbral {threshold * 100:.0f}%)")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de Proyecto QUIMERA")
+    parser.add_argument("--out", default="benchmark.json", help="archivo JSON de resultados")
+    parser.add_argument("--repeat", type=int, default=30, help="repeticiones por medición")
+    parser.add_argument("--sin-stress", dest="stress", action="store_false",
+                        help="medir solo las zonas reales")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTES", "DESPUES"),
+                        help="comparar dos archivos de resultados")
+    parser.add_argument("--umbral", type=float, default=0.10,
+                        help="empeoramiento relativo que cuenta como regresión (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(args.compare[0], args.compare[1], args.umbral)
+    run(args.out, args.repeat, args.stress)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
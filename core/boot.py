@@ -0,0 +1,83 @@
+import threading
+import time
+
+from core.atlas import load_atlas   # Hojas de sprites de los personajes
+
+
+# Arranque en segundo plano: mientras el menú está en pantalla se cargan los assets del
+# juego y el primer mapa, así "Jugar" no congela la ventana
+class BootLoader:
+    def __init__(self, menu=None):
+        """
+        menu = Menu que ya mostró su primer frame (sus imágenes grandes se cargan acá)
+        Las etapas corren en orden en un hilo aparte apenas se crea el loader.
+        """
+        self.menu = menu
+        self.stages = [
+            ("menú", self._menu_art),
+            ("diálogos", self._dialogue),
+            ("personajes", self._characters),
+            ("zona1", self._first_map),
+        ]
+        self.stage = None      # etapa que se está cargando
+        self.completed = 0     # etapas terminadas
+        self.times = {}        # etapa -> segundos que tardó
+        self.scene = None      # OverworldScene ya armada (la toma el Game)
+        self.error = None
+
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._worker, name="boot", daemon=True)
+        self._thread.start()
+
+    # ---------- ETAPAS ----------
+    def _menu_art(self):
+        if self.menu is not None:
+            self.menu.load_art()
+
+    def _dialogue(self):
+        # Solo las imágenes: la fuente se abre en el hilo principal (el menú está dibujando texto)
+        from ui.dialogue import DialogueSystem
+        DialogueSystem.preload()
+
+    def _characters(self):
+        load_atlas("lenard")
+        load_atlas("pika")
+
+    def _first_map(self):
+        from scenes.overworld import OverworldScene
+        self.scene = OverworldScene(None)  # el Game se engancha después con attach()
+
+    # ---------- HILO ----------
+    def _worker(self):
+        try:
+            for name, stage in self.stages:
+                self.stage = name
+                start = time.perf_counter()
+                stage()
+                self.times[name] = time.perf_counter() - start
+                self.completed += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stage = None
+            self._done.set()
+
+    # ---------- API ----------
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def progress(self):
+        """Fracción de etapas terminadas (0..1)"""
+        return self.completed / len(self.stages)
+
+    def wait(self, timeout=None):
+        """
+        Espera a que termine el arranque (o hasta `timeout` segundos).
+        Devuelve True si terminó; si una etapa falló, relanza su error acá.
+        """
+        finished = self._done.wait(timeout)
+        if finished and self.error is not None:
+            raise self.error
+        return finished
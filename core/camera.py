@@ -0,0 +1,38 @@
+import pygame
+
+
+# Cámara: qué parte del mapa (coordenadas de mundo) se ve en la pantalla
+class Camera:
+    def __init__(self, width, height):
+        self.width = width    # tamaño de la vista (la pantalla)
+        self.height = height
+        self.x = 0            # esquina superior izquierda de la vista, en coordenadas de mundo
+        self.y = 0
+
+    @property
+    def offset(self):
+        """Lo que hay que restar a una posición de mundo para llevarla a pantalla"""
+        return (self.x, self.y)
+
+    @property
+    def rect(self):
+        """Zona del mundo que se ve"""
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def follow(self, target, world_width, world_height):
+        """
+        Centra la vista en `target` (un Rect de mundo) sin salirse del mapa.
+        Si el mapa es más chico que la pantalla, la vista queda en (0, 0).
+        """
+        x = target.centerx - self.width // 2
+        y = target.centery - self.height // 2
+        self.x = max(0, min(x, world_width - self.width))
+        self.y = max(0, min(y, world_height - self.height))
+
+    def to_screen(self, rect):
+        """Rect de mundo → rect de pantalla"""
+        return rect.move(-self.x, -self.y)
+
+    def to_world(self, rect):
+        """Rect de pantalla → rect de mundo"""
+        return rect.move(self.x, self.y)
@@ -0,0 +1,38 @@
+import pygame
+
+
+# Fuente de teclas presionadas para el movimiento.
+# Normalmente es el teclado real; el modo headless (y los replays) pueden cambiarla
+# por una fuente guionada sin tocar el código del player.
+_source = None
+
+
+class ScriptedKeys:
+    """Estado de teclado armado a mano: se indexa igual que pygame.key.get_pressed()"""
+
+    def __init__(self, keys=()):
+        self.pressed = set(keys)
+
+    def set(self, keys):
+        self.pressed = set(keys)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def set_source(source):
+    """Cambia la fuente de teclas (None = teclado real)"""
+    global _source
+    _source = source
+
+
+def get_pressed():
+    """Teclas presionadas en este frame"""
+    if _source is not None:
+        return _source
+    return pygame.key.get_pressed()
+
+
+def key_code(name):
+    """Código de tecla a partir de su nombre ("left", "z", "space"...)"""
+    return pygame.key.key_code(name)
@@ -1,10 +1,25 @@
+import struct
 import pygame
 from core import settings  # Importa las configuraciones del juego (título, tamaño de pantalla, FPS, etc.)
+from core import controls  # Teclas mantenidas (reales o de un replay)
+from core.replay import InputRecorder, InputReplay  # Grabación / reproducción del input
+from core.scene import SceneStack  # Pila de escenas (menú, overworld, pausa)
 from scenes.overworld import OverworldScene  # Importa la escena principal del mundo
+from scenes.menu import MenuScene  # Menú principal (arranca la carga en segundo plano)
+from scenes.pause import PauseScene  # Pausa (ESC en el overworld)
 from ui.dialogue import DialogueSystem  # Importa el sistema de diálogos
+from core.render import DirtyRectRenderer  # Renderer opcional por rectángulos sucios
+from core.profiler import FrameProfiler  # Tiempos por fase del frame (F2 / F4)
+from core.save import SaveManager  # Guardado rápido (F5) y carga rápida (F9)
+from core import memory  # Cuenta de memoria de las superficies (F6)
 
 class Game:
-    def __init__(self):
+    def __init__(self, boot=None, menu=False):
+        """
+        boot = BootLoader que ya cargó en segundo plano los assets y el primer mapa
+        (ver core/boot.py); sin él todo se carga acá mismo.
+        menu = True → arranca en el menú principal (que carga el juego detrás)
+        """
         # Configura el título de la ventana usando la constante del settings
         pygame.display.set_caption(settings.TITLE)  # Este se puede usar para establecer un título dinámico
         
@@ -19,38 +34,229 @@ class Game:
         
         # Variable de control para el loop principal
         self.running = True
+        self.closed = False  # shutdown() ya corrió
 
-        # Inicializa el sistema de diálogos
-        self.dialogue = DialogueSystem(self)
-        
-        # Crea la escena principal del juego (Overworld)
-        self.scene = OverworldScene(self)
+        # Sistema de diálogos: se arma al entrar al overworld (así sus cajas, la imagen final
+        # y la fuente no demoran el primer frame del menú; las imágenes las precarga el BootLoader)
+        self.dialogue = None
+
+        # Flags de la historia (nombre -> entero); se guardan con la partida
+        self.flags = {}
+        self.saves = SaveManager(self)
+
+        # Pila de escenas; self.scene es el overworld (None mientras se está en el menú)
+        self.scenes = SceneStack(self)
+        self.scene = None
+
+        # Renderer por rectángulos sucios (opcional, ver settings.DIRTY_RECTS)
+        self.renderer = DirtyRectRenderer(self) if settings.DIRTY_RECTS else None
+
+        # Simulación a paso fijo: el tiempo real se acumula y se consume en pasos de sim_dt
+        self.sim_dt = 1.0 / settings.SIM_HZ
+        self.accumulator = 0.0
+        self.pending_events = []  # eventos que llegaron en un frame sin paso de simulación
+        self.skip_time = False    # descartar el tiempo del frame siguiente (tirón por carga de mapa)
+        self.steps = 0            # pasos de simulación corridos desde el arranque
+
+        # Grabación o reproducción del input (ver core/replay.py)
+        self.recorder = None
+        self.replay = None
+        self.replay_result = None  # True/False al terminar un replay (¿terminó igual que al grabarlo?)
+
+        # Profiler por fases: apagado no agrega ningún costo
+        self.profiler = FrameProfiler(self)
+        if settings.PROFILER_ENABLED:
+            self.profiler.enable(keep=True)
+
+        # Primera escena
+        if menu:
+            self.scenes.push(MenuScene(self))
+        else:
+            self.enter_overworld(boot)
+
+    def enter_overworld(self, boot=None):
+        """
+        Pone el overworld en la pila en lugar de la escena de arriba: la que armó
+        el BootLoader si se pasa uno, si no se crea acá mismo.
+        """
+        if boot is not None:
+            boot.wait()
+            scene = boot.scene
+            scene.attach(self)
+        else:
+            scene = OverworldScene(self)
+        if self.dialogue is None:
+            self.dialogue = DialogueSystem(self)
+        self.scene = scene
+        self.scenes.replace(scene)
+        self.profiler.rewrap()  # las fases del profiler están en el overworld
+        self.skip_time = True   # no simular el tiempo que tardó en entrar
 
     def run(self):
         # Loop principal del juego
-        while self.running:
-            # Calcula el tiempo entre frames (delta time) para movimiento suave
-            dt = self.clock.tick(settings.FPS) / 1000.0
-            
-            # Obtiene todos los eventos que ocurrieron (teclas, clicks, cierre de ventana, etc.)
-            events = pygame.event.get()
-
-            # Manejo básico de eventos de salida
-            for e in events:
-                if e.type == pygame.QUIT:  # Si se cierra la ventana
-                    self.running = False
-                elif e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE:  # Si se presiona ESC
-                    self.running = False
-
-            # Actualiza la escena actual, pasando delta time y eventos
-            self.scene.update(dt, events)
-
-            # Dibuja la escena en la pantalla
+        try:
+            while self.running:
+                # Calcula el tiempo entre frames (delta time) para movimiento suave
+                dt = self.clock.tick(settings.FPS) / 1000.0
+
+                # Obtiene todos los eventos que ocurrieron (teclas, clicks, cierre de ventana, etc.)
+                events = pygame.event.get()
+
+                self.frame(dt, events)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """
+        Cierre ordenado (run() lo llama al salir; también quien cierre pygame, antes de pygame.quit):
+        frena la precarga de mapas y guarda la grabación, la partida y los tiempos de la sesión.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        # Que el hilo de precarga no siga armando un mapa sin pygame abajo
+        if self.scene is not None and self.scene.map_manager.prefetcher:
+            self.scene.map_manager.prefetcher.stop()
+        self.stop_recording()
+        self.saves.close()  # que termine de escribir el último guardado
+        if self.profiler.enabled:
+            self.profiler.export(settings.PROFILER_EXPORT)
+
+    # ---------- GRABACIÓN / REPLAY ----------
+    def start_recording(self, path):
+        """Graba el input de cada paso de simulación desde ahora (llamar recién creado el Game)"""
+        self.recorder = InputRecorder(path, settings.SIM_HZ)
+
+    def stop_recording(self):
+        if self.recorder:
+            size = self.recorder.save(*self.state_signature())
+            print(f"Replay guardado en {self.recorder.path}: {self.recorder.steps} pasos, {size} bytes")
+            self.recorder = None
+
+    def start_replay(self, path):
+        """Reproduce un replay (el Game tiene que estar recién creado, igual que al grabar)"""
+        self.replay = InputReplay(path)
+        self.sim_dt = 1.0 / self.replay.sim_hz  # mismo paso que en la grabación
+
+    def state_signature(self):
+        """Mapa actual y posición de la hitbox del player (para verificar replays)"""
+        return self.scene.map_manager.current_map["id"], self.scene.player.hitbox.topleft
+
+    def frame(self, dt, events):
+        """
+        Un frame completo: eventos de salida, pasos de simulación, dibujo y presentación.
+        Lo usa run() y también el modo headless (core/headless.py) con dt simulado.
+        dt es el tiempo real del frame; la simulación siempre avanza de a sim_dt.
+        """
+        # ¿El overworld está arriba de la pila? (si no, el frame es de otra escena)
+        in_world = self.scene is not None and self.scenes.top is self.scene
+
+        # Manejo básico de eventos de salida
+        for e in events:
+            if e.type == pygame.QUIT:  # Si se cierra la ventana
+                self.running = False
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_ESCAPE and in_world:  # ESC → pausa
+                self.pause()
+            elif e.type == pygame.WINDOWEXPOSED and self.renderer:  # La ventana se volvió a mostrar
+                self.renderer.invalidate()
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F2:  # Overlay del profiler
+                self.profiler.toggle_overlay()
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F4 and self.profiler.enabled:
+                self.profiler.export(settings.PROFILER_EXPORT)
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F5 and in_world:  # Guardado rápido
+                self.saves.save()
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F6:  # Superficies más grandes en consola
+                print(memory.tracker.dump())
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F9 and in_world:  # Carga rápida
+                try:
+                    self.saves.load()
+                except (FileNotFoundError, ValueError, struct.error) as error:
+                    # Sin partida, de otra versión o dañada: se avisa y se sigue jugando
+                    print(error)
+
+        if self.scenes.top is not self.scene:
+            # Menú, pausa, ...: la pila actualiza la escena de arriba y dibuja las que se ven
+            # (el ESC que abrió la pausa no le llega a la pausa)
+            self.scenes.update(dt, events if not in_world else [])
+            self.scenes.draw(self.screen)
+            if self.profiler.overlay:
+                self.profiler.draw(self.screen)
+            if self.renderer:
+                self.renderer.invalidate()  # al volver al overworld se redibuja completo
+            self.present()
+            return
+
+        # Acumular el tiempo real (acotado, para no encadenar pasos después de un tirón)
+        self.pending_events.extend(events)
+        if self.skip_time:
+            dt = 0.0
+            self.skip_time = False
+        self.accumulator += min(dt, settings.MAX_FRAME_TIME)
+
+        while self.accumulator >= self.sim_dt:
+            self.step(self.pending_events)
+            self.pending_events = []
+            self.accumulator -= self.sim_dt
+
+        # Posición de dibujo entre el último paso y el siguiente
+        alpha = self.accumulator / self.sim_dt if settings.INTERPOLATE else 1.0
+        self.scene.interpolate(alpha)
+
+        if self.renderer:
+            # Redibuja solo las regiones que cambiaron
+            dirty = self.renderer.render(self.screen)
+        else:
+            # Dibuja la escena (con el diálogo) en la pantalla
             self.scene.draw(self.screen)
+            dirty = None
+
+        if self.profiler.overlay:
+            self.profiler.draw(self.screen)
+            if dirty is not None:
+                # El overlay tapa parte del mapa: el próximo frame se redibuja completo
+                self.renderer.invalidate()
+                dirty = [self.screen.get_rect()]
 
-            # Actualiza y dibuja el diálogo si hay alguno activo
-            self.dialogue.update(dt)
-            self.dialogue.draw(self.screen)
+        self.present(dirty)
 
-            # Actualiza toda la pantalla con lo dibujado
+    def pause(self):
+        """Abre la pausa encima del overworld (la misma escena cada vez, queda cargada)"""
+        self.scenes.push(self.scenes.find(PauseScene) or PauseScene(self))
+
+    def present(self, dirty=None):
+        """Muestra lo dibujado: toda la pantalla, o solo los rects indicados"""
+        if dirty is None:
             pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+
+    def step(self, events):
+        """Un paso de simulación de duración fija (sim_dt)"""
+        if self.replay:
+            events = self.replay.apply(events)
+        elif self.recorder:
+            self.recorder.record(controls.get_pressed(), events)
+
+        map_manager = self.scene.map_manager
+        current = map_manager.current_map
+        self.scene.snapshot()
+
+        # Actualiza la escena actual, pasando el paso fijo y los eventos
+        self.scene.update(self.sim_dt, events)
+
+        # Actualiza el diálogo si hay alguno activo
+        self.dialogue.update(self.sim_dt)
+
+        # Cambio de mapa: no interpolar desde la posición del mapa anterior
+        # y no simular el tiempo que tardó la carga
+        if map_manager.current_map is not current:
+            self.scene.snapshot()
+            self.skip_time = True
+
+        self.steps += 1
+
+        if self.replay and self.replay.finished:
+            self.replay_result = self.replay.matches(*self.state_signature())
+            print("Replay terminado: " + ("coincide con la grabación" if self.replay_result else "DIVERGE de la grabación"))
+            self.replay = None
+            controls.set_source(None)  # de acá en más vuelve el teclado real
@@ -0,0 +1,261 @@
+import json
+import os
+import time
+
+import pygame
+from core import controls, assets, memory
+
+
+# Guion por defecto: recorre el mapa inicial en las cuatro direcciones y prueba interactuar
+DEFAULT_SCRIPT = {
+    "dt": 1 / 60,
+    "steps": [
+        {"frames": 120, "keys": ["right"]},
+        {"frames": 60, "keys": ["down"]},
+        {"frames": 10, "keys": [], "press": ["z"]},
+        {"frames": 30, "keys": [], "press": ["z"]},
+        {"frames": 120, "keys": ["left"]},
+        {"frames": 60, "keys": ["up"]},
+        {"frames": 60, "keys": ["right", "up"]},
+        {"frames": 30, "keys": []},
+    ],
+}
+
+
+def load_script(path):
+    """
+    Lee un guion de input en JSON:
+    {"dt": 0.0166, "steps": [{"frames": 60, "keys": ["right"], "press": ["z"]}, ...]}
+    keys  → teclas mantenidas durante todo el paso
+    press → teclas que se presionan una vez (KEYDOWN) al empezar el paso
+    dt    → paso de tiempo simulado; null = se usa el tiempo real medido de cada frame
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró el guion de input: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def percentile(values, p):
+    """Percentil p (0-100) de una lista ya ordenada"""
+    if not values:
+        return 0.0
+    k = min(len(values) - 1, max(0, round(p / 100 * (len(values) - 1))))
+    return values[k]
+
+
+# Corre el juego sin ventana ni límite de FPS, con input guionado, y mide cuánto tarda cada frame
+class HeadlessRunner:
+    def __init__(self, script=None, frames=None, dt=None, profile=None, replay=None, record=None):
+        """
+        script = guion de input (dict, ver load_script); None usa DEFAULT_SCRIPT
+        frames = cantidad de frames a simular; None = lo que dure el guion
+        dt     = pisa el dt del guion (None = usar el del guion)
+        profile = ruta .csv/.json donde exportar los tiempos por fase (None = sin profiler)
+        replay = replay (.qrp) a reproducir en vez del guion; corre hasta que se termina
+        record = ruta donde grabar el input de la corrida como replay
+        """
+        self.script = script or DEFAULT_SCRIPT
+        self.dt = dt if dt is not None else self.script.get("dt")
+        self.frames = frames
+        self.profile = profile
+        self.replay = replay
+        self.record = record
+        self.keys = controls.ScriptedKeys()
+
+        self.frame_times = []  # segundos reales de cada frame (update + dibujo)
+        self.start_time = 0.0
+        self.first_frame_time = 0.0  # hasta el primer frame del menú en pantalla
+        self.playable_time = None    # hasta el primer frame del juego (con "Jugar" elegido enseguida)
+        self.boot_stages = {}        # etapa del arranque en segundo plano -> segundos
+        self.menu_frames = 0         # frames del menú esperando a que termine el arranque
+        self.boot_time = 0.0         # construcción del Game una vez terminado el arranque
+        self.wall_time = 0.0
+        self.ended = None      # motivo de fin si el juego se cerró solo
+
+    def _timeline(self):
+        """Genera (teclas mantenidas, teclas presionadas) por frame, repitiendo el guion si hace falta"""
+        steps = self.script.get("steps", [])
+        if not steps:
+            return
+        produced = 0
+        while True:
+            for step in steps:
+                held = [controls.key_code(k) for k in step.get("keys", [])]
+                press = [controls.key_code(k) for k in step.get("press", [])]
+                for i in range(int(step.get("frames", 1))):
+                    if self.frames is not None and produced >= self.frames:
+                        return
+                    yield held, press if i == 0 else []
+                    produced += 1
+            if self.frames is None:
+                return
+
+    def _replay_timeline(self, game):
+        """Frames sin input propio hasta que el replay del Game se termina"""
+        while game.replay is not None:
+            yield [], []
+
+    def _boot(self):
+        """
+        Arranca como el juego real: primer frame del menú, carga en segundo plano y "Jugar"
+        elegido enseguida (el peor caso: el menú espera con la barra de progreso a 60 FPS).
+        """
+        from core.game import Game  # después de pygame.init (Game arma la ventana)
+
+        self.start_time = time.perf_counter()
+        game = Game(menu=True)
+        menu = game.scenes.top
+        game.frame(0.0, [])
+        self.first_frame_time = time.perf_counter() - self.start_time
+
+        # "Jugar" (la primera opción) y esperar en el menú hasta que el overworld entra a la pila
+        frame = 1 / 60
+        events = [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, mod=0, unicode="", scancode=0)]
+        while game.scene is None:
+            menu.boot.wait(frame)
+            if menu.boot.done:
+                self.boot_stages = dict(menu.boot.times)
+            # El frame en que el menú le pasa la escena al Game (puede ser el mismo en que terminó el arranque)
+            start = time.perf_counter()
+            game.frame(frame, events)
+            events = []
+            if game.scene is None:
+                self.menu_frames += 1
+        self.boot_time = time.perf_counter() - start
+        return game
+
+    def run(self):
+        """Corre la simulación y devuelve el reporte (dict)"""
+        # Sin ventana: el driver "dummy" de SDL dibuja sobre superficies en memoria
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        pygame.init()
+
+        game = self._boot()
+
+        if self.profile:
+            game.profiler.enable(keep=True)
+        if self.record:
+            game.start_recording(self.record)
+        if self.replay:
+            game.start_replay(self.replay)
+            self.dt = game.sim_dt  # un paso de simulación por frame
+            timeline = self._replay_timeline(game)
+        else:
+            timeline = self._timeline()
+
+        controls.set_source(self.keys)
+        last = time.perf_counter()
+        run_start = last
+        try:
+            for held, press in timeline:
+                if not game.running:
+                    self.ended = "game_closed"
+                    break
+                self.keys.set(held)
+                events = [pygame.event.Event(pygame.KEYDOWN, key=k, mod=0, unicode="", scancode=0) for k in press]
+                pygame.event.pump()  # que SDL no acumule eventos propios
+
+                now = time.perf_counter()
+                dt = self.dt if self.dt is not None else now - last
+                last = now
+
+                game.frame(dt, events)
+                self.frame_times.append(time.perf_counter() - now)
+                if self.playable_time is None:
+                    self.playable_time = time.perf_counter() - self.start_time
+        except SystemExit:
+            # La secuencia final del juego cierra pygame y sale
+            self.ended = "end_sequence"
+        finally:
+            self.wall_time = time.perf_counter() - run_start
+            controls.set_source(None)
+            game.stop_recording()
+            prefetcher = game.scene.map_manager.prefetcher
+            if prefetcher:
+                prefetcher.stop()
+            if self.profile:
+                game.profiler.export(self.profile)
+
+        return self.report(game)
+
+    def report(self, game):
+        times = sorted(self.frame_times)
+        count = len(times)
+        map_manager = game.scene.map_manager
+        prefetcher = map_manager.prefetcher
+        ms = lambda s: round(s * 1000, 3)
+        return {
+            "frames": count,
+            "dt": self.dt,
+            "sim_steps": game.steps,
+            "boot_ms": ms(self.boot_time),
+            "time_to_first_frame_ms": ms(self.first_frame_time),
+            "time_to_playable_ms": ms(self.playable_time or 0.0),
+            "boot_stages_ms": {name: ms(seconds) for name, seconds in self.boot_stages.items()},
+            "menu_wait_frames": self.menu_frames,
+            "wall_s": round(self.wall_time, 4),
+            "fps": round(count / self.wall_time, 1) if self.wall_time > 0 else 0.0,
+            "frame_ms": {
+                "mean": ms(sum(times) / count) if count else 0.0,
+                "p50": ms(percentile(times, 50)),
+                "p90": ms(percentile(times, 90)),
+                "p99": ms(percentile(times, 99)),
+                "max": ms(times[-1]) if count else 0.0,
+            },
+            "map_loads": [
+                {"map": name, "ms": ms(seconds), "prefetched": prefetched}
+                for name, seconds, prefetched in map_manager.load_times
+            ],
+            "final_map": map_manager.current_map["id"],
+            "player": list(game.scene.player.hitbox.topleft),
+            "asset_cache": assets.cache.stats(),
+            "prefetch": prefetcher.stats() if prefetcher else None,
+            "scenes": game.scenes.stats(),
+            "memory": memory.tracker.summary(),
+            "profiler": game.profiler.summary() if game.profiler.enabled else None,
+            "replay": {"file": self.replay, "match": game.replay_result} if self.replay else None,
+            "ended": self.ended,
+        }
+
+
+def print_report(report):
+    """Resumen legible del reporte en consola"""
+    f = report["frame_ms"]
+    print(f"Frames: {report['frames']}  FPS (sin límite): {report['fps']}  Arranque: {report['boot_ms']} ms")
+    print(f"Primer frame del menú: {report['time_to_first_frame_ms']} ms  "
+          f"Jugable: {report['time_to_playable_ms']} ms  ({report['menu_wait_frames']} frames de espera en el menú)")
+    print("Carga en segundo plano (ms): " + "  ".join(f"{k} {v}" for k, v in report["boot_stages_ms"].items()))
+    print(f"Frame ms → media {f['mean']}  p50 {f['p50']}  p90 {f['p90']}  p99 {f['p99']}  máx {f['max']}")
+    for load in report["map_loads"]:
+        origin = "precargado" if load["prefetched"] else "construido"
+        print(f"Mapa {load['map']}: {load['ms']} ms ({origin})")
+    c = report["asset_cache"]
+    print(f"Cache de assets: {c['hits']} hits, {c['misses']} misses, {c['bytes'] // 1024} KB")
+    if c.get("baked"):
+        print(f"Imágenes horneadas: {c['baked']['hits']} mapeadas, {c['baked']['stale']} desactualizadas")
+    m = report["memory"]
+    print(f"Superficies: {m['total_bytes'] // 1024} KB (pico {m['peak_bytes'] // 1024} KB, "
+          f"presupuesto {m['budget_bytes'] // 1024} KB)  "
+          + "  ".join(f"{name} {nbytes // 1024} KB" for name, nbytes in m["maps"].items()))
+    if report["profiler"]:
+        phases = report["profiler"]["phases_avg_ms"]
+        print("Fases (ms promedio): " + "  ".join(f"{k} {v}" for k, v in phases.items() if v))
+    if report["replay"]:
+        print(f"Replay {report['replay']['file']}: " + ("coincide" if report["replay"]["match"] else "DIVERGE"))
+    if report["ended"]:
+        print(f"Fin: {report['ended']}")
+
+
+def main(args):
+    """Punto de entrada de `python main.py --headless`"""
+    script = load_script(args.script) if args.script else None
+    runner = HeadlessRunner(script, frames=args.frames, dt=args.dt, profile=args.profile,
+                            replay=args.replay, record=args.record)
+    report = runner.run()
+    print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    return report
@@ -0,0 +1,167 @@
+"""
+Cuenta de memoria de las superficies: cuántos bytes ocupa cada superficie viva y de quién es
+(un mapa, un personaje, la UI). Cada módulo anota las superficies que crea con track();
+el registro usa referencias débiles, así una superficie que ya nadie usa sale sola de la cuenta.
+
+Dueños: "grupo:nombre" → "mapa:zona1", "personaje:lenard", "ui:dialogo", ... y "cache" para
+las imágenes de la cache que nadie más anotó. Una superficie compartida (el mismo PNG en
+dos mapas) cuenta para cada uno de sus dueños, pero una sola vez en el total.
+
+Presupuesto (settings.MEMORY_BUDGET_MB): enforce() pide a quienes guardan superficies que
+se pueden volver a armar (por ahora la cache de imágenes) que suelten las menos usadas.
+
+F6 en el juego imprime las superficies más grandes (dump()).
+"""
+import threading
+import weakref
+
+from core import settings
+
+
+def surface_bytes(surface):
+    return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+
+# Registro de superficies vivas por dueño
+class SurfaceTracker:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = {}  # id(superficie) -> [ref débil, bytes, dueños, etiqueta]
+        self._lock = threading.RLock()  # los callbacks de las refs débiles pueden llegar desde cualquier hilo
+        self._releasers = []  # (nombre, función(bytes a liberar) -> bytes liberados)
+
+        # Estadísticas
+        self.bytes = 0        # total de las superficies vivas anotadas
+        self.peak_bytes = 0
+        self.released = 0  # bytes soltados por el presupuesto
+        self.over_budget = False
+
+    def track(self, surface, owner, label=None):
+        """
+        Anota una superficie a nombre de `owner` (y la devuelve, para usarlo en línea).
+        Las subsuperficies se cuentan en su superficie madre (comparten los píxeles).
+        """
+        if surface is None:
+            return surface
+        base = surface
+        while base.get_parent() is not None:
+            base = base.get_parent()
+        key = id(base)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0]() is not base:
+                if entry is not None:  # id reusado por una superficie nueva
+                    self.bytes -= entry[1]
+                ref = weakref.ref(base, lambda _, key=key: self._forget(key))
+                entry = self._entries[key] = [ref, surface_bytes(base), [], label]
+                self.bytes += entry[1]
+                self.peak_bytes = max(self.peak_bytes, self.bytes)
+            if owner not in entry[2]:
+                entry[2].append(owner)
+            if label and not entry[3]:
+                entry[3] = label
+        return surface
+
+    def _forget(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0]() is None:
+                del self._entries[key]
+                self.bytes -= entry[1]
+
+    def add_releaser(self, name, release):
+        """release(bytes) suelta superficies que se pueden reconstruir y devuelve cuántos bytes soltó"""
+        self._releasers.append((name, release))
+
+    # ---------- CONSULTAS ----------
+    def _live(self):
+        with self._lock:
+            return [(entry[0](), entry[1], list(entry[2]), entry[3]) for entry in self._entries.values()
+                    if entry[0]() is not None]
+
+    @staticmethod
+    def primary(owners):
+        """Dueño principal: el primero que no sea la cache"""
+        for owner in owners:
+            if owner != "cache":
+                return owner
+        return "cache"
+
+    def total(self):
+        return self.bytes
+
+    def by_owner(self):
+        """Dueño -> bytes (una superficie compartida cuenta para cada dueño)"""
+        result = {}
+        for _, nbytes, owners, _ in self._live():
+            for owner in owners:
+                if owner != "cache" or len(owners) == 1:
+                    result[owner] = result.get(owner, 0) + nbytes
+        return dict(sorted(result.items(), key=lambda item: -item[1]))
+
+    def by_group(self):
+        """Grupo ("mapa", "personaje", "ui", "cache") -> bytes, cada superficie una sola vez"""
+        result = {}
+        for _, nbytes, owners, _ in self._live():
+            group = self.primary(owners).split(":")[0]
+            result[group] = result.get(group, 0) + nbytes
+        return result
+
+    def largest(self, count=None):
+        """Las superficies más grandes: lista de (bytes, tamaño, dueños, etiqueta)"""
+        live = sorted(self._live(), key=lambda item: -item[1])
+        return [(nbytes, surface.get_size(), owners, label)
+                for surface, nbytes, owners, label in live[:count or settings.MEMORY_DUMP_TOP]]
+
+    def summary(self):
+        owners = self.by_owner()
+        return {
+            "total_bytes": self.total(),
+            "peak_bytes": self.peak_bytes,
+            "budget_bytes": self.budget_bytes,
+            "surfaces": len(self._live()),
+            "groups": self.by_group(),
+            "maps": {owner[5:]: nbytes for owner, nbytes in owners.items() if owner.startswith("mapa:")},
+            "released_bytes": self.released,
+        }
+
+    def dump(self, count=None):
+        """Texto con el total por grupo y las superficies más grandes (tecla F6)"""
+        kb = lambda n: f"{n // 1024} KB"
+        lines = [f"Superficies: {kb(self.total())} de {kb(self.budget_bytes)} (pico {kb(self.peak_bytes)})"]
+        lines.append("  " + "  ".join(f"{group} {kb(n)}" for group, n in self.by_group().items()))
+        for owner, nbytes in self.by_owner().items():
+            if owner.startswith("mapa:"):
+                lines.append(f"  {owner}: {kb(nbytes)}")
+        for nbytes, (w, h), owners, label in self.largest(count):
+            lines.append(f"  {kb(nbytes):>9}  {w}x{h}  {', '.join(owners)}  {label or ''}")
+        return "\n".join(lines)
+
+    # ---------- PRESUPUESTO ----------
+    def enforce(self):
+        """
+        Si el total pasa el presupuesto, pide a cada releaser que suelte lo que sobra.
+        Devuelve los bytes liberados.
+        """
+        excess = self.total() - self.budget_bytes
+        freed = 0
+        for _, release in self._releasers:
+            if excess - freed <= 0:
+                break
+            freed += release(excess - freed)
+        self.released += freed
+        over = self.total() > self.budget_bytes
+        if over and not self.over_budget:
+            print(f"[Memoria] {self.total() // 1024} KB en superficies: se pasa del presupuesto "
+                  f"de {self.budget_bytes // 1024} KB y no queda nada que soltar")
+        self.over_budget = over
+        return freed
+
+
+# Instancia única compartida por todo el juego
+tracker = SurfaceTracker(settings.MEMORY_BUDGET_MB * 1024 * 1024)
+
+
+def track(surface, owner, label=None):
+    """Atajo para anotar una superficie en el registro compartido"""
+    return tracker.track(surface, owner, label)
@@ -0,0 +1,190 @@
+import csv
+import json
+import time
+from collections import deque
+
+import pygame
+from core import settings
+
+
+# Fases que se miden: (nombre, cómo encontrar el objeto dentro de Game, método)
+PHASES = [
+    ("eventos", lambda g: g.scene, "handle_events"),
+    ("player", lambda g: g.scene.player, "update"),
+    ("companion", lambda g: g.scene.companion, "follow"),
+    ("mapa_update", lambda g: g.scene.map_manager, "update"),
+    ("mapa_draw", lambda g: g.scene.map_manager, "draw"),
+    ("dialogo_update", lambda g: g.dialogue, "update"),
+    ("dialogo_draw", lambda g: g.dialogue, "draw"),
+    ("render", lambda g: g.renderer, "render"),  # solo con DIRTY_RECTS (incluye mapa y diálogo)
+    ("flip", lambda g: g, "present"),
+]
+
+
+# Profiler por fases del frame.
+# Cuando está apagado no queda nada en el camino del juego: los métodos medidos se
+# reemplazan por versiones con timer solo en la instancia, y al apagarlo se borran.
+class FrameProfiler:
+    def __init__(self, game, window=None):
+        self.game = game
+        self.names = [name for name, _, _ in PHASES]
+        self.enabled = False
+        self.overlay = False
+        self.keep = False  # encendido desde settings o --profile: ocultar el overlay no lo apaga
+        self._wrapped = []  # (objeto, método) envueltos en la instancia
+
+        # Frame en curso: tiempo acumulado por fase
+        self._current = dict.fromkeys(self.names, 0.0)
+
+        # Últimos frames (para promedios) y peor frame de la sesión
+        self.window = deque(maxlen=window or settings.PROFILER_WINDOW)
+        self.worst = None  # (total, {fase: segundos})
+        # Últimas filas de la sesión, para exportar: (frame, total, fases...); acotado para poder dejarlo prendido
+        self.session = deque(maxlen=settings.PROFILER_SESSION_FRAMES)
+        self.frames = 0
+
+        self._font = None
+
+    # ---------- ENCENDER / APAGAR ----------
+    def enable(self, keep=False):
+        """keep=True → queda encendido aunque se oculte el overlay (settings o --profile)"""
+        self.keep = self.keep or keep
+        if self.enabled:
+            return
+        for name, owner, method in PHASES:
+            try:
+                obj = owner(self.game)
+            except AttributeError:  # todavía en el menú: sin overworld
+                obj = None
+            if obj is not None:
+                self._wrap(obj, method, name)
+        self._wrap(self.game, "frame", None)
+        self.enabled = True
+
+    def disable(self):
+        for obj, method in self._wrapped:
+            # Borrar el atributo de instancia vuelve al método de la clase (sin costo)
+            obj.__dict__.pop(method, None)
+        self._wrapped = []
+        self.enabled = False
+        self.overlay = False
+
+    def rewrap(self):
+        """Vuelve a envolver las fases (cambió el overworld del Game); conserva el overlay"""
+        if not self.enabled:
+            return
+        overlay = self.overlay
+        self.disable()
+        self.enable()
+        self.overlay = overlay
+
+    def toggle_overlay(self):
+        """
+        Muestra/oculta el overlay. Al mostrarlo el profiler se enciende; al ocultarlo se
+        apaga, salvo que lo hayan encendido settings o --profile.
+        """
+        self.overlay = not self.overlay
+        if self.overlay:
+            self.enable()
+            return
+        if not self.keep:
+            self.disable()
+        if self.game.renderer:
+            self.game.renderer.invalidate()  # borrar el overlay de la pantalla
+
+    def _wrap(self, obj, method, phase):
+        original = getattr(obj, method)
+        current = self._current
+        clock = time.perf_counter
+
+        if phase is None:
+            # El frame completo: cierra la fila al terminar
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    self._end_frame(clock() - start)
+        else:
+            def timed(*args, **kwargs):
+                start = clock()
+                try:
+                    return original(*args, **kwargs)
+                finally:
+                    current[phase] += clock() - start
+
+        setattr(obj, method, timed)
+        self._wrapped.append((obj, method))
+
+    def _end_frame(self, total):
+        row = tuple(self._current[name] for name in self.names)
+        for name in self.names:
+            self._current[name] = 0.0
+
+        self.frames += 1
+        self.window.append((total, row))
+        self.session.append((self.frames, total) + row)
+        if self.worst is None or total > self.worst[0]:
+            self.worst = (total, row)
+
+    # ---------- RESULTADOS ----------
+    def averages(self):
+        """Promedio (en segundos) del total y de cada fase en la ventana de frames recientes"""
+        count = len(self.window)
+        if not count:
+            return 0.0, dict.fromkeys(self.names, 0.0)
+        total = sum(t for t, _ in self.window) / count
+        phases = {name: sum(row[i] for _, row in self.window) / count for i, name in enumerate(self.names)}
+        return total, phases
+
+    def summary(self):
+        """Resumen en milisegundos (promedios de la ventana y peor frame)"""
+        ms = lambda s: round(s * 1000, 3)
+        total, phases = self.averages()
+        worst_total, worst_row = self.worst if self.worst else (0.0, (0.0,) * len(self.names))
+        return {
+            "frames": self.frames,
+            "avg_ms": ms(total),
+            "phases_avg_ms": {name: ms(v) for name, v in phases.items()},
+            "worst_ms": ms(worst_total),
+            "worst_phases_ms": {name: ms(v) for name, v in zip(self.names, worst_row)},
+        }
+
+    def export(self, path):
+        """Guarda los frames de la sesión (los últimos PROFILER_SESSION_FRAMES) en CSV o JSON (según la extensión)"""
+        header = ["frame", "total"] + self.names
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow([h if h == "frame" else h + "_ms" for h in header])
+                for row in self.session:
+                    writer.writerow([row[0]] + [f"{v * 1000:.4f}" for v in row[1:]])
+        else:
+            data = {
+                "summary": self.summary(),
+                "columns": header,
+                "frames_ms": [[row[0]] + [round(v * 1000, 4) for v in row[1:]] for row in self.session],
+            }
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=1, ensure_ascii=False)
+
+    # ---------- OVERLAY ----------
+    def draw(self, screen):
+        """Dibuja el overlay con promedios recientes y el peor frame"""
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        s = self.summary()
+        lines = [f"frame {s['avg_ms']:.2f} ms  (peor {s['worst_ms']:.2f})"]
+        for name in self.names:
+            avg = s["phases_avg_ms"][name]
+            if avg or s["worst_phases_ms"][name]:
+                lines.append(f"{name:<15}{avg:6.2f}  {s['worst_phases_ms'][name]:6.2f}")
+
+        surfaces = [self._font.render(line, True, (255, 255, 255)) for line in lines]
+        width = max(surf.get_width() for surf in surfaces) + 12
+        height = 14 * len(surfaces) + 10
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for i, surf in enumerate(surfaces):
+            panel.blit(surf, (6, 5 + 14 * i))
+        screen.blit(panel, (8, 8))
@@ -0,0 +1,126 @@
+import pygame
+from mundos.draw_list import draw_rect  # Rect de mundo donde se dibuja cada objeto
+
+
+# Renderer por "rectángulos sucios": solo redibuja y presenta las regiones que cambiaron
+class DirtyRectRenderer:
+    def __init__(self, game):
+        self.game = game
+        self.full_redraw = True   # el primer frame siempre se dibuja completo
+        self.last_map = None      # mapa dibujado el frame anterior
+        self.last_rects = {}      # id(objeto) -> (rect, imagen) dibujados el frame anterior
+        self.last_dialogue = None # estado del diálogo el frame anterior
+        self.last_dialogue_rect = None
+        self.last_offset = None   # posición de la cámara el frame anterior
+
+        # Estadísticas del último frame
+        self.dirty_count = 0
+        self.dirty_area = 0
+
+    def invalidate(self):
+        """Fuerza un redibujado completo en el próximo frame (p. ej. al volver a mostrar la ventana)"""
+        self.full_redraw = True
+
+    @staticmethod
+    def _merge(rects):
+        """Une los rects que se superponen para no redibujar dos veces la misma zona"""
+        merged = []
+        for r in rects:
+            r = r.copy()
+            changed = True
+            while changed:
+                changed = False
+                for i, m in enumerate(merged):
+                    if m.colliderect(r):
+                        r.union_ip(m)
+                        merged.pop(i)
+                        changed = True
+                        break
+            merged.append(r)
+        return merged
+
+    def render(self, screen):
+        """
+        Dibuja el overworld y el diálogo.
+        Devuelve la lista de rects de pantalla que hay que presentar con display.update.
+        """
+        scene = self.game.scene
+        map_manager = scene.map_manager
+        dialogue = self.game.dialogue
+        screen_rect = screen.get_rect()
+
+        # La cámara se ubica antes de comparar: si se movió, cambia toda la pantalla
+        map_manager.update_camera(scene.player)
+        camera = map_manager.camera
+        offset = camera.offset
+
+        drawables = map_manager.sorted_drawables(scene.player, scene.companion, camera.rect)
+
+        # Estado actual de cada objeto dibujable
+        current = {}
+        for _, _, obj in drawables:
+            current[id(obj)] = (tuple(draw_rect(obj)), id(obj.image))
+
+        dialogue_state = dialogue.render_state()
+        dialogue_rect = dialogue.get_rect(screen) if dialogue.active else None
+
+        # La secuencia final cubre toda la pantalla con un fade: se dibuja completa
+        full = (self.full_redraw
+                or map_manager.current_map is not self.last_map
+                or dialogue.special_end_sequence
+                or map_manager.debug_prebake
+                or offset != self.last_offset)
+
+        if full:
+            map_manager.draw(screen, scene.player, scene.companion)
+            dialogue.draw(screen)
+            dirty = [screen_rect]
+        else:
+            dirty = []
+
+            # Objetos que se movieron o cambiaron de frame: región vieja + región nueva
+            # (la cámara no se movió, así que alcanza con pasar los rects de mundo a pantalla)
+            for key, state in current.items():
+                old = self.last_rects.get(key)
+                if old != state:
+                    dirty.append(camera.to_screen(pygame.Rect(state[0])))
+                    if old is not None:
+                        dirty.append(camera.to_screen(pygame.Rect(old[0])))
+            for key, old in self.last_rects.items():
+                if key not in current:
+                    dirty.append(camera.to_screen(pygame.Rect(old[0])))
+
+            # Caja de diálogo que cambió (texto nuevo, otra línea, apareció o se cerró)
+            if dialogue_state != self.last_dialogue:
+                if dialogue_rect:
+                    dirty.append(dialogue_rect)
+                if self.last_dialogue_rect:
+                    dirty.append(self.last_dialogue_rect)
+
+            dirty = [r.clip(screen_rect) for r in self._merge(dirty)]
+            dirty = [r for r in dirty if r.width > 0 and r.height > 0]
+
+            # Redibujar cada región: background, objetos que la tocan en orden "z",
+            # capa de props de adelante y diálogo encima
+            for area in dirty:
+                screen.set_clip(area)
+                map_manager.draw_background(screen, area)
+                world = camera.to_world(area)
+                for _, _, obj in drawables:
+                    if draw_rect(obj).colliderect(world):
+                        obj.draw(screen, offset)
+                map_manager.draw_front(screen, area)
+                if dialogue_rect and dialogue_rect.colliderect(area):
+                    dialogue.draw(screen)
+            screen.set_clip(None)
+
+        self.full_redraw = False
+        self.last_map = map_manager.current_map
+        self.last_offset = offset
+        self.last_rects = current
+        self.last_dialogue = dialogue_state
+        self.last_dialogue_rect = dialogue_rect
+
+        self.dirty_count = len(dirty)
+        self.dirty_area = sum(r.width * r.height for r in dirty)
+        return dirty
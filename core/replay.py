@@ -0,0 +1,159 @@
+"""
+Grabación y reproducción del input, paso de simulación por paso de simulación.
+
+Por cada paso fijo (Game.step) se guarda qué direcciones estaban apretadas (lo que lee
+Player.handle_input) y si llegó un KEYDOWN de Z (lo que lee OverworldScene.handle_events).
+Como la simulación es a paso fijo, reproducir esos estados desde zona1 da exactamente la
+misma partida, con o sin ventana.
+
+Formato del archivo (.qrp):
+    cabecera  "<4sHHI": magic, versión, SIM_HZ, cantidad de pasos
+    final     mapa (largo + utf-8) y hitbox "<ii" del player al terminar (para verificar)
+    tramos    (estado: 1 byte, repeticiones: varint) hasta cubrir todos los pasos
+"""
+import os
+import struct
+
+import pygame
+from core import controls
+
+MAGIC = b"QRPL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+POINT = struct.Struct("<ii")
+
+# Bits del estado de cada paso (flechas y WASD hacen lo mismo, así que comparten bit)
+DIRECTIONS = [
+    (1, (pygame.K_LEFT, pygame.K_a)),
+    (2, (pygame.K_RIGHT, pygame.K_d)),
+    (4, (pygame.K_UP, pygame.K_w)),
+    (8, (pygame.K_DOWN, pygame.K_s)),
+]
+PRESS_Z = 16
+
+# Teclas que maneja la grabación: durante un replay se ignoran las del teclado real
+REPLAYED_KEYS = {pygame.K_z} | {k for _, keys in DIRECTIONS for k in keys}
+
+
+def encode(keys, events):
+    """Estado (1 byte) de un paso a partir de las teclas mantenidas y los eventos"""
+    state = 0
+    for bit, codes in DIRECTIONS:
+        if any(keys[k] for k in codes):
+            state |= bit
+    if any(e.type == pygame.KEYDOWN and e.key == pygame.K_z for e in events):
+        state |= PRESS_Z
+    return state
+
+
+def _write_varint(out, value):
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return
+
+
+def _read_varint(raw, pos):
+    value = shift = 0
+    while True:
+        byte = raw[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class InputRecorder:
+    def __init__(self, path, sim_hz):
+        self.path = path
+        self.sim_hz = sim_hz
+        self.runs = []  # [estado, repeticiones]
+        self.steps = 0
+
+    def record(self, keys, events):
+        """Guarda el input de un paso de simulación"""
+        state = encode(keys, events)
+        if self.runs and self.runs[-1][0] == state:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([state, 1])
+        self.steps += 1
+
+    def save(self, final_map, final_pos):
+        """Escribe el archivo; final_map/final_pos sirven para verificar la reproducción"""
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.sim_hz, self.steps))
+        name = final_map.encode("utf-8")
+        _write_varint(out, len(name))
+        out += name
+        out += POINT.pack(*final_pos)
+        for state, count in self.runs:
+            out.append(state)
+            _write_varint(out, count)
+        with open(self.path, "wb") as f:
+            f.write(out)
+        return len(out)
+
+
+class InputReplay:
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No se encontró el replay: {path}")
+        with open(path, "rb") as f:
+            raw = f.read()
+
+        magic, version, self.sim_hz, self.steps = HEADER.unpack_from(raw, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} no es un replay compatible")
+        pos = HEADER.size
+        length, pos = _read_varint(raw, pos)
+        self.final_map = raw[pos:pos + length].decode("utf-8")
+        pos += length
+        self.final_pos = POINT.unpack_from(raw, pos)
+        pos += POINT.size
+
+        self.runs = []
+        while pos < len(raw):
+            state = raw[pos]
+            count, pos = _read_varint(raw, pos + 1)
+            self.runs.append((state, count))
+
+        self.keys = controls.ScriptedKeys()
+        self.run_index = 0
+        self.run_left = self.runs[0][1] if self.runs else 0
+        self.played = 0
+
+    @property
+    def finished(self):
+        return self.played >= self.steps
+
+    def apply(self, events):
+        """
+        Aplica el input grabado para el próximo paso.
+        Devuelve los eventos reales sin las teclas grabadas, más el Z grabado si corresponde.
+        Si el replay ya terminó (o no tiene pasos) devuelve los eventos sin tocar.
+        """
+        if self.finished or not self.runs:
+            return events
+        state, _ = self.runs[self.run_index]
+        self.run_left -= 1
+        if self.run_left == 0 and self.run_index + 1 < len(self.runs):
+            self.run_index += 1
+            self.run_left = self.runs[self.run_index][1]
+        self.played += 1
+
+        self.keys.set(codes[0] for bit, codes in DIRECTIONS if state & bit)
+        controls.set_source(self.keys)
+
+        events = [e for e in events if not (e.type in (pygame.KEYDOWN, pygame.KEYUP) and e.key in REPLAYED_KEYS)]
+        if state & PRESS_Z:
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_z, mod=0, unicode="z", scancode=0))
+        return events
+
+    def matches(self, final_map, final_pos):
+        """True si la partida terminó igual que cuando se grabó"""
+        return final_map == self.final_map and tuple(final_pos) == tuple(self.final_pos)
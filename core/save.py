@@ -0,0 +1,283 @@
+"""
+Partidas guardadas: zona actual, player, companion, NPCs del mapa y flags de la historia.
+
+El estado se arma como un diccionario clave -> bytes (cada valor ya empaquetado con struct),
+así un guardado rápido solo escribe las claves que cambiaron desde el último guardado.
+La escritura a disco la hace un hilo aparte: el frame solo arma los bytes.
+
+Formato del archivo (.qsv):
+    cabecera  "<4sH": magic, versión
+    registros "<BI": tipo (COMPLETO o CAMBIOS), largo; después las entradas del registro
+    entrada   "<BH": op (PONER o BORRAR), largo de la clave; la clave en utf-8;
+              si es PONER, "<H" largo del valor y el valor
+
+Cargar es aplicar los registros en orden. Cuando se juntan SAVE_MAX_DELTAS registros
+de cambios, el próximo guardado reescribe el archivo con un registro completo.
+
+Claves:
+    mapa               → id del mapa (utf-8)
+    player, companion  → BODY: hitbox (x, y), posición del sprite y dirección
+    npc/<i>            → NPC_STATE: posición, punto del path y línea de diálogo del NPC i del mapa
+    flag/<nombre>      → FLAG: valor entero (p. ej. "visto/zona1/Bob" = veces que se habló con Bob)
+"""
+import os
+import queue
+import struct
+import threading
+
+import pygame
+from core import settings
+
+MAGIC = b"QSAV"
+VERSION = 1
+HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<BI")
+ENTRY = struct.Struct("<BH")
+LENGTH = struct.Struct("<H")
+
+FULL, DELTA = 0, 1  # tipos de registro
+SET, DELETE = 0, 1  # operaciones de cada entrada
+
+BODY = struct.Struct("<iiddB")
+NPC_STATE = struct.Struct("<ddHH")
+FLAG = struct.Struct("<i")
+
+DIRECTIONS = ["down", "up", "left", "right"]
+
+
+# ---------- ESTADO ↔ BYTES ----------
+def _body(entity):
+    return BODY.pack(entity.hitbox.x, entity.hitbox.y, entity.sprite_pos.x, entity.sprite_pos.y,
+                     DIRECTIONS.index(entity.direction))
+
+
+def capture(game):
+    """Estado actual del juego como clave -> bytes (se llama en el hilo principal)"""
+    scene = game.scene
+    current = scene.map_manager.current_map
+    state = {
+        "mapa": current["id"].encode("utf-8"),
+        "player": _body(scene.player),
+        "companion": _body(scene.companion),
+    }
+    crowd = current.get("crowd")
+    if crowd:
+        crowd.sync_all()  # la multitud tiene las posiciones al día, no los objetos NPC
+    for i, npc in enumerate(current["npcs"]):
+        state[f"npc/{i}"] = NPC_STATE.pack(npc.pos.x, npc.pos.y, npc.path_index, npc.dialogue_index)
+    for name, value in game.flags.items():
+        state[f"flag/{name}"] = FLAG.pack(value)
+    return state
+
+
+def diff(old, new):
+    """Entradas (op, clave, valor) para pasar de `old` a `new`"""
+    entries = [(SET, key, value) for key, value in new.items() if old.get(key) != value]
+    entries += [(DELETE, key, None) for key in old if key not in new]
+    return entries
+
+
+def encode_record(kind, entries):
+    out = bytearray()
+    for op, key, value in entries:
+        raw_key = key.encode("utf-8")
+        out += ENTRY.pack(op, len(raw_key))
+        out += raw_key
+        if op == SET:
+            out += LENGTH.pack(len(value))
+            out += value
+    return RECORD.pack(kind, len(out)) + out
+
+
+def read_state(path):
+    """Estado guardado en un archivo (aplicando todos sus registros) y cuántos registros de cambios tiene"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No se encontró la partida: {path}")
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    magic, version = HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} no es una partida compatible")
+
+    state = {}
+    deltas = 0
+    pos = HEADER.size
+    while pos + RECORD.size <= len(raw):
+        kind, length = RECORD.unpack_from(raw, pos)
+        pos += RECORD.size
+        end = pos + length
+        if end > len(raw):
+            break  # registro a medio escribir (se cortó el juego): se ignora
+        if kind == FULL:
+            state = {}
+        else:
+            deltas += 1
+        while pos < end:
+            op, key_len = ENTRY.unpack_from(raw, pos)
+            pos += ENTRY.size
+            key = raw[pos:pos + key_len].decode("utf-8")
+            pos += key_len
+            if op == SET:
+                (value_len,) = LENGTH.unpack_from(raw, pos)
+                pos += LENGTH.size
+                state[key] = raw[pos:pos + value_len]
+                pos += value_len
+            else:
+                state.pop(key, None)
+    if any(key not in state for key in ("mapa", "player", "companion")):
+        raise ValueError(f"{path} está dañada: no tiene una partida completa")
+    return state, deltas
+
+
+def _place(entity, raw):
+    x, y, sx, sy, direction = BODY.unpack(raw)
+    entity.hitbox.topleft = (x, y)
+    entity.sprite_pos.update(sx, sy)
+    entity.image_rect.topleft = (int(sx), int(sy))
+    entity.direction = DIRECTIONS[direction]
+    entity.is_moving = False
+    entity.update_animation(0, False)
+
+
+def apply(game, state):
+    """
+    Deja el juego como dice `state`. Si el mapa guardado es el actual no se vuelve a
+    armar, y si el prefetcher ya lo tiene listo se toma de ahí (ver MapManager.load_map).
+    """
+    scene = game.scene
+    map_manager = scene.map_manager
+    dialogue = game.dialogue
+    if dialogue.active:
+        dialogue.active = False
+        scene.player.can_move = True
+
+    name = state["mapa"].decode("utf-8")
+    if map_manager.current_map["id"] != name:
+        map_manager.load_map(name)
+    current = map_manager.current_map
+
+    _place(scene.player, state["player"])
+    _place(scene.companion, state["companion"])
+
+    for i, npc in enumerate(current["npcs"]):
+        raw = state.get(f"npc/{i}")
+        if raw is None:
+            continue
+        x, y, path_index, dialogue_index = NPC_STATE.unpack(raw)
+        npc.is_interacting = False
+        npc.dialogue_index = dialogue_index
+        npc.pos.update(x, y)
+        npc.prev_pos.update(x, y)
+        npc.rect.topleft = npc.hitbox.topleft = (round(x), round(y))
+        npc.image_rect.topleft = npc.rect.topleft
+        if npc.path:
+            npc.path_index = path_index % len(npc.path)
+            npc.target_pos = pygame.Vector2(npc.path[npc.path_index])
+        if npc.crowd is None:
+            current["entity_index"].move(npc, npc.hitbox)
+    crowd = current.get("crowd")
+    if crowd:
+        crowd.reload()
+
+    game.flags = {key[5:]: FLAG.unpack(value)[0] for key, value in state.items() if key.startswith("flag/")}
+
+    # Nada de interpolar desde donde estaba antes ni de simular el tiempo que tardó
+    scene.snapshot()
+    game.skip_time = True
+    game.accumulator = 0.0
+    if game.renderer:
+        game.renderer.invalidate()
+
+
+# ---------- ESCRITURA EN SEGUNDO PLANO ----------
+class SaveWriter:
+    def __init__(self):
+        self._jobs = queue.Queue()
+        self._thread = None
+        self.errors = []   # errores de escritura (se relanzan en el hilo principal)
+        self.written = 0   # bytes escritos en la sesión
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                path, data, append = job
+                folder = os.path.dirname(path)
+                if folder:
+                    os.makedirs(folder, exist_ok=True)
+                if append:
+                    with open(path, "ab") as f:
+                        f.write(data)
+                else:
+                    # Archivo nuevo al lado y después se reemplaza: un corte no deja la partida a medias
+                    tmp = path + ".tmp"
+                    with open(tmp, "wb") as f:
+                        f.write(data)
+                    os.replace(tmp, path)
+                self.written += len(data)
+            except Exception as e:
+                self.errors.append(e)
+            finally:
+                self._jobs.task_done()
+
+    def write(self, path, data, append=False):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="save", daemon=True)
+            self._thread.start()
+        self._jobs.put((path, data, append))
+
+    def flush(self):
+        """Espera a que se escriba todo lo pendiente"""
+        if self._thread is not None:
+            self._jobs.join()
+
+
+# Guardado rápido (F5) y carga rápida (F9) de una partida
+class SaveManager:
+    def __init__(self, game, path=None):
+        self.game = game
+        self.path = path or settings.SAVE_PATH
+        self.writer = SaveWriter()
+        self.last = None  # último estado que quedó en el archivo (base de los cambios)
+        self.deltas = 0   # registros de cambios desde el último completo
+
+        # Estadísticas
+        self.saves = 0
+        self.last_bytes = 0
+
+    def save(self, full=False):
+        """
+        Guarda la partida: solo lo que cambió desde el último guardado, o completa si
+        no hay base (primer guardado de la sesión) o se juntaron demasiados cambios.
+        Devuelve los bytes que se mandan a escribir.
+        """
+        if self.writer.errors:
+            raise self.writer.errors.pop(0)
+        state = capture(self.game)
+        if full or self.last is None or self.deltas >= settings.SAVE_MAX_DELTAS:
+            data = HEADER.pack(MAGIC, VERSION) + encode_record(FULL, diff({}, state))
+            self.writer.write(self.path, data)
+            self.deltas = 0
+        else:
+            entries = diff(self.last, state)
+            if not entries:
+                return 0
+            data = encode_record(DELTA, entries)
+            self.writer.write(self.path, data, append=True)
+            self.deltas += 1
+        self.last = state
+        self.saves += 1
+        self.last_bytes = len(data)
+        return len(data)
+
+    def load(self):
+        """Carga la partida guardada (espera a que termine cualquier escritura pendiente)"""
+        self.writer.flush()
+        state, deltas = read_state(self.path)
+        apply(self.game, state)
+        self.last = state
+        self.deltas = deltas
+
+    def close(self):
+        self.writer.flush()
@@ -1,11 +1,38 @@
-import pygame 
+import queue
+import threading
 
-# Clase base para todas las escenas del juego
+from core import settings
+
+
+# Clase base para todas las escenas del juego (menú, overworld, pausa, ...)
 class Scene:
+    # False → la escena no tapa toda la pantalla y se dibuja encima de la de abajo (p. ej. la pausa)
+    opaque = True
+    # True → al sacarla de la pila queda cargada para volver a usarla al instante
+    keep_resident = False
+
     def __init__(self, game):
         self.game = game  # Guarda una referencia al objeto principal del juego
-        self.current_scene = None  # Guarda la escena actual si se está cambiando a otra
+        self.loaded = False  # preload() ya corrió (y unload() todavía no)
+        self.last_active = 0  # último frame en que estuvo arriba de la pila (para el presupuesto)
+
+    # ---------- CARGA ----------
+    def preload(self):
+        """
+        Carga los assets de la escena. La pila lo llama al ponerla arriba (o al volver a
+        ella) si no está cargada; unload() en cambio corre en el hilo de la pila.
+        """
+        pass
 
+    def unload(self):
+        """Libera los assets de la escena (la pila la vuelve a precargar si se necesita)"""
+        pass
+
+    def memory_bytes(self):
+        """Memoria aproximada que ocupa mientras está cargada (para el presupuesto de suspendidas)"""
+        return 0
+
+    # ---------- CICLO DE VIDA EN LA PILA ----------
     # Método que se llama al entrar en la escena
     def on_enter(self):
         pass  # Se puede sobreescribir en subclases para inicializar elementos
@@ -14,22 +41,186 @@ class Scene:
     def on_exit(self):
         pass  # Se puede sobreescribir en subclases para limpiar recursos
 
-    # Maneja eventos básicos de Pygame
-    def handle_events(self):
-        for event in pygame.event.get():  # Recorre todos los eventos de la cola
-            if event.type == pygame.QUIT:  # Si se cierra la ventana
-                self.game.running = False  # Detiene el loop principal del juego
+    def on_suspend(self):
+        """Otra escena quedó encima (esta conserva su estado)"""
+        pass
+
+    def on_resume(self):
+        """Volvió a quedar arriba de la pila"""
+        pass
 
     # Cambia a otra escena
     def change_scene(self, new_scene):
-        self.current_scene = new_scene  # Guarda la nueva escena como la actual
+        self.game.scenes.replace(new_scene)  # Reemplaza esta escena por la nueva en la pila
+
+    # ---------- FRAME ----------
+    def handle_events(self, events):
+        pass
 
-    # Actualiza la escena (se llama cada frame)
-    def update(self, dt):
-        if self.current_scene:  # Si hay una escena activa
-            self.current_scene.update(dt)  # Llama al update de la escena actual
+    # Actualiza la escena (se llama cada frame mientras está arriba de la pila)
+    def update(self, dt, events):
+        self.handle_events(events)
 
     # Dibuja la escena en pantalla
     def draw(self, screen):
-        if self.current_scene:  # Si hay una escena activa
-            self.current_scene.draw(screen)  # Llama al draw de la escena actual
+        pass
+
+
+# Pila de escenas: solo la de arriba se actualiza; las de abajo quedan suspendidas
+# con sus assets y su estado, mientras entren en el presupuesto de memoria
+class SceneStack:
+    def __init__(self, game, budget_bytes=None):
+        self.game = game
+        self.budget_bytes = budget_bytes if budget_bytes is not None else settings.SCENE_BUDGET_MB * 1024 * 1024
+        self.scenes = []    # de abajo hacia arriba
+        self.resident = []  # escenas que salieron de la pila pero siguen cargadas (keep_resident)
+        self.frame = 0
+
+        # Descargas fuera del frame: un hilo que atiende una cola de trabajos
+        self._jobs = queue.Queue()
+        self._thread = None
+        self._errors = []   # errores de trabajos en segundo plano (se relanzan en el hilo principal)
+        self._lock = threading.RLock()  # una escena no se carga y descarga a la vez
+
+        # Estadísticas
+        self.preloads = 0
+        self.unloads = 0
+
+    @property
+    def top(self):
+        return self.scenes[-1] if self.scenes else None
+
+    # ---------- TRABAJOS EN SEGUNDO PLANO ----------
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                job()
+            except Exception as e:
+                self._errors.append(e)
+
+    def schedule(self, job):
+        """Corre job() en el hilo de la pila (fuera del frame)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="scenes", daemon=True)
+            self._thread.start()
+        self._jobs.put(job)
+
+    def _load(self, scene):
+        with self._lock:
+            if not scene.loaded:
+                scene.preload()
+                scene.loaded = True
+                self.preloads += 1
+
+    def _unload(self, scene):
+        with self._lock:
+            # Pudo haber vuelto arriba de la pila mientras esperaba en la cola
+            if scene.loaded and scene is not self.top:
+                scene.unload()
+                scene.loaded = False
+                self.unloads += 1
+
+    # ---------- PILA ----------
+    def push(self, scene):
+        """
+        Pone una escena arriba de todo (si no está cargada se carga acá mismo; el overworld
+        llega ya armado por el BootLoader, que lo construye mientras se ve el menú).
+        """
+        with self._lock:
+            self._load(scene)
+            if scene in self.resident:
+                self.resident.remove(scene)
+            top = self.top
+            if top is not None:
+                top.on_suspend()
+            self.scenes.append(scene)
+        scene.last_active = self.frame
+        scene.on_enter()
+        self.trim()
+
+    def pop(self):
+        """Saca la escena de arriba y reanuda la anterior (sin recargar nada si sigue cargada)"""
+        with self._lock:
+            scene = self.scenes.pop()
+        scene.on_exit()
+        self._release(scene)
+        top = self.top
+        if top is not None:
+            self._load(top)  # solo si el presupuesto la había descargado
+            top.last_active = self.frame
+            top.on_resume()
+        self.trim()
+        return scene
+
+    def replace(self, scene):
+        """Cambia la escena de arriba por otra (p. ej. menú → overworld)"""
+        if self.scenes:
+            with self._lock:
+                old = self.scenes.pop()
+            old.on_exit()
+            self._release(old)
+        self.push(scene)
+
+    def find(self, cls):
+        """Escena de esa clase que esté en la pila o residente (o None)"""
+        for scene in reversed(self.scenes + self.resident):
+            if isinstance(scene, cls):
+                return scene
+        return None
+
+    def _release(self, scene):
+        if scene.keep_resident:
+            if scene not in self.resident:
+                self.resident.append(scene)
+        else:
+            self.schedule(lambda: self._unload(scene))
+
+    def _visible_from(self):
+        """Índice de la primera escena que se dibuja (la última opaca)"""
+        for i in range(len(self.scenes) - 1, -1, -1):
+            if self.scenes[i].opaque:
+                return i
+        return 0
+
+    def trim(self):
+        """
+        Descarga las escenas suspendidas usadas hace más tiempo si se pasan del presupuesto
+        (las que se ven debajo de una escena no opaca no cuentan como suspendidas).
+        """
+        suspended = [s for s in self.scenes[:self._visible_from()] + self.resident if s.loaded]
+        total = sum(s.memory_bytes() for s in suspended)
+        for scene in sorted(suspended, key=lambda s: s.last_active):
+            if total <= self.budget_bytes:
+                break
+            total -= scene.memory_bytes()
+            if scene in self.resident:
+                self.resident.remove(scene)
+            self.schedule(lambda scene=scene: self._unload(scene))
+
+    # ---------- FRAME ----------
+    def update(self, dt, events):
+        """Actualiza la escena de arriba"""
+        self.frame += 1
+        if self._errors:
+            raise self._errors.pop(0)
+
+        top = self.top
+        if top is not None:
+            top.last_active = self.frame
+            top.update(dt, events)
+
+    def draw(self, screen):
+        """Dibuja desde la última escena opaca hasta la de arriba"""
+        for scene in self.scenes[self._visible_from():]:
+            scene.draw(screen)
+
+    def stats(self):
+        return {
+            "stack": [type(s).__name__ for s in self.scenes],
+            "resident": [type(s).__name__ for s in self.resident],
+            "suspended_bytes": sum(s.memory_bytes() for s in self.scenes[:self._visible_from()] + self.resident
+                                   if s.loaded),
+            "preloads": self.preloads,
+            "unloads": self.unloads,
+        }
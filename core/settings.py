@@ -25,4 +25,113 @@ MUSIC_DIR = f"{ASSETS_DIR}/music"
 
 SOUNDS_DIR = f"{ASSETS_DIR}/sounds"
 
-FONTS_DIR = f"{ASSETS_DIR}/fonts"
\ No newline at end of file
+FONTS_DIR = f"{ASSETS_DIR}/fonts"
+
+#cache de imagenes (memoria maxima en MB antes de descartar las menos usadas)
+ASSET_CACHE_BUDGET_MB = 128
+
+
+#precarga en segundo plano de los mapas vecinos (saltos del grafo de conexiones/teleports)
+PREFETCH_ENABLED = True
+PREFETCH_DEPTH = 2
+
+
+#usar los mapas compilados (python -m mundos.map_compiler) cuando esten al dia con el JSON
+USE_COMPILED_MAPS = True
+
+
+#tamanio de celda (px) de los indices espaciales de colisiones, triggers y NPCs
+SPATIAL_CELL_SIZE = 64
+
+
+#renderer por rectangulos sucios: solo redibuja lo que se movio (util en maquinas lentas / VMs)
+DIRTY_RECTS = False
+
+
+#prehorneado de capas estaticas (background + props que no se cruzan con nada que se mueve)
+PREBAKE_STATIC = True
+PREBAKE_GRID = 16                 #grilla (px) para calcular la zona caminable
+PREBAKE_HITBOX = (32, 24)         #hitbox del player/companion
+PREBAKE_SPRITE_SIZE = (128, 128)  #sprite mas grande que se apoya en esa hitbox (Lenard 2x)
+PREBAKE_COMPANION_MARGIN = 96     #distancia maxima a la que la companion anda del player
+DEBUG_PREBAKE = False             #empezar con el resaltado de props horneados (F3)
+
+
+#simulacion a paso fijo (Hz), independiente de los FPS de dibujo
+SIM_HZ = 60
+#tiempo maximo que se simula en un frame (evita la "espiral" de pasos despues de un tiron)
+MAX_FRAME_TIME = 0.25
+#interpolar la posicion de los sprites entre los dos ultimos pasos al dibujar
+INTERPOLATE = True
+
+
+#profiler por fases (F2 muestra el overlay; F4 exporta la sesion a PROFILER_EXPORT)
+PROFILER_ENABLED = False
+PROFILER_WINDOW = 120
+PROFILER_EXPORT = "profiler_sesion.csv"
+PROFILER_SESSION_FRAMES = 18000   #frames que se guardan para exportar (los ultimos; 5 minutos a 60 FPS)
+
+
+#backgrounds por chunks para mapas mas grandes que la pantalla (python -m mundos.chunks)
+CHUNKED_BACKGROUNDS = True
+CHUNK_SIZE = 256
+#pixeles alrededor de la vista que se mantienen cargados
+CHUNK_MARGIN = 128
+
+
+#multitudes: los NPCs que caminan avanzan juntos con NumPy (si esta instalado)
+CROWD_ENGINE = True
+#con menos NPCs que caminan conviene moverlos de a uno
+CROWD_MIN_NPCS = 16
+
+
+#navegacion: grilla de celdas pisables (cacheada en mapas/compilados/nav), A* y flow fields
+NAV_ENABLED = True
+NAV_CELL = 16
+#hitbox de referencia (la de la companion)
+NAV_AGENT = (32, 24)
+#alcance del flow field hacia el player (en celdas)
+NAV_FLOW_RADIUS = 128
+
+
+#atlas de sprites de personajes (metadata en ATLAS_DIR; python -m core.atlas compila las hojas)
+ATLAS_ENABLED = True
+ATLAS_DIR = "assets/atlas"
+#ancho maximo de cada hoja
+ATLAS_MAX_WIDTH = 2048
+
+
+#imagenes horneadas (python -m core.bake): pixeles ya escalados que se mapean a memoria
+BAKED_ASSETS = True
+BAKE_DIR = "assets/compilados/imagenes"
+
+
+#props con "collision": "mask" chocan solo con los pixeles visibles (alfa mayor al umbral)
+PROP_MASK_THRESHOLD = 127
+#celda de los rects que cubren la mascara (navegacion y prehorneado)
+PROP_MASK_CELL = 8
+
+
+#pila de escenas: memoria maxima de las escenas suspendidas (las mas viejas se descargan)
+SCENE_BUDGET_MB = 64
+
+
+#partidas guardadas: archivo del guardado rapido (F5 guarda, F9 carga)
+SAVE_PATH = "saves/quicksave.qsv"
+
+#registros de cambios que se juntan antes de reescribir la partida completa
+SAVE_MAX_DELTAS = 32
+
+
+#base de dialogos (los NPCs la usan por id; python -m ui.dialogue_db la compila)
+DIALOGUE_DB = "assets/dialogos/dialogos.json"
+
+
+#presupuesto de memoria para todas las superficies (F6 muestra las mas grandes)
+MEMORY_BUDGET_MB = 256
+MEMORY_DUMP_TOP = 20
+
+
+#recarga en caliente de los JSON de mapas (modo desarrollo; tambien main.py --hot-reload)
+HOT_RELOAD_MAPS = False
+HOT_RELOAD_INTERVAL = 0.5         #segundos entre cada revision de los archivos
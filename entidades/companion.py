@@ -1,53 +1,15 @@
 import pygame 
-import os  # Para manejar rutas de archivos
 from entidades.player import Player  # Importa la clase base Player
+from mundos.spatial import colliding  # Broadphase de colisiones
 
 # Clase Companion que hereda de Player
 class Companion(Player):
 
-    # Ruta base donde están los sprites del companion
-    BASE_PATH = os.path.join("assets", "images", "sprites", "overworld", "pika")
-
-    @staticmethod
-    def load(img_name):
-        """
-        Carga una imagen del companion desde la carpeta BASE_PATH
-        """
-        p = os.path.join(Companion.BASE_PATH, img_name)  # Construye la ruta completa
-        if not os.path.exists(p):  # Verifica que el archivo exista
-            raise FileNotFoundError(f"[Companion] Imagen no encontrada: {p}")
-        img = pygame.image.load(p).convert_alpha()  # Carga la imagen con transparencia
-        img = pygame.transform.scale_by(img, 1.6)  # Escala la imagen 1.6x
-        return img
+    # Atlas con los frames del companion (assets/atlas/pika.json, escalado 1.6x)
+    ATLAS = "pika"
 
     def __init__(self, x, y):
-        super().__init__(x, y)  # Llama al constructor del Player base
-
-        load = Companion.load  # Alias para facilitar la carga de sprites
-
-        # Diccionario con las animaciones para cada dirección
-        self.animations = {
-            "down": [
-                load("id_down_pika.png"), load("w1_down_pika.png"),
-                load("id_down_pika.png"), load("w2_down_pika.png")
-            ],
-            "up": [
-                load("id_up_pika.png"), load("w1_up_pika.png"),
-                load("id_up_pika.png"), load("w2_up_pika.png")
-            ],
-            "left": [
-                load("id_left_pika.png"), load("w1_left_pika.png"),
-                load("id_left_pika.png"), load("w2_left_pika.png")
-            ],
-            "right": [
-                load("id_right_pika.png"), load("w1_right_pika.png"),
-                load("id_right_pika.png"), load("w2_right_pika.png")
-            ]
-        }
-
-        # Imagen inicial del companion
-        self.image = self.animations[self.direction][0]
-        self.image_rect = self.image.get_rect(topleft=self.sprite_pos.xy)  # Rect de la imagen
+        super().__init__(x, y)  # Llama al constructor del Player base (ya usa el atlas de Pika)
 
         self.follow_speed = 190  # Velocidad a la que sigue al player
 
@@ -73,22 +35,21 @@ class Companion(Player):
             collisions = []
 
         # Mover hitbox en eje X
+        # (colliding consulta el índice espacial en vez de recorrer todas las paredes)
         self.hitbox.x += int(round(dx))
-        for c in collisions:
-            if self.hitbox.colliderect(c):
-                if dx > 0:
-                    self.hitbox.right = c.left
-                elif dx < 0:
-                    self.hitbox.left = c.right
+        for c in colliding(collisions, self.hitbox):
+            if dx > 0:
+                self.hitbox.right = c.left
+            elif dx < 0:
+                self.hitbox.left = c.right
 
         # Mover hitbox en eje Y
         self.hitbox.y += int(round(dy))
-        for c in collisions:
-            if self.hitbox.colliderect(c):
-                if dy > 0:
-                    self.hitbox.bottom = c.top
-                elif dy < 0:
-                    self.hitbox.top = c.bottom
+        for c in colliding(collisions, self.hitbox):
+            if dy > 0:
+                self.hitbox.bottom = c.top
+            elif dy < 0:
+                self.hitbox.top = c.bottom
 
         # Sincronizar sprite con hitbox
         self.sprite_pos.x = self.hitbox.x - (self.image_rect.width - self.hitbox.width) // 2
@@ -101,7 +62,7 @@ class Companion(Player):
         Si se mueve → cambia frames; si no → imagen idle.
         """
         if moving:
-            self.frame_index += self.animation_speed
+            self.frame_index += self.animation_speed * dt
             if self.frame_index >= len(self.animations[self.direction]):
                 self.frame_index = 0.0
             self.image = self.animations[self.direction][int(self.frame_index)]
@@ -109,11 +70,13 @@ class Companion(Player):
             self.frame_index = 0.0
             self.image = self.animations[self.direction][0]
 
-    def follow(self, target, dt):
+    def follow(self, target, dt, collisions=None, nav=None):
         """
         Hace que el companion siga al player.
         target → objeto a seguir
         dt → delta time para movimiento suave
+        collisions → paredes del mapa (si se pasan, se mueve con move_both y no las atraviesa)
+        nav → NavGrid del mapa: si no hay línea recta libre hasta el player, rodea por el flow field
         """
         # Si el player no se mueve → idle
         if not getattr(target, "is_moving", True):
@@ -151,19 +114,31 @@ class Companion(Player):
         nx = dx / dist
         ny = dy / dist
 
-        # Aplicar movimiento con velocidad
-        self.hitbox.x += nx * self.follow_speed * dt
-        self.hitbox.y += ny * self.follow_speed * dt
+        # Si hay una pared en el medio, seguir el flow field hacia el player
+        if nav is not None and not nav.clear_line(self.hitbox.center, (goal_x, goal_y)):
+            around = nav.flow_direction(self.hitbox.center, target.hitbox.center)
+            if around:
+                nx, ny = around
 
         # Determinar dirección según movimiento
-        if abs(dx) > abs(dy):
-            self.direction = "right" if dx > 0 else "left"
+        if abs(nx) > abs(ny):
+            self.direction = "right" if nx > 0 else "left"
         else:
-            self.direction = "down" if dy > 0 else "up"
+            self.direction = "down" if ny > 0 else "up"
 
         # Actualizar animación según dirección y movimiento
         self.update_animation(dt, moving=True)
 
+        # Aplicar movimiento con velocidad
+        # (con colisiones, salvo que haya quedado encimada a una pared: ahí se suelta sola)
+        step_x = nx * self.follow_speed * dt
+        step_y = ny * self.follow_speed * dt
+        if collisions is not None and not any(True for _ in colliding(collisions, self.hitbox)):
+            self.move_both(step_x, step_y, collisions)
+            return
+        self.hitbox.x += step_x
+        self.hitbox.y += step_y
+
         # Sincronizar sprite con hitbox
         self.sprite_pos.x = self.hitbox.x - (self.image_rect.width - self.hitbox.width) // 2
         self.sprite_pos.y = self.hitbox.y - (self.image_rect.height - self.hitbox.height)
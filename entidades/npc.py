@@ -1,6 +1,8 @@
 # entidades/npc.py
 import pygame
 import math    # Librería para cálculos matemáticos (distancias, vectores, etc.)
+from core import atlas  # Frames de NPCs en hojas compartidas (assets/atlas/npcs.json)
+from ui import dialogue_db  # Guiones de los NPCs (assets/dialogos/dialogos.json)
 
 # Clase que representa un NPC en el juego
 class NPC:
@@ -8,22 +10,21 @@ class NPC:
         # Nombre del NPC
         self.name = data["name"]
         
-        # Sprite principal del NPC
-        self.image = pygame.image.load(data["sprite"]).convert_alpha()
-
-        # Escalado opcional del sprite
-        scale = data.get("scale", 1.0)
-        if scale != 1.0:
-            w = int(self.image.get_width() * scale)
-            h = int(self.image.get_height() * scale)
-            self.image = pygame.transform.scale(self.image, (w, h))
+        # Sprite principal del NPC con escalado opcional (del atlas si está, si no de la cache; compartido entre mapas)
+        self.image = atlas.sprite(data["sprite"], data.get("scale", 1.0))
 
         # Posición y rectángulo de colisión
         self.rect = self.image.get_rect(topleft=(data.get("x", 0), data.get("y", 0)))
         self.hitbox = self.rect.copy()  # Hitbox separada para colisiones
 
-        # Diálogo del NPC (lista de strings)
-        self.dialogue = data.get("dialogue", [])
+        # Posición exacta (con decimales) y la del paso anterior, para interpolar al dibujar
+        self.pos = pygame.Vector2(self.rect.topleft)
+        self.prev_pos = self.pos.copy()
+        self.image_rect = self.rect.copy()  # donde se dibuja (puede quedar entre dos pasos)
+
+        # Diálogo del NPC: id en la base de diálogos (o lista de strings si el mapa lo trae escrito)
+        # Las líneas se leen recién al hablarle (ver la propiedad dialogue)
+        self.dialogue_ref = data.get("dialogue", [])
         self.dialogue_index = 0  # Índice para avanzar en los diálogos
         self.is_interacting = False  # True si el jugador está interactuando
 
@@ -33,10 +34,17 @@ class NPC:
         # Movimiento opcional
         self.walk_speed = data.get("walk_speed", 0)  # Velocidad de caminata
         self.path = data.get("path", [])             # Lista de puntos a recorrer
+        self.pathfind = data.get("pathfind", False)   # True → rodear paredes entre los puntos (A*)
         self.path_index = 0                           # Índice del punto actual
         self.target_pos = None                        # Posición objetivo
         if self.walk_speed > 0 and self.path:
             self.target_pos = pygame.Vector2(self.path[0])  # Inicializa el primer objetivo
+        self.crowd = None  # CrowdEngine que lo mueve junto con el resto (mundos/crowd.py), si hay
+
+    @property
+    def dialogue(self):
+        """Líneas del diálogo (dialogue_db.Line)"""
+        return dialogue_db.lines(self.dialogue_ref)
 
     def update(self, dt):
         """
@@ -67,12 +75,21 @@ class NPC:
         # Normalizar vector y mover NPC según velocidad y dt
         vec = vec.normalize()
         movement = vec * self.walk_speed * dt
-        self.rect.x += movement.x
-        self.rect.y += movement.y
+        self.pos += movement
+        self.rect.topleft = (round(self.pos.x), round(self.pos.y))
         
         # Sincronizar hitbox con rect
         self.hitbox.topleft = self.rect.topleft
 
+    def snapshot(self):
+        """Guarda la posición actual antes de un paso de simulación"""
+        self.prev_pos.update(self.pos)
+
+    def interpolate(self, alpha):
+        """Ubica el sprite entre la posición del paso anterior y la actual (solo para dibujar)"""
+        pos = self.prev_pos.lerp(self.pos, alpha)
+        self.image_rect.topleft = (round(pos.x), round(pos.y))
+
     def interact(self):
         """
         Inicia la interacción con el jugador.
@@ -89,8 +106,9 @@ class NPC:
         self.is_interacting = False
         self.dialogue_index = 0
 
-    def draw(self, screen):
+    def draw(self, screen, offset=(0, 0)):
         """
         Dibuja el sprite del NPC en pantalla.
+        offset = posición de la cámara (se resta a las coordenadas de mundo).
         """
-        screen.blit(self.image, self.rect)
+        screen.blit(self.image, (self.image_rect.x - offset[0], self.image_rect.y - offset[1]))
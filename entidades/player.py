@@ -1,36 +1,26 @@
 import pygame  # Librería para gráficos y eventos
-import os      # Librería para manejo de rutas de archivos
+from mundos.spatial import colliding  # Broadphase de colisiones
+from core import controls  # Teclado real o input guionado (headless / replays)
+from core.atlas import load_atlas  # Hojas de sprites ya escaladas (assets/atlas)
 
 # Clase que representa al jugador principal
 class Player:
+
+    # Atlas con los frames del personaje
+    ATLAS = "lenard"
+
     def __init__(self, x, y):
         # Posición visual del sprite
         self.sprite_pos = pygame.Vector2(x, y)
 
         # Animación
         self.frame_index = 0.0        # Índice del frame actual
-        self.animation_speed = 0.1    # Velocidad de animación
+        self.animation_speed = 6      # Velocidad de animación (frames por segundo)
         self.direction = "down"       # Dirección inicial
         self.can_move = True          # Indica si puede moverse
 
-        # Cargar sprites del jugador
-        base_path = os.path.join("assets", "images", "sprites", "overworld", "lenard")
-        def load(img_name):
-            """Carga y escala imágenes del jugador"""
-            p = os.path.join(base_path, img_name)
-            if not os.path.exists(p):
-                raise FileNotFoundError(f"Imagen no encontrada: {p}")
-            img = pygame.image.load(p).convert_alpha()
-            img = pygame.transform.scale_by(img, 2)  # Escalar imagen 2x
-            return img
-
-        # Diccionario de animaciones por dirección
-        self.animations = {
-            "down": [load("id_down.png"), load("down_w1.png"), load("id_down.png"), load("down_w2.png")],
-            "up":   [load("id_up.png"), load("up_w1.png"), load("id_up.png"), load("up_w2.png")],
-            "left": [load("id_left.png"), load("left_w1.png"), load("id_left.png"), load("left_w2.png")],
-            "right":[load("id_right.png"), load("right_w1.png"), load("id_right.png"), load("right_w2.png")]
-        }
+        # Animaciones por dirección: frames del atlas de Lenard (assets/atlas/lenard.json, escalado 2x)
+        self.animations = load_atlas(self.ATLAS).animations
 
         # Imagen inicial y rect visual
         self.image = self.animations[self.direction][0]
@@ -49,6 +39,22 @@ class Player:
         # Estado de movimiento (True si hay tecla mantenida)
         self.is_moving = False
 
+        # Posición del sprite en el paso de simulación anterior (para interpolar al dibujar)
+        self.prev_pos = self.sprite_pos.copy()
+
+    # ---------- INTERPOLACIÓN ----------
+    def snapshot(self):
+        """Guarda la posición actual antes de un paso de simulación"""
+        self.prev_pos.update(self.sprite_pos)
+
+    def interpolate(self, alpha):
+        """
+        Ubica el sprite entre la posición del paso anterior y la actual.
+        alpha = fracción de paso ya transcurrida (0..1); solo afecta al dibujo.
+        """
+        pos = self.prev_pos.lerp(self.sprite_pos, alpha)
+        self.image_rect.topleft = (int(pos.x), int(pos.y))
+
     # ---------- MOVIMIENTOS EXPLÍCITOS ----------
     def move_sprite(self, dx, dy):
         """Mueve solo el sprite visual (no hitbox)"""
@@ -70,22 +76,21 @@ class Player:
             collisions = []
 
         # Movimiento en eje X con colisiones
+        # (colliding consulta el índice espacial en vez de recorrer todas las paredes)
         self.hitbox.x += int(round(dx))
-        for c in collisions:
-            if self.hitbox.colliderect(c):
-                if dx > 0:
-                    self.hitbox.right = c.left
-                elif dx < 0:
-                    self.hitbox.left = c.right
+        for c in colliding(collisions, self.hitbox):
+            if dx > 0:
+                self.hitbox.right = c.left
+            elif dx < 0:
+                self.hitbox.left = c.right
 
         # Movimiento en eje Y con colisiones
         self.hitbox.y += int(round(dy))
-        for c in collisions:
-            if self.hitbox.colliderect(c):
-                if dy > 0:
-                    self.hitbox.bottom = c.top
-                elif dy < 0:
-                    self.hitbox.top = c.bottom
+        for c in colliding(collisions, self.hitbox):
+            if dy > 0:
+                self.hitbox.bottom = c.top
+            elif dy < 0:
+                self.hitbox.top = c.bottom
 
         # Sincronizar sprite visual con hitbox
         self.sprite_pos.x = self.hitbox.x - (self.image_rect.width - self.hitbox.width) // 2
@@ -103,7 +108,7 @@ class Player:
             self.is_moving = False
             return
 
-        keys = pygame.key.get_pressed()  # Detecta teclas presionadas
+        keys = controls.get_pressed()  # Detecta teclas presionadas
         dx = 0.0
         dy = 0.0
         moving = False
@@ -137,7 +142,7 @@ class Player:
     def update_animation(self, dt, moving):
         """Actualiza la animación del jugador"""
         if moving:
-            self.frame_index += self.animation_speed
+            self.frame_index += self.animation_speed * dt
             if self.frame_index >= len(self.animations[self.direction]):
                 self.frame_index = 0.0
         else:
@@ -160,7 +165,7 @@ class Player:
         self.handle_input(dt, collisions)
         self.update_animation(dt, self.is_moving)
 
-    def draw(self, surface):
-        """Dibuja el jugador en pantalla"""
-        surface.blit(self.image, self.image_rect)
+    def draw(self, surface, offset=(0, 0)):
+        """Dibuja el jugador en pantalla (offset = posición de la cámara)"""
+        surface.blit(self.image, (self.image_rect.x - offset[0], self.image_rect.y - offset[1]))
         # pygame.draw.rect(surface, (255,0,0), self.hitbox, 1)  # debug hitbox
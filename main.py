@@ -1,41 +1,47 @@
+import argparse
 import pygame
 from core.game import Game
-from ui.menu import Menu
 
-if __name__ == "__main__":
-    pygame.init()
-    screen = pygame.display.set_mode((800, 600))
-    pygame.display.set_caption("Proyecto QUIMERA")
 
-    menu = Menu(screen)
-    clock = pygame.time.Clock()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Proyecto QUIMERA")
+    parser.add_argument("--headless", action="store_true",
+                        help="corre sin ventana ni límite de FPS con input guionado y muestra tiempos")
+    parser.add_argument("--frames", type=int, default=None, help="frames a simular (headless)")
+    parser.add_argument("--dt", type=float, default=None,
+                        help="paso de tiempo fijo en segundos (headless); por defecto el del guion")
+    parser.add_argument("--script", default=None, help="guion de input en JSON (headless)")
+    parser.add_argument("--report", default=None, help="guardar el reporte en JSON (headless)")
+    parser.add_argument("--profile", default=None,
+                        help="medir tiempos por fase y exportarlos a .csv o .json (headless)")
+    parser.add_argument("--record", default=None, help="grabar el input de la partida en un replay (.qrp)")
+    parser.add_argument("--replay", default=None, help="reproducir un replay (.qrp) desde zona1")
+    parser.add_argument("--hot-reload", action="store_true",
+                        help="aplicar los cambios de los JSON de mapas sin reiniciar (modo desarrollo)")
+    return parser.parse_args()
 
-    in_menu = True
-    running = True
-    game = None  # Inicializar la variable
 
-    while running:
-        dt = clock.tick(60) / 1000  # tiempo en segundos
-        events = pygame.event.get()
+if __name__ == "__main__":
+    args = parse_args()
+    if args.hot_reload:
+        from core import settings
+        settings.HOT_RELOAD_MAPS = True
+    if args.headless:
+        from core import headless
+        headless.main(args)
+        raise SystemExit
 
-        for event in events:
-            if event.type == pygame.QUIT:
-                running = False
+    pygame.init()
 
-        if in_menu:
-            # Delegar eventos al menú
-            for event in events:
-                result = menu.handle_event(event)
-                if result == "Jugar":
-                    game = Game()
-                    in_menu = False
-                elif result == "Salir":
-                    running = False
+    if args.record or args.replay:
+        # Grabar / reproducir arranca directo en zona1 (sin menú) para que el inicio sea siempre igual
+        game = Game()
+        if args.replay:
+            game.start_replay(args.replay)
+        if args.record:
+            game.start_recording(args.record)
+        game.run()
+        raise SystemExit
 
-            menu.update(dt)
-            menu.draw()
-            pygame.display.flip()
-        else:
-            # Delegar todo al juego
-            # Suponiendo que Game.run() acepta dt y lista de eventos
-            game.run(dt, events)  # Esto debe contener su propio loop de juego interno
+    # Menú principal: su primer frame sale enseguida y el resto del juego carga detrás
+    Game(menu=True).run()
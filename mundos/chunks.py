@@ -0,0 +1,162 @@
+"""
+Backgrounds por chunks: los fondos más grandes que la pantalla se cortan en tiles y en
+el juego solo se mantienen decodificados los que están cerca de la vista de la cámara.
+
+Uso:
+    python -m mundos.chunks            # corta los backgrounds más grandes que la pantalla
+    python -m mundos.chunks --all      # corta todos los backgrounds
+    python -m mundos.chunks zona6 ...  # solo esos mapas
+
+Cada mapa queda en mundos/mapas/compilados/chunks/<mapa>/ con un index.json y un PNG por
+chunk. Si el background cambia (otro mtime/tamaño), el índice deja de usarse hasta volver
+a cortarlo y el mapa carga la imagen completa como siempre.
+"""
+import json
+import os
+import sys
+
+import pygame
+from core import memory, settings
+
+MAPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mapas")
+CHUNKS_DIR = os.path.join(MAPS_DIR, "compilados", "chunks")
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def split_background(name, bg_path, out_dir=CHUNKS_DIR, chunk_size=None):
+    """Corta el background de un mapa en chunks y escribe su índice. Devuelve la cantidad de chunks"""
+    if not os.path.exists(bg_path):
+        raise FileNotFoundError(f"Background no encontrado: {bg_path}")
+    chunk_size = chunk_size or settings.CHUNK_SIZE
+    image = pygame.image.load(bg_path)
+    width, height = image.get_size()
+
+    map_dir = os.path.join(out_dir, name)
+    os.makedirs(map_dir, exist_ok=True)
+    files = {}
+    for cy in range(0, (height + chunk_size - 1) // chunk_size):
+        for cx in range(0, (width + chunk_size - 1) // chunk_size):
+            area = pygame.Rect(cx * chunk_size, cy * chunk_size, chunk_size, chunk_size).clip(image.get_rect())
+            file = f"{cx}_{cy}.png"
+            pygame.image.save(image.subsurface(area), os.path.join(map_dir, file))
+            files[f"{cx},{cy}"] = file
+
+    mtime_ns, size = _source_stamp(bg_path)
+    index = {
+        "source": bg_path,
+        "mtime_ns": mtime_ns,
+        "bytes": size,
+        "size": [width, height],
+        "chunk": chunk_size,
+        "files": files,
+    }
+    with open(os.path.join(map_dir, "index.json"), "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    return len(files)
+
+
+def load_chunked(name, bg_path, chunks_dir):
+    """ChunkedBackground del mapa si hay chunks al día con el background; si no, None"""
+    index_path = os.path.join(chunks_dir, name, "index.json")
+    if not os.path.exists(index_path) or not os.path.exists(bg_path):
+        return None
+    with open(index_path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("source") != bg_path or (index.get("mtime_ns"), index.get("bytes")) != _source_stamp(bg_path):
+        return None
+    return ChunkedBackground(os.path.join(chunks_dir, name), index, name)
+
+
+# Background de un mapa grande: solo se decodifican los chunks cerca de la vista
+class ChunkedBackground:
+    def __init__(self, folder, index, name=None):
+        self.folder = folder
+        self.owner = f"mapa:{name}" if name else "mapa"  # dueño de los chunks en la cuenta de memoria
+        self.size = tuple(index["size"])
+        self.chunk = index["chunk"]
+        self.files = {tuple(int(v) for v in key.split(",")): file for key, file in index["files"].items()}
+        self.loaded = {}  # (cx, cy) -> superficie ya convertida
+
+        # Contadores
+        self.loads = 0
+        self.drops = 0
+
+    def _cells(self, rect):
+        c = self.chunk
+        x0, y0 = max(0, rect.left // c), max(0, rect.top // c)
+        x1, y1 = (rect.right - 1) // c, (rect.bottom - 1) // c
+        return [(cx, cy) for cy in range(y0, y1 + 1) for cx in range(x0, x1 + 1) if (cx, cy) in self.files]
+
+    def _get(self, cell):
+        surface = self.loaded.get(cell)
+        if surface is None:
+            path = os.path.join(self.folder, self.files[cell])
+            surface = pygame.image.load(path).convert()
+            memory.track(surface, self.owner, path)
+            self.loaded[cell] = surface
+            self.loads += 1
+        return surface
+
+    def update(self, view):
+        """
+        Deja en memoria solo los chunks que tocan la vista (más CHUNK_MARGIN alrededor):
+        carga los que faltan antes de que entren en pantalla y suelta los que quedaron lejos.
+        """
+        wanted = set(self._cells(view.inflate(2 * settings.CHUNK_MARGIN, 2 * settings.CHUNK_MARGIN)))
+        for cell in list(self.loaded):
+            if cell not in wanted:
+                del self.loaded[cell]
+                self.drops += 1
+        for cell in wanted:
+            self._get(cell)
+
+    def draw(self, screen, offset, area):
+        """Dibuja los chunks que tocan `area` (rect de pantalla); offset = posición de la cámara"""
+        ox, oy = offset
+        world = area.move(ox, oy)
+        c = self.chunk
+        for cell in self._cells(world):
+            x, y = cell[0] * c, cell[1] * c
+            src = world.clip(pygame.Rect(x, y, c, c))
+            screen.blit(self._get(cell), (src.x - ox, src.y - oy), src.move(-x, -y))
+
+    def stats(self):
+        return {"loaded": len(self.loaded), "total": len(self.files), "loads": self.loads, "drops": self.drops}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    everything = "--all" in argv
+    only = [a for a in argv if not a.startswith("--")]
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+
+    count = 0
+    for file in sorted(os.listdir(MAPS_DIR)):
+        if not file.endswith(".json"):
+            continue
+        name = file[:-5]
+        if only and name not in only:
+            continue
+        with open(os.path.join(MAPS_DIR, file), "r", encoding="utf-8") as f:
+            bg_path = json.load(f).get("background")
+        if not bg_path or not os.path.exists(bg_path):
+            continue
+        width, height = pygame.image.load(bg_path).get_size()
+        if not (everything or only) and width <= settings.SCREEN_WIDTH and height <= settings.SCREEN_HEIGHT:
+            continue
+        chunks = split_background(name, bg_path)
+        print(f"{name}: {chunks} chunks")
+        count += 1
+
+    print(f"{count} backgrounds cortados en {CHUNKS_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+import pygame
+from core import settings
+
+# NumPy es opcional: sin NumPy los NPCs caminan de a uno con NPC._walk, como siempre
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def available():
+    return np is not None
+
+
+# Multitudes: todos los NPCs que caminan en un mapa avanzan juntos en un solo paso con NumPy.
+# Misma lógica que NPC._walk: ir hacia el punto actual del path desde el centro del rect
+# y, al quedar a menos de 2 px, pasar al siguiente punto (ese paso no se mueve).
+# Las posiciones se copian a los objetos NPC solo cuando hace falta: al dibujarlos
+# (los que se ven) y al consultar con quién puede hablar el player.
+class CrowdEngine:
+    def __init__(self, npcs):
+        self.npcs = list(npcs)
+        n = len(self.npcs)
+
+        self.pos = np.array([(npc.pos.x, npc.pos.y) for npc in self.npcs], dtype=np.float64).reshape(n, 2)
+        self.prev = self.pos.copy()       # posición en el paso anterior (para interpolar)
+        self.draw_pos = self.pos.copy()   # posición de dibujo (entre prev y pos)
+        self.size = np.array([npc.rect.size for npc in self.npcs], dtype=np.int64).reshape(n, 2)
+        self.half = self.size // 2        # rect.center = topleft + tamaño // 2
+        self.speed = np.array([npc.walk_speed for npc in self.npcs], dtype=np.float64)
+
+        # Todos los paths juntos: el punto actual del NPC i es waypoints[start[i] + path_index[i]]
+        lengths = [len(npc.path) for npc in self.npcs]
+        self.length = np.array(lengths, dtype=np.int64)
+        self.start = np.zeros(n, dtype=np.int64)
+        if n:
+            self.start[1:] = np.cumsum(self.length)[:-1]
+        points = [tuple(p) for npc in self.npcs for p in npc.path]
+        self.waypoints = np.array(points, dtype=np.float64).reshape(len(points), 2)
+        self.path_index = np.array([npc.path_index for npc in self.npcs], dtype=np.int64)
+
+        self.seq = np.arange(n, dtype=np.int64)  # orden de dibujo con el mismo bottom (lo fija DrawList)
+
+        for npc in self.npcs:
+            npc.crowd = self
+
+    @classmethod
+    def create(cls, npcs):
+        """CrowdEngine para los NPCs que caminan, o None si no conviene (pocos NPCs o sin NumPy)"""
+        if not settings.CROWD_ENGINE or np is None:
+            return None
+        walkers = [npc for npc in npcs if npc.walk_speed > 0 and npc.target_pos is not None]
+        if len(walkers) < settings.CROWD_MIN_NPCS:
+            return None
+        return cls(walkers)
+
+    def __len__(self):
+        return len(self.npcs)
+
+    # ---------- SIMULACIÓN ----------
+    def step(self, dt):
+        """Un paso de caminata para todos los NPCs"""
+        n = len(self.npcs)
+        if not n:
+            return
+        active = ~np.fromiter((npc.is_interacting for npc in self.npcs), dtype=bool, count=n)
+
+        center = np.round(self.pos) + self.half
+        vec = self.waypoints[self.start + self.path_index] - center
+        dist = np.sqrt(vec[:, 0] * vec[:, 0] + vec[:, 1] * vec[:, 1])
+
+        arrived = active & (dist < 2)
+        moving = active & ~arrived
+
+        self.path_index[arrived] = (self.path_index[arrived] + 1) % self.length[arrived]
+
+        step = self.speed[moving] * dt / dist[moving]
+        self.pos[moving] += vec[moving] * step[:, None]
+
+    def snapshot(self):
+        self.prev[:] = self.pos
+
+    def interpolate(self, alpha):
+        np.add(self.prev, (self.pos - self.prev) * alpha, out=self.draw_pos)
+
+    # ---------- SINCRONIZAR CON LOS OBJETOS NPC ----------
+    def _sync(self, indices):
+        """Copia la posición de la simulación a los NPC indicados"""
+        rounded = np.round(self.pos[indices]).astype(np.int64)
+        for i, (x, y) in zip(indices.tolist(), rounded.tolist()):
+            npc = self.npcs[i]
+            npc.pos.update(self.pos[i, 0], self.pos[i, 1])
+            npc.rect.topleft = (x, y)
+            npc.hitbox.topleft = (x, y)
+            npc.path_index = int(self.path_index[i])
+            npc.target_pos = pygame.Vector2(npc.path[npc.path_index])
+
+    def sync_all(self):
+        """Copia la posición de la simulación a todos los NPC (p. ej. para guardar la partida)"""
+        self._sync(np.arange(len(self.npcs)))
+
+    def reload(self):
+        """Toma de nuevo la posición y el punto del path de los objetos NPC (al cargar una partida)"""
+        n = len(self.npcs)
+        self.pos[:] = np.array([(npc.pos.x, npc.pos.y) for npc in self.npcs], dtype=np.float64).reshape(n, 2)
+        self.prev[:] = self.pos
+        self.draw_pos[:] = self.pos
+        self.path_index[:] = [npc.path_index for npc in self.npcs]
+
+    def _overlapping(self, positions, rect):
+        x = positions[:, 0]
+        y = positions[:, 1]
+        w = self.size[:, 0]
+        h = self.size[:, 1]
+        hit = (x < rect.right) & (x + w > rect.left) & (y < rect.bottom) & (y + h > rect.top)
+        return np.nonzero(hit & (w > 0) & (h > 0))[0]
+
+    def query(self, rect):
+        """NPCs de la multitud cuya hitbox choca con `rect` (ya sincronizados)"""
+        indices = self._overlapping(np.round(self.pos), rect)
+        self._sync(indices)
+        return [self.npcs[i] for i in indices.tolist()]
+
+    def drawables(self, view=None):
+        """
+        ((bottom, orden), (tipo, bottom, npc)) de los NPCs que se ven, ordenados.
+        A esos NPCs se les actualiza rect e image_rect (el resto no se toca).
+        """
+        draw = np.round(self.draw_pos)
+        indices = self._overlapping(draw, view) if view is not None else np.arange(len(self.npcs))
+        self._sync(indices)
+
+        result = []
+        for i, (x, y) in zip(indices.tolist(), draw[indices].astype(np.int64).tolist()):
+            npc = self.npcs[i]
+            npc.image_rect.topleft = (x, y)
+            bottom = npc.rect.bottom
+            result.append(((bottom, int(self.seq[i])), ("npc", bottom, npc)))
+        result.sort(key=lambda pair: pair[0])
+        return result
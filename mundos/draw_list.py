@@ -0,0 +1,111 @@
+from bisect import bisect_left
+from heapq import merge
+
+
+def draw_rect(obj):
+    """Rect de mundo donde se dibuja el objeto (player, companion y NPCs usan image_rect)"""
+    rect = getattr(obj, "image_rect", None)
+    return rect if rect is not None else obj.rect
+
+
+# Lista de dibujables ordenada por "z" que se mantiene entre frames.
+# Cada objeto se ordena por (bottom, orden de alta): con el mismo bottom queda el mismo
+# orden que daba el sort estable de antes (props, NPCs, player, companion).
+# Cada frame solo se reubican con bisect los que cambiaron de bottom.
+class DrawList:
+    def __init__(self):
+        self.source = None   # (mapa, capas, player, companion) para el que se armó la lista
+        self.keys = []       # (bottom, orden) ordenados
+        self.items = []      # (tipo, bottom, objeto), en el mismo orden que keys
+        self.movers = []     # [clave actual, tipo, objeto, función bottom] de lo que se puede mover
+        self.crowd = None    # CrowdEngine del mapa: sus NPCs se agregan ya filtrados en visible()
+
+        # Contadores
+        self.rebuilds = 0
+        self.moves = 0
+
+    def invalidate(self):
+        """Fuerza a rearmar la lista en el próximo frame (p. ej. si cambiaron los NPCs del mapa)"""
+        self.source = None
+
+    def rebuild(self, current_map, player, companion=None):
+        layers = current_map.get("layers")
+        props = layers["dynamic"] if layers else current_map["props"]
+
+        entries = []
+        self.movers = []
+        for prop in props:
+            entries.append(("prop", prop.rect.bottom, prop))
+        for npc in current_map.get("npcs", []):
+            entries.append(("npc", npc.rect.bottom, npc))
+            self.movers.append([None, "npc", npc, lambda o: o.rect.bottom])
+        entries.append(("player", player.hitbox.bottom, player))
+        self.movers.append([None, "player", player, lambda o: o.hitbox.bottom])
+        if companion:
+            entries.append(("companion", companion.hitbox.bottom, companion))
+            self.movers.append([None, "companion", companion, lambda o: o.hitbox.bottom])
+
+        order = {id(obj): seq for seq, (_, _, obj) in enumerate(entries)}
+
+        # Los NPCs de la multitud no entran en la lista: solo se les guarda su orden
+        self.crowd = current_map.get("crowd")
+        if self.crowd:
+            for i, npc in enumerate(self.crowd.npcs):
+                self.crowd.seq[i] = order[id(npc)]
+            entries = [e for e in entries if e[0] != "npc" or e[2].crowd is None]
+            self.movers = [m for m in self.movers if m[1] != "npc" or m[2].crowd is None]
+        pairs = sorted(((bottom, order[id(obj)]), (kind, bottom, obj)) for kind, bottom, obj in entries)
+        self.keys = [key for key, _ in pairs]
+        self.items = [item for _, item in pairs]
+        for mover in self.movers:
+            obj = mover[2]
+            mover[0] = (mover[3](obj), order[id(obj)])
+
+        self.source = (current_map, layers, player, companion)
+        self.rebuilds += 1
+
+    def sync(self, current_map, player, companion=None):
+        """Deja la lista al día: la rearma si cambió el mapa, si no solo mueve lo que cambió de bottom"""
+        source = self.source
+        if source is None or source[0] is not current_map or source[1] is not current_map.get("layers") \
+                or source[2] is not player or source[3] is not companion:
+            self.rebuild(current_map, player, companion)
+            return
+
+        keys = self.keys
+        items = self.items
+        for mover in self.movers:
+            old, kind, obj, bottom_of = mover
+            bottom = bottom_of(obj)
+            if bottom == old[0]:
+                continue
+            new = (bottom, old[1])
+            mover[0] = new
+            i = bisect_left(keys, old)
+
+            # Si sigue entre sus vecinos (lo normal en un paso) se actualiza en el lugar
+            if (i == 0 or keys[i - 1] < new) and (i + 1 == len(keys) or new < keys[i + 1]):
+                keys[i] = new
+                items[i] = (kind, bottom, obj)
+                continue
+
+            del keys[i]
+            del items[i]
+            i = bisect_left(keys, new)
+            keys.insert(i, new)
+            items.insert(i, (kind, bottom, obj))
+            self.moves += 1
+
+    def visible(self, view=None):
+        """Dibujables en orden "z"; con `view` (rect de mundo) solo los que se ven"""
+        if self.crowd:
+            pairs = zip(self.keys, self.items)
+            if view is not None:
+                colliderect = view.colliderect
+                pairs = [pair for pair in pairs if colliderect(draw_rect(pair[1][2]))]
+            return [item for _, item in merge(pairs, self.crowd.drawables(view), key=lambda pair: pair[0])]
+
+        if view is None:
+            return list(self.items)
+        colliderect = view.colliderect
+        return [item for item in self.items if colliderect(draw_rect(item[2]))]
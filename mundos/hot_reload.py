@@ -0,0 +1,229 @@
+"""
+Recarga en caliente de los mapas (modo desarrollo: settings.HOT_RELOAD_MAPS o main.py --hot-reload).
+
+Cada HOT_RELOAD_INTERVAL segundos se mira el mtime y el tamaño de los JSON de la carpeta de
+mapas (sin servicios externos, solo os.stat). Si cambió el del mapa actual, se aplican solo
+las diferencias sobre MapManager.current_map:
+    paredes, spawns, teleports y conexiones → se rearman enteros (son rects, cuesta nada)
+    NPCs y props → se emparejan por sus datos: los que no cambiaron siguen siendo el mismo
+                   objeto (los que caminan siguen donde estaban), el resto se arma de nuevo
+                   (los sprites salen de la cache y de los atlas, no se vuelven a leer)
+    background   → solo si cambió la ruta
+Después se rearman los índices, la navegación (si cambió algo que bloquea el paso), la
+multitud y las capas prehorneadas, y se fuerza a rearmar la lista de dibujo.
+
+Si cambió otro mapa, se descarta su copia precargada (se vuelve a armar al entrar).
+Un JSON a medio guardar o con errores no rompe el juego: se avisa en consola y el mapa
+sigue como estaba hasta el próximo guardado.
+"""
+import json
+import os
+import time
+
+import pygame
+from core import settings
+from entidades.npc import NPC
+from mundos.crowd import CrowdEngine
+from mundos.prebake import prebake
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def _key(entry):
+    return json.dumps(entry, sort_keys=True)
+
+
+def match(old_entries, objects, new_entries):
+    """
+    Empareja cada entrada nueva con un objeto ya armado a partir de una entrada idéntica.
+    Devuelve, para cada entrada nueva, el objeto que se reusa o None (hay que armarlo).
+    """
+    free = {}
+    for entry, obj in zip(old_entries, objects):
+        free.setdefault(_key(entry), []).append(obj)
+    return [free[key].pop(0) if free.get(key) else None for key in map(_key, new_entries)]
+
+
+def apply_changes(map_manager, old, data):
+    """
+    Lleva el mapa actual (armado con los datos `old`) a los datos `data`, tocando solo lo que cambió.
+    Primero se arma todo lo nuevo y recién después se reemplaza: si algo falla, el mapa queda como estaba.
+    Devuelve cuántos NPCs y props se reusaron y cuántos se armaron.
+    """
+    current_map = map_manager.current_map
+    name = current_map["id"]
+
+    # --- Armar lo nuevo ---
+    info = {
+        "name": data["name"],
+        "width": data["width"],
+        "height": data["height"],
+        "color": tuple(data["color"]),
+        "connections": data["connections"],
+        "spawn_points": data.get("spawn_points", {}),
+    }
+    collision = [pygame.Rect(c["x"], c["y"], c["w"], c["h"]) for c in data["collision"]]
+    teleports_data = data.get("teleports", [])
+    teleports = [pygame.Rect(t["x"], t["y"], t["w"], t["h"]) for t in teleports_data]
+
+    background_changed = data.get("background") != old.get("background")
+    if background_changed:
+        background, background_chunks = map_manager.load_background(name, data.get("background"))
+    else:
+        background, background_chunks = current_map["background"], current_map["background_chunks"]
+
+    new_props = data.get("props", [])
+    props = match(old.get("props", []), current_map["props"], new_props)
+    props_kept = sum(prop is not None for prop in props)
+    props = [prop or map_manager.build_prop(p) for prop, p in zip(props, new_props)]
+
+    # La grilla de navegación depende del tamaño, las paredes y los props con colisión
+    nav = current_map["nav"]
+    nav_changed = (
+        (info["width"], info["height"]) != (old.get("width"), old.get("height"))
+        or _key(data["collision"]) != _key(old.get("collision"))
+        or [p.solids() for p in props] != [p.solids() for p in current_map["props"]]
+    )
+    if nav_changed:
+        solids = {"width": info["width"], "height": info["height"], "collision": collision, "props": props}
+        nav = map_manager.load_nav(name, solids)
+
+    # La multitud tiene las posiciones al día, no los objetos NPC (los que se reusan siguen donde están)
+    crowd = current_map.get("crowd")
+    if crowd:
+        crowd.sync_all()
+    new_npcs = data.get("npcs", [])
+    npcs = match(old.get("npcs", []), current_map["npcs"], new_npcs)
+    if nav_changed:
+        # Los que rodean paredes tienen el path calculado con la grilla vieja
+        npcs = [None if npc is not None and npc.pathfind else npc for npc in npcs]
+    npcs_kept = sum(npc is not None for npc in npcs)
+    built = [NPC(n) for npc, n in zip(npcs, new_npcs) if npc is None]
+    map_manager.route_npcs(nav, built)
+    built = iter(built)
+    npcs = [npc or next(built) for npc in npcs]
+
+    # --- Reemplazar ---
+    current_map.update(info)
+    current_map["collision"] = collision
+    current_map["teleports"] = teleports
+    current_map["teleports_data"] = teleports_data
+    current_map["background"] = background
+    current_map["background_chunks"] = background_chunks
+    current_map["props"] = props
+    current_map["nav"] = nav
+
+    if npcs != current_map["npcs"]:
+        for npc in current_map["npcs"]:
+            npc.crowd = None
+        current_map["npcs"] = npcs
+        current_map["npc_order"] = {id(npc): i for i, npc in enumerate(npcs)}
+        current_map["crowd"] = CrowdEngine.create(npcs)
+
+    map_manager.build_indexes(current_map)
+    bake = settings.PREBAKE_STATIC and background_chunks is None
+    current_map["layers"] = prebake(current_map) if bake else None
+    map_manager.track_surfaces(current_map)
+    map_manager.draw_list.invalidate()
+
+    return {
+        "npcs_kept": npcs_kept,
+        "npcs_built": len(npcs) - npcs_kept,
+        "props_kept": props_kept,
+        "props_built": len(props) - props_kept,
+    }
+
+
+# Mira los JSON de los mapas y aplica los cambios sobre el mapa actual
+class MapWatcher:
+    def __init__(self, map_manager, interval=None):
+        self.map_manager = map_manager
+        self.interval = settings.HOT_RELOAD_INTERVAL if interval is None else interval
+        self.stamps = {}    # nombre -> (mtime_ns, bytes) del JSON la última vez que se miró
+        self.source = None  # (nombre, datos del JSON) con los que está armado el mapa actual
+        self.next_poll = 0.0
+
+        # Estadísticas
+        self.reloads = 0
+        self.failures = 0
+        self.last_ms = 0.0
+
+    def path_of(self, name):
+        return os.path.join(self.map_manager.maps_dir, f"{name}.json")
+
+    def read(self, name):
+        with open(self.path_of(name), "r") as f:
+            return json.load(f)
+
+    def poll(self, now=None):
+        """
+        Se llama cada frame; cada `interval` segundos mira si algún JSON cambió.
+        Devuelve True si recargó el mapa actual.
+        """
+        now = time.perf_counter() if now is None else now
+        if now < self.next_poll:
+            return False
+        self.next_poll = now + self.interval
+
+        current = self.map_manager.current_map["id"]
+        changed = []
+        for file in os.listdir(self.map_manager.maps_dir):
+            if not file.endswith(".json"):
+                continue
+            name = file[:-5]
+            try:
+                stamp = _stamp(self.path_of(name))
+            except OSError:
+                continue  # se está reemplazando justo ahora: se mira en la próxima vuelta
+            previous = self.stamps.get(name)
+            self.stamps[name] = stamp
+            if previous is not None and previous != stamp:
+                changed.append(name)
+
+        prefetcher = self.map_manager.prefetcher
+        reloaded = False
+        for name in changed:
+            if name == current:
+                reloaded = self.reload()
+            elif prefetcher:
+                prefetcher.discard(name)
+
+        # Datos con los que se armó el mapa actual (base para comparar en la próxima recarga)
+        if self.source is None or self.source[0] != current:
+            try:
+                self.source = (current, self.read(current))
+            except (OSError, ValueError):
+                self.source = None
+        return reloaded
+
+    def reload(self):
+        """Aplica el JSON actual del mapa en pantalla. Devuelve True si pudo."""
+        map_manager = self.map_manager
+        name = map_manager.current_map["id"]
+        start = time.perf_counter()
+        # Sin datos de antes (recién se entró al mapa) se arma todo de nuevo
+        old = self.source[1] if self.source and self.source[0] == name else {}
+        try:
+            data = self.read(name)
+            counts = apply_changes(map_manager, old, data)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.failures += 1
+            print(f"[HotReload] No se pudo recargar {name}: {e}")
+            return False
+
+        self.source = (name, data)
+        self.reloads += 1
+        self.last_ms = (time.perf_counter() - start) * 1000
+        renderer = getattr(map_manager.game, "renderer", None)
+        if renderer:
+            renderer.invalidate()
+        print(f"[HotReload] {name} recargado en {self.last_ms:.1f} ms "
+              f"(NPCs: {counts['npcs_kept']} iguales, {counts['npcs_built']} nuevos; "
+              f"props: {counts['props_kept']} iguales, {counts['props_built']} nuevos)")
+        return True
+
+    def stats(self):
+        return {"reloads": self.reloads, "failures": self.failures, "last_ms": round(self.last_ms, 3)}
@@ -0,0 +1,366 @@
+"""
+Compilador de mapas: convierte cada mundos/mapas/zonaN.json en un bundle binario (.qmap)
+y valida los datos antes de jugar.
+
+Uso:
+    python -m mundos.map_compiler           # valida y compila todos los mapas
+    python -m mundos.map_compiler --check   # solo valida
+    python -m mundos.map_compiler --force   # compila aunque haya errores
+"""
+import json
+import os
+import struct
+import sys
+
+from ui import dialogue_db
+
+MAGIC = b"QMAP"
+VERSION = 2
+
+MAPS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mapas")
+COMPILED_DIR = os.path.join(MAPS_DIR, "compilados")
+
+# Campos que el bundle guarda en registros fijos; el resto de cada NPC/prop va como JSON "extra"
+NPC_FIELDS = {"name", "x", "y", "scale", "sprite", "portrait", "dialogue", "walk_speed", "path"}
+PROP_FIELDS = {"x", "y", "image", "collision", "teleport_to"}
+# "collision" de un prop en el bundle: 0 sin colisión, 1 todo el rect, 2 máscara (canal alfa)
+# "dialogue" de un NPC: id en la base de diálogos (ui/dialogue_db.py) o, si el mapa lo trae escrito, las líneas
+
+HEADER = struct.Struct("<4sHHqq")  # magic, versión, reservado, mtime_ns y tamaño del JSON fuente
+RECT = struct.Struct("<4i")
+
+_structs = {}  # formatos ya compilados, para no recrearlos en cada lectura
+
+
+def _struct(fmt):
+    st = _structs.get(fmt)
+    if st is None:
+        st = _structs[fmt] = struct.Struct("<" + fmt)
+    return st
+
+
+# ---------- ESCRITURA ----------
+class _Writer:
+    def __init__(self):
+        self.strings = []   # tabla de strings internados (nombres, rutas de assets, diálogos)
+        self.ids = {}
+        self.body = bytearray()
+
+    def sid(self, text):
+        """Devuelve el id del string (o -1 si es None), internándolo si es nuevo"""
+        if text is None:
+            return -1
+        if text not in self.ids:
+            self.ids[text] = len(self.strings)
+            self.strings.append(text)
+        return self.ids[text]
+
+    def pack(self, fmt, *values):
+        self.body += _struct(fmt).pack(*values)
+
+    def extra(self, record, known):
+        """Campos no conocidos del registro, guardados como JSON internado"""
+        rest = {k: v for k, v in record.items() if k not in known}
+        self.pack("i", self.sid(json.dumps(rest, ensure_ascii=False)) if rest else -1)
+
+    def output(self, mtime_ns, size):
+        # Tabla de strings: cantidad, todas las longitudes y después los textos seguidos
+        encoded = [s.encode("utf-8") for s in self.strings]
+        table = _struct("I").pack(len(encoded)) + struct.pack(f"<{len(encoded)}I", *map(len, encoded))
+        table += b"".join(encoded)
+        return HEADER.pack(MAGIC, VERSION, 0, mtime_ns, size) + table + bytes(self.body)
+
+
+def compile_map(data, mtime_ns=0, size=0):
+    """Convierte los datos de un mapa (dict del JSON) en bytes del bundle"""
+    w = _Writer()
+
+    color = data.get("color", [0, 0, 0])
+    w.pack("iii3Bi", w.sid(data["name"]), data["width"], data["height"],
+           color[0], color[1], color[2], w.sid(data.get("background")))
+
+    collision = data.get("collision", [])
+    w.pack("I", len(collision))
+    for c in collision:
+        w.body += RECT.pack(c["x"], c["y"], c["w"], c["h"])
+
+    connections = data.get("connections", {})
+    w.pack("I", len(connections))
+    for direction, target in connections.items():
+        w.pack("ii", w.sid(direction), w.sid(target))
+
+    spawns = data.get("spawn_points", {})
+    w.pack("I", len(spawns))
+    for key, sp in spawns.items():
+        w.pack("iii", w.sid(key), sp["x"], sp["y"])
+
+    teleports = data.get("teleports", [])
+    w.pack("I", len(teleports))
+    for t in teleports:
+        w.body += RECT.pack(t["x"], t["y"], t["w"], t["h"])
+        w.pack("ii", w.sid(t["to_map"]), w.sid(t.get("spawn")))
+
+    npcs = data.get("npcs", [])
+    w.pack("I", len(npcs))
+    for n in npcs:
+        w.pack("iidddd", w.sid(n["name"]), w.sid(n["sprite"]), n.get("x", 0), n.get("y", 0),
+               n.get("scale", 1.0), n.get("walk_speed", 0))
+        portrait = n.get("portrait")
+        if portrait:
+            w.pack("Bidii", 1, w.sid(portrait["path"]), portrait.get("scale", 1.0),
+                   portrait.get("offset_x", 0), portrait.get("offset_y", 0))
+        else:
+            w.pack("B", 0)
+        dialogue = n.get("dialogue", [])
+        w.pack("i", w.sid(dialogue) if isinstance(dialogue, str) else -1)
+        dialogue = [] if isinstance(dialogue, str) else dialogue
+        w.pack("I", len(dialogue))
+        for line in dialogue:
+            w.pack("i", w.sid(line))
+        path = n.get("path", [])
+        w.pack("I", len(path))
+        for px, py in path:
+            w.pack("dd", px, py)
+        w.extra(n, NPC_FIELDS)
+
+    props = data.get("props", [])
+    w.pack("I", len(props))
+    for p in props:
+        tp = p.get("teleport_to") or {}
+        collision = 2 if p.get("collision") == "mask" else (1 if p.get("collision") else 0)
+        w.pack("iiiBBii", p["x"], p["y"], w.sid(p["image"]), collision,
+               1 if p.get("teleport_to") else 0, w.sid(tp.get("map")), w.sid(tp.get("spawn")))
+        w.extra(p, PROP_FIELDS)
+
+    return w.output(mtime_ns, size)
+
+
+# ---------- LECTURA ----------
+class _Reader:
+    def __init__(self, raw, offset):
+        self.raw = raw
+        self.pos = offset
+        self.strings = []
+
+    def unpack(self, fmt):
+        st = _struct(fmt)
+        values = st.unpack_from(self.raw, self.pos)
+        self.pos += st.size
+        return values
+
+    def count(self):
+        return self.unpack("I")[0]
+
+    def s(self, sid):
+        return self.strings[sid] if sid >= 0 else None
+
+    def extra(self, record):
+        sid = self.unpack("i")[0]
+        if sid >= 0:
+            record.update(json.loads(self.strings[sid]))
+
+
+def read_bundle(raw):
+    """
+    Convierte los bytes de un bundle en un dict con la misma forma que el JSON original.
+    Devuelve (datos, mtime_ns, tamaño) del JSON con el que se compiló.
+    """
+    magic, version, _, mtime_ns, size = HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Bundle de mapa con formato desconocido")
+
+    r = _Reader(raw, HEADER.size)
+    count = r.count()
+    lengths = struct.unpack_from(f"<{count}I", raw, r.pos)
+    r.pos += 4 * count
+    for length in lengths:
+        r.strings.append(raw[r.pos:r.pos + length].decode("utf-8"))
+        r.pos += length
+    s = r.s
+
+    name, width, height, c0, c1, c2, background = r.unpack("iii3Bi")
+    data = {"name": s(name), "width": width, "height": height, "color": [c0, c1, c2]}
+    if background >= 0:
+        data["background"] = s(background)
+
+    n = r.count()
+    data["collision"] = [
+        {"x": x, "y": y, "w": cw, "h": ch}
+        for x, y, cw, ch in RECT.iter_unpack(raw[r.pos:r.pos + n * RECT.size])
+    ]
+    r.pos += n * RECT.size
+
+    data["connections"] = {}
+    for _ in range(r.count()):
+        direction, target = r.unpack("ii")
+        data["connections"][s(direction)] = s(target)
+
+    data["spawn_points"] = {}
+    for _ in range(r.count()):
+        key, x, y = r.unpack("iii")
+        data["spawn_points"][s(key)] = {"x": x, "y": y}
+
+    data["teleports"] = []
+    for _ in range(r.count()):
+        x, y, tw, th, to_map, spawn = r.unpack("4iii")
+        data["teleports"].append({"x": x, "y": y, "w": tw, "h": th, "to_map": s(to_map), "spawn": s(spawn)})
+
+    data["npcs"] = []
+    for _ in range(r.count()):
+        name_id, sprite, x, y, scale, walk_speed = r.unpack("iidddd")
+        npc = {"name": s(name_id), "sprite": s(sprite), "x": x, "y": y, "scale": scale}
+        if walk_speed:
+            npc["walk_speed"] = walk_speed
+        if r.unpack("B")[0]:
+            path, pscale, off_x, off_y = r.unpack("idii")
+            npc["portrait"] = {"path": s(path), "scale": pscale, "offset_x": off_x, "offset_y": off_y}
+        dialogue_id = r.unpack("i")[0]
+        npc["dialogue"] = [s(r.unpack("i")[0]) for _ in range(r.count())]
+        if dialogue_id >= 0:
+            npc["dialogue"] = s(dialogue_id)
+        waypoints = [list(r.unpack("dd")) for _ in range(r.count())]
+        if waypoints:
+            npc["path"] = waypoints
+        r.extra(npc)
+        data["npcs"].append(npc)
+
+    data["props"] = []
+    for _ in range(r.count()):
+        x, y, image, collision, has_tp, tp_map, tp_spawn = r.unpack("iiiBBii")
+        prop = {"x": x, "y": y, "image": s(image), "collision": "mask" if collision == 2 else bool(collision)}
+        if has_tp:
+            prop["teleport_to"] = {"map": s(tp_map), "spawn": s(tp_spawn)}
+        r.extra(prop)
+        data["props"].append(prop)
+
+    return data, mtime_ns, size
+
+
+def bundle_path(name, compiled_dir=COMPILED_DIR):
+    return os.path.join(compiled_dir, f"{name}.qmap")
+
+
+def load_compiled(name, json_path, compiled_dir=COMPILED_DIR):
+    """
+    Devuelve los datos del mapa desde su bundle si está al día con el JSON,
+    o None si no existe, está desactualizado o tiene otro formato (se usa el JSON).
+    """
+    path = bundle_path(name, compiled_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        raw = f.read()
+    try:
+        data, mtime_ns, size = read_bundle(raw)
+    except (ValueError, struct.error):
+        return None
+    st = os.stat(json_path)
+    if st.st_mtime_ns != mtime_ns or st.st_size != size:
+        return None
+    return data
+
+
+# ---------- VALIDACIÓN ----------
+def validate(maps, root=".", dialogues=None):
+    """
+    Revisa todos los mapas juntos.
+    maps = {nombre: datos}; root = carpeta desde la que se resuelven las rutas de assets.
+    dialogues = ids de la base de diálogos (None = no revisar los diálogos de los NPCs)
+    Devuelve (errores, advertencias) como listas de strings.
+    """
+    errors = []
+    warnings = []
+
+    def asset(map_name, what, path):
+        if path and not os.path.exists(os.path.join(root, path)):
+            errors.append(f"{map_name}: {what} no existe: {path}")
+
+    for name, data in maps.items():
+        if data.get("name") != name:
+            warnings.append(f"{name}: el campo 'name' ({data.get('name')}) no coincide con el archivo")
+
+        asset(name, "background", data.get("background"))
+        for i, n in enumerate(data.get("npcs", [])):
+            asset(name, f"sprite del NPC {n.get('name', i)}", n.get("sprite"))
+            if n.get("portrait"):
+                asset(name, f"retrato del NPC {n.get('name', i)}", n["portrait"].get("path"))
+            dialogue = n.get("dialogue")
+            if isinstance(dialogue, str) and dialogues is not None and dialogue not in dialogues:
+                errors.append(f"{name}: diálogo del NPC {n.get('name', i)} no está en la base: {dialogue}")
+        for p in data.get("props", []):
+            asset(name, "imagen de prop", p.get("image"))
+            if p.get("collision") not in (None, True, False, "mask"):
+                errors.append(f"{name}: colisión de prop desconocida: {p.get('collision')!r} (true, false o \"mask\")")
+
+        for direction, target in data.get("connections", {}).items():
+            if target not in maps:
+                errors.append(f"{name}: conexión '{direction}' apunta a un mapa desconocido: {target}")
+            elif direction not in maps[target].get("spawn_points", {}):
+                warnings.append(f"{name}: {target} no tiene spawn '{direction}' (se usa el borde opuesto)")
+
+        targets = [(t.get("to_map"), t.get("spawn"), "teleport") for t in data.get("teleports", [])]
+        targets += [(p["teleport_to"].get("map"), p["teleport_to"].get("spawn"), "teleport de prop")
+                    for p in data.get("props", []) if p.get("teleport_to")]
+        for target, spawn, what in targets:
+            if target not in maps:
+                errors.append(f"{name}: {what} apunta a un mapa desconocido: {target}")
+            elif spawn not in maps[target].get("spawn_points", {}):
+                errors.append(f"{name}: {what} usa el spawn '{spawn}' que no existe en {target}")
+
+    return errors, warnings
+
+
+# ---------- LÍNEA DE COMANDOS ----------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    check_only = "--check" in argv
+    force = "--force" in argv
+
+    maps = {}
+    sources = {}
+    errors = []
+    for file in sorted(os.listdir(MAPS_DIR)):
+        if not file.endswith(".json"):
+            continue
+        name = file[:-5]
+        path = os.path.join(MAPS_DIR, file)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                maps[name] = json.load(f)
+            sources[name] = path
+        except json.JSONDecodeError as e:
+            errors.append(f"{name}: JSON inválido: {e}")
+
+    try:
+        dialogues = set(dialogue_db.read_source().get("dialogues", {}))
+    except FileNotFoundError as e:
+        print(f"[aviso] {e} (no se revisan los diálogos de los NPCs)")
+        dialogues = None
+
+    more_errors, warnings = validate(maps, dialogues=dialogues)
+    errors += more_errors
+    for w in warnings:
+        print(f"[aviso] {w}")
+    for e in errors:
+        print(f"[error] {e}")
+
+    if check_only:
+        return 1 if errors else 0
+
+    broken = {e.split(":", 1)[0] for e in errors}
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    written = 0
+    for name, data in maps.items():
+        if name in broken and not force:
+            continue
+        st = os.stat(sources[name])
+        with open(bundle_path(name), "wb") as f:
+            f.write(compile_map(data, st.st_mtime_ns, st.st_size))
+        written += 1
+
+    print(f"{written}/{len(maps)} mapas compilados en {COMPILED_DIR}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,36 +1,75 @@
 import pygame
 import json
 import os
+import time
 from entidades.npc import NPC  # Importa clase NPC para instanciar los personajes
+from core.assets import load_image  # Cache compartida de imágenes
+from core import memory, settings
+from mundos.prefetch import MapPrefetcher  # Precarga de mapas vecinos en segundo plano
+from mundos import map_compiler  # Bundles binarios precompilados de los mapas
+from mundos.spatial import SpatialHash  # Índice espacial para colisiones y triggers
+from mundos.prebake import prebake  # Capas estáticas prehorneadas
+from mundos import chunks  # Backgrounds grandes cortados en chunks
+from core.camera import Camera  # Vista sobre mapas más grandes que la pantalla
+from mundos.draw_list import DrawList  # Orden de dibujo que se mantiene entre frames
+from mundos.crowd import CrowdEngine  # NPCs que caminan en bloque (NumPy opcional)
+from mundos.nav import NavGrid, route_path  # Grilla de navegación, A* y flow fields
+from mundos.hot_reload import MapWatcher  # Recarga en caliente de los JSON (modo desarrollo)
 
 # Clase que maneja los mapas, NPCs, props y teletransportes
 class MapManager:
-    def __init__(self, game, start_map="zona1"):
+    def __init__(self, game, start_map="zona1", maps_dir=None):
         self.game = game
         self.base_path = os.path.dirname(os.path.abspath(__file__))  # Ruta base de este archivo
+        # Carpeta de los JSON de mapas (el benchmark la cambia para usar mapas sintéticos)
+        self.maps_dir = maps_dir or os.path.join(self.base_path, "mapas")
         self.current_map = None
+        self.prefetcher = None
+        self.load_times = []
+        self.debug_prebake = settings.DEBUG_PREBAKE  # resaltar qué props quedaron horneados (F3)
+        self.camera = Camera(settings.SCREEN_WIDTH, settings.SCREEN_HEIGHT)
+        self.draw_list = DrawList()
         self.load_map(start_map)  # Cargar mapa inicial
 
+        # Precarga de los mapas vecinos (se puede apagar desde settings)
+        self.prefetcher = MapPrefetcher(self) if settings.PREFETCH_ENABLED else None
+        if self.prefetcher:
+            self.prefetcher.plan(self.current_map)
+
+        # Modo desarrollo: los cambios en los JSON de los mapas se aplican sin reiniciar
+        self.watcher = MapWatcher(self) if settings.HOT_RELOAD_MAPS else None
+
     def load_map(self, name):
         """
-        Carga un mapa desde un archivo JSON, incluyendo background, colisiones, NPCs, props y teletransportes.
+        Cambia al mapa indicado.
+        Si el mapa ya fue precargado en segundo plano solo se intercambia; si no, se construye acá.
         """
-        path = os.path.join(self.base_path, "mapas", f"{name}.json")
+        start = time.perf_counter()
+        built = self.prefetcher.take(name) if self.prefetcher else None
+        self.current_map = built if built is not None else self.build_map(name)
 
-        if not os.path.exists(path):
-            raise FileNotFoundError(f"Mapa no encontrado: {path}")
+        # Tiempo de cada cambio de mapa: (nombre, segundos, si vino precargado)
+        self.load_times.append((name, time.perf_counter() - start, built is not None))
 
-        with open(path, "r") as f:
-            data = json.load(f)
+        if self.prefetcher:
+            self.prefetcher.plan(self.current_map)
 
-        # cargar background
-        bg_path = data.get("background")
-        background_image = None
-        if bg_path and os.path.exists(bg_path):
-            background_image = pygame.image.load(bg_path).convert()
+        # Con el mapa nuevo armado, si las superficies se pasan del presupuesto se suelta lo que sobra
+        memory.tracker.enforce()
+
+    def build_map(self, name):
+        """
+        Construye un mapa desde un archivo JSON, incluyendo background, colisiones, NPCs, props y teletransportes.
+        No modifica el mapa actual, así que se puede llamar desde el hilo de precarga.
+        """
+        data = self.read_map_data(name)
+
+        # cargar background (si está cortado en chunks, se cargan a medida que se ven)
+        background_image, background_chunks = self.load_background(name, data.get("background"))
 
         # Guardar información general del mapa
-        self.current_map = {
+        current_map = {
+            "id": name,  # nombre del archivo (el campo "name" del JSON puede no coincidir)
             "name": data["name"],
             "width": data["width"],
             "height": data["height"],
@@ -40,32 +79,177 @@ class MapManager:
             ],
             "connections": data["connections"],  # mapas conectados
             "background": background_image,
+            "background_chunks": background_chunks,
             "spawn_points": data.get("spawn_points", {}),
             "npcs": data.get("npcs", [])
         }
 
         # --- Instanciar NPCs ---
-        self.current_map["npcs"] = [NPC(n) for n in data.get("npcs", [])]
+        current_map["npcs"] = [NPC(n) for n in data.get("npcs", [])]
+        current_map["npc_order"] = {id(npc): i for i, npc in enumerate(current_map["npcs"])}
 
         # --- Cargar props ---
-        self.current_map["props"] = []
-        for p in data.get("props", []):
-            from mundos.prop import Prop
-            prop = Prop(
-                p["x"],
-                p["y"],
-                p["image"],
-                p.get("collision", False),
-                p.get("teleport_to", None)
-            )
-            self.current_map["props"].append(prop)
+        current_map["props"] = [self.build_prop(p) for p in data.get("props", [])]
+
+        # --- Navegación (grilla cacheada en disco) ---
+        current_map["nav"] = self.load_nav(name, current_map)
+        self.route_npcs(current_map["nav"], current_map["npcs"])
+
+        # Muchos NPCs caminando → se mueven todos juntos (None = de a uno, como siempre)
+        current_map["crowd"] = CrowdEngine.create(current_map["npcs"])
 
         # --- Teletransporte ---
-        self.current_map["teleports"] = [
+        current_map["teleports"] = [
             pygame.Rect(t["x"], t["y"], t["w"], t["h"])
             for t in data.get("teleports", [])
         ]
-        self.current_map["teleports_data"] = data.get("teleports", [])
+        current_map["teleports_data"] = data.get("teleports", [])
+
+        self.build_indexes(current_map)
+
+        # --- Capas estáticas prehorneadas ---
+        # (no con backgrounds por chunks: la capa base sería la imagen entera en memoria)
+        bake = settings.PREBAKE_STATIC and background_chunks is None
+        current_map["layers"] = prebake(current_map) if bake else None
+
+        self.track_surfaces(current_map)
+        return current_map
+
+    @staticmethod
+    def build_prop(p):
+        from mundos.prop import Prop
+        return Prop(
+            p["x"],
+            p["y"],
+            p["image"],
+            p.get("collision", False),
+            p.get("teleport_to", None)
+        )
+
+    def load_background(self, name, bg_path):
+        """(imagen, chunks) del background: uno de los dos, o ninguno si no hay archivo"""
+        background_image = None
+        background_chunks = None
+        if bg_path and os.path.exists(bg_path):
+            if settings.CHUNKED_BACKGROUNDS:
+                background_chunks = chunks.load_chunked(name, bg_path, os.path.join(self.maps_dir, "compilados", "chunks"))
+            if background_chunks is None:
+                background_image = load_image(bg_path, alpha=False)
+        return background_image, background_chunks
+
+    def load_nav(self, name, current_map):
+        """Grilla de navegación del mapa (None si está apagada)"""
+        if not settings.NAV_ENABLED:
+            return None
+        cache_dir = os.path.join(self.maps_dir, "compilados", "nav")
+        return NavGrid.load_or_build(name, current_map, cache_dir)
+
+    @staticmethod
+    def route_npcs(nav, npcs):
+        """NPCs con "pathfind": true rodean las paredes entre los puntos de su path"""
+        if nav is None:
+            return
+        for npc in npcs:
+            if npc.pathfind and npc.path:
+                npc.path = route_path(nav, npc.path)
+                npc.target_pos = pygame.Vector2(npc.path[0]) if npc.target_pos is not None else None
+
+    @staticmethod
+    def build_indexes(current_map):
+        """Arma los índices espaciales del mapa (también al recargarlo en caliente)"""
+        # Paredes (los consulta move_both del player y companion)
+        collision_index = SpatialHash()
+        for rect in current_map["collision"]:
+            collision_index.insert(rect, rect)
+        current_map["collision_index"] = collision_index
+
+        # Props con colisión
+        prop_index = SpatialHash()
+        for prop in current_map["props"]:
+            if prop.collision:
+                prop_index.insert(prop, prop.collision)
+        current_map["prop_index"] = prop_index
+
+        # Teleports: cada entrada es (rect, datos)
+        teleport_index = SpatialHash()
+        for rect, tp in zip(current_map["teleports"], current_map["teleports_data"]):
+            entry = (rect, tp)
+            teleport_index.insert(entry, rect)
+        current_map["teleport_index"] = teleport_index
+
+        # Entidades que se mueven o con las que se interactúa (NPCs y companion)
+        # (los de la multitud no: se consultan directo en el CrowdEngine)
+        entity_index = SpatialHash()
+        for npc in current_map["npcs"]:
+            if npc.crowd is None:
+                entity_index.insert(npc, npc.hitbox)
+        current_map["entity_index"] = entity_index
+
+    # ---------- MEMORIA ----------
+    @staticmethod
+    def track_surfaces(current_map):
+        """Anota en la cuenta de memoria las superficies del mapa a su nombre"""
+        owner = f"mapa:{current_map['id']}"
+        memory.track(current_map["background"], owner, "background")
+        for prop in current_map["props"]:
+            memory.track(prop.image, owner, prop.image_path)
+        for npc in current_map["npcs"]:
+            if npc.image.get_parent() is None:  # los frames de un atlas son del personaje, no del mapa
+                memory.track(npc.image, owner, npc.name)
+        layers = current_map.get("layers")
+        if layers:
+            for layer in ("base", "front"):
+                memory.track(layers[layer], owner, f"capa {layer}")
+
+    def static_surfaces(self):
+        """Superficies del mapa actual que se pueden soltar y volver a armar (capas y chunks)"""
+        surfaces = []
+        layers = self.current_map.get("layers")
+        if layers:
+            surfaces += [s for s in (layers["base"], layers["front"]) if s is not None]
+        background_chunks = self.current_map.get("background_chunks")
+        if background_chunks:
+            surfaces += list(background_chunks.loaded.values())
+        return surfaces
+
+    def memory_bytes(self):
+        return sum(s.get_bytesize() * s.get_width() * s.get_height() for s in self.static_surfaces())
+
+    def release_static(self):
+        """
+        Suelta las capas prehorneadas y los chunks cargados del mapa actual
+        (el background y los props siguen en la cache de imágenes).
+        """
+        self.current_map["layers"] = None
+        background_chunks = self.current_map.get("background_chunks")
+        if background_chunks:
+            background_chunks.loaded.clear()
+
+    def restore_static(self):
+        """Vuelve a prehornear las capas (los chunks se recargan solos al dibujar)"""
+        bake = settings.PREBAKE_STATIC and self.current_map.get("background_chunks") is None
+        if bake and self.current_map.get("layers") is None:
+            self.current_map["layers"] = prebake(self.current_map)
+            self.track_surfaces(self.current_map)
+
+    def read_map_data(self, name):
+        """
+        Lee los datos crudos del mapa.
+        Usa el bundle compilado si está al día con el JSON; si no, parsea el JSON.
+        """
+        path = os.path.join(self.maps_dir, f"{name}.json")
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Mapa no encontrado: {path}")
+
+        if settings.USE_COMPILED_MAPS:
+            compiled_dir = os.path.join(self.maps_dir, "compilados")
+            data = map_compiler.load_compiled(name, path, compiled_dir)
+            if data is not None:
+                return data
+
+        with open(path, "r") as f:
+            return json.load(f)
 
     # ---------- SINCRONIZACIÓN DEL SPRITE ----------
     def sync_player_sprite(self, player):
@@ -89,7 +273,14 @@ class MapManager:
         return sp.get(direction, None)
 
     # ---------- ACTUALIZACIÓN DEL MAPA ----------
-    def update(self, player):
+    def update(self, player, dt):
+        if self.watcher:
+            self.watcher.poll()
+
+        # Reordenar la precarga según qué tan cerca está el jugador de cada salida
+        if self.prefetcher:
+            self.prefetcher.update(player)
+
         width = self.current_map["width"]
         height = self.current_map["height"]
 
@@ -159,12 +350,16 @@ class MapManager:
                 player.hitbox.bottom = height
 
         # ---------- ACTUALIZAR NPCs ----------
-        for npc in self.current_map.get("npcs", []):
-            npc.update(self.game.clock.get_time() / 1000)
+        self.update_npcs(dt)
 
         # ---------- COLISIONES CON PROPS ----------
-        for prop in self.current_map["props"]:
-            if prop.collision and player.hitbox.colliderect(prop.collision):
+        # (broadphase por rect; los props con máscara después prueban píxel a píxel)
+        # iter_colliding vuelve a consultar si un prop empuja la hitbox, igual que recorrer todos los props
+        for prop in self.current_map["prop_index"].iter_colliding(player.hitbox):
+            if prop.mask is not None:
+                if prop.push_out(player.hitbox):
+                    self.sync_player_sprite(player)
+            elif player.hitbox.colliderect(prop.collision):
                 if player.hitbox.centerx < prop.collision.centerx:
                     player.hitbox.right = prop.collision.left
                 else:
@@ -176,9 +371,8 @@ class MapManager:
                 self.sync_player_sprite(player)
 
         # ---------- TELEPORTES ----------
-        for i, tp_rect in enumerate(self.current_map["teleports"]):
+        for tp_rect, tp in self.current_map["teleport_index"].query(player.hitbox):
             if player.hitbox.colliderect(tp_rect):
-                tp = self.current_map["teleports_data"][i]
                 self.load_map(tp["to_map"])
                 spawn = self.get_spawn(tp["spawn"])
                 if spawn:
@@ -188,40 +382,109 @@ class MapManager:
                 self.sync_companion_to_player(player)
                 break
 
-        # ---------- ACTUALIZAR NPCs nuevamente (por si cambiaron de mapa) ----------
+        # La companion también vive en el índice de entidades del mapa actual
+        companion = getattr(self.game.scene, "companion", None)
+        if companion:
+            self.current_map["entity_index"].move(companion, companion.hitbox)
+
+    def update_npcs(self, dt):
+        """Actualiza los NPCs y reubica en el índice solo a los que caminan"""
+        crowd = self.current_map.get("crowd")
+        if crowd:
+            crowd.step(dt)
+
+        index = self.current_map["entity_index"]
         for npc in self.current_map.get("npcs", []):
-            npc.update(self.game.clock.get_time() / 1000)
+            if npc.walk_speed > 0 and npc.crowd is None:
+                npc.update(dt)
+                index.move(npc, npc.hitbox)
+
+    def npcs_near(self, rect):
+        """NPCs cuya hitbox toca `rect` (consulta al índice de entidades y a la multitud)"""
+        found = [e for e in self.current_map["entity_index"].query(rect) if isinstance(e, NPC)]
+        crowd = self.current_map.get("crowd")
+        if crowd:
+            found += crowd.query(rect)
+            order = self.current_map["npc_order"]
+            found.sort(key=lambda npc: order[id(npc)])
+        return found
+
+    # ---------- CÁMARA ----------
+    def update_camera(self, player):
+        """
+        Centra la cámara en el player (en su posición de dibujo) y, si el background
+        va por chunks, deja cargados solo los que están cerca de la vista.
+        """
+        self.camera.follow(player.image_rect, self.current_map["width"], self.current_map["height"])
+        background_chunks = self.current_map.get("background_chunks")
+        if background_chunks:
+            background_chunks.update(self.camera.rect)
 
     # ---------- DIBUJAR MAPA ----------
     def draw(self, screen, player, companion=None):
-        # dibujar background
-        if self.current_map.get("background"):
-            screen.blit(self.current_map["background"], (0, 0))
-        else:
-            screen.fill(self.current_map["color"])
+        self.update_camera(player)
+        offset = self.camera.offset
 
-        # construir lista de objetos dibujables con su "z" (y bottom)
-        drawables = []
+        self.draw_background(screen)
+        for _, _, obj in self.sorted_drawables(player, companion, self.camera.rect):
+            obj.draw(screen, offset)
+        self.draw_front(screen)
 
-        # props
-        for prop in self.current_map["props"]:
-            drawables.append(("prop", prop.rect.bottom, prop))
+        if self.debug_prebake:
+            self.draw_prebake_debug(screen)
 
-        # npcs
-        for npc in self.current_map.get("npcs", []):
-            drawables.append(("npc", npc.rect.bottom, npc))
+    def draw_background(self, screen, area=None):
+        """
+        Dibuja el background (o el color de fondo) de lo que ve la cámara.
+        `area` es un rect de pantalla; si se pasa, solo se restaura esa región.
+        """
+        if area is None:
+            area = screen.get_rect()
+        view = self.camera.rect
 
-        # player y companion
-        drawables.append(("player", player.hitbox.bottom, player))
-        if companion:
-            drawables.append(("companion", companion.hitbox.bottom, companion))
+        # Parte de la vista que cae fuera del mapa (mapas más chicos que la pantalla)
+        if view.width > self.current_map["width"] or view.height > self.current_map["height"]:
+            screen.fill(self.current_map["color"], area)
+
+        layers = self.current_map.get("layers")
+        background = layers["base"] if layers else self.current_map.get("background")
+        background_chunks = self.current_map.get("background_chunks")
+        if background_chunks:
+            background_chunks.draw(screen, self.camera.offset, area)
+        elif background:
+            screen.blit(background, area.topleft, self.camera.to_world(area))
+        else:
+            screen.fill(self.current_map["color"], area)
+
+    def sorted_drawables(self, player, companion=None, view=None):
+        """
+        Devuelve los objetos dibujables como (tipo, bottom, objeto) ordenados por "z".
+        Con `view` (rect de mundo, normalmente la cámara) se descartan los que no se ven.
+        La lista ordenada se guarda entre frames y solo se reubica lo que se movió
+        (props de las capas prehorneadas no entran: ya están en el background o adelante).
+        """
+        self.draw_list.sync(self.current_map, player, companion)
+        return self.draw_list.visible(view)
+
+    def draw_front(self, screen, area=None):
+        """Dibuja la capa prehorneada de props que siempre van encima de los personajes"""
+        layers = self.current_map.get("layers")
+        if layers and layers["front"]:
+            if area is None:
+                area = screen.get_rect()
+            screen.blit(layers["front"], area.topleft, self.camera.to_world(area))
 
-        # ordenar por bottom (para que los objetos delante se dibujen encima)
-        drawables.sort(key=lambda x: x[1])
-        for _, _, obj in drawables:
-            obj.draw(screen)
+    def draw_prebake_debug(self, screen):
+        """Marca los props: verde = horneado atrás, celeste = horneado adelante, rojo = dinámico"""
+        layers = self.current_map.get("layers")
+        if not layers:
+            return
+        for group, color in (("baked_behind", (0, 255, 0)), ("baked_front", (0, 200, 255)), ("dynamic", (255, 0, 0))):
+            for prop in layers[group]:
+                visible = prop.image.get_bounding_rect().move(prop.rect.topleft)
+                pygame.draw.rect(screen, color, self.camera.to_screen(visible), 2)
 
     def draw_props(self, screen):
         """Dibuja solo los props"""
         for prop in self.current_map["props"]:
-            prop.draw(screen)
+            prop.draw(screen, self.camera.offset)
@@ -0,0 +1,287 @@
+import hashlib
+import heapq
+import os
+import struct
+from collections import deque
+
+import pygame
+from core import settings
+
+MAGIC = b"QNAV"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHHII20s")  # magic, versión, celda, agente w/h, columnas, filas, hash de origen
+
+# Vecinos en 8 direcciones: (dx, dy, costo) con costo 10 recto y 14 en diagonal
+NEIGHBORS = [(1, 0, 10), (-1, 0, 10), (0, 1, 10), (0, -1, 10),
+             (1, 1, 14), (1, -1, 14), (-1, 1, 14), (-1, -1, 14)]
+
+
+def _solids(current_map):
+    """Rects que bloquean el paso: paredes y props con colisión"""
+    solids = list(current_map["collision"])
+    for prop in current_map["props"]:
+        solids += prop.solids()
+    return solids
+
+
+def source_hash(current_map, cell, agent):
+    """Hash de todo lo que define la grilla (si cambia, la cache en disco no sirve)"""
+    h = hashlib.sha1()
+    h.update(struct.pack("<iiHHH", current_map["width"], current_map["height"], cell, *agent))
+    for r in _solids(current_map):
+        h.update(struct.pack("<4i", r.x, r.y, r.w, r.h))
+    return h.digest()
+
+
+# Grilla de navegación de un mapa: qué celdas puede ocupar el centro de una hitbox
+# de tamaño `agent` sin chocar paredes ni props, con A* y flow fields encima.
+class NavGrid:
+    def __init__(self, width, height, cell, agent, walkable):
+        self.width = width
+        self.height = height
+        self.cell = cell
+        self.agent = agent
+        self.cols = width // cell
+        self.rows = height // cell
+        self.walkable = walkable  # bytearray cols*rows, 1 = se puede pisar
+
+        # Flow field cacheado: celda destino -> distancias (se recalcula solo si el destino cambia de celda)
+        self._flow_goal = None
+        self._flow_dist = None
+
+    # ---------- CONSTRUCCIÓN / CACHE ----------
+    @classmethod
+    def build(cls, current_map, cell=None, agent=None):
+        """Arma la grilla rasterizando las paredes y props con colisión del mapa"""
+        cell = cell or settings.NAV_CELL
+        agent_w, agent_h = agent or settings.NAV_AGENT
+        width, height = current_map["width"], current_map["height"]
+        cols, rows = width // cell, height // cell
+
+        # La hitbox centrada en la celda tiene que quedar dentro del mapa
+        walkable = bytearray(cols * rows)
+        half = cell // 2
+        for cy in range(rows):
+            top = cy * cell + half - agent_h // 2
+            if top < 0 or top + agent_h > height:
+                continue
+            for cx in range(cols):
+                left = cx * cell + half - agent_w // 2
+                if left >= 0 and left + agent_w <= width:
+                    walkable[cy * cols + cx] = 1
+
+        # Marcar las celdas cuya hitbox se superpone con cada sólido
+        for r in _solids(current_map):
+            cx0 = max(0, (r.left - half - agent_w + agent_w // 2) // cell)
+            cx1 = min(cols - 1, (r.right - half + agent_w // 2) // cell + 1)
+            cy0 = max(0, (r.top - half - agent_h + agent_h // 2) // cell)
+            cy1 = min(rows - 1, (r.bottom - half + agent_h // 2) // cell + 1)
+            probe = pygame.Rect(0, 0, agent_w, agent_h)
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    probe.center = (cx * cell + half, cy * cell + half)
+                    if probe.colliderect(r):
+                        walkable[cy * cols + cx] = 0
+
+        return cls(width, height, cell, (agent_w, agent_h), walkable)
+
+    @classmethod
+    def load_or_build(cls, name, current_map, cache_dir):
+        """Lee la grilla de la cache en disco si sigue al día con el mapa; si no, la arma y la guarda"""
+        cell = settings.NAV_CELL
+        agent = tuple(settings.NAV_AGENT)
+        digest = source_hash(current_map, cell, agent)
+        path = os.path.join(cache_dir, f"{name}.nav")
+
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                raw = f.read()
+            if len(raw) >= HEADER.size:
+                magic, version, c, aw, ah, cols, rows, stored = HEADER.unpack_from(raw, 0)
+                if magic == MAGIC and version == VERSION and stored == digest \
+                        and len(raw) == HEADER.size + cols * rows:
+                    return cls(current_map["width"], current_map["height"], c, (aw, ah),
+                               bytearray(raw[HEADER.size:]))
+
+        grid = cls.build(current_map, cell, agent)
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, cell, agent[0], agent[1], grid.cols, grid.rows, digest))
+                f.write(grid.walkable)
+        except OSError:
+            pass  # sin permiso de escritura: se usa la grilla igual, solo que no queda cacheada
+        return grid
+
+    # ---------- CONSULTAS ----------
+    def cell_of(self, point):
+        return (int(point[0]) // self.cell, int(point[1]) // self.cell)
+
+    def center_of(self, cell):
+        half = self.cell // 2
+        return (cell[0] * self.cell + half, cell[1] * self.cell + half)
+
+    def is_walkable(self, cell):
+        cx, cy = cell
+        return 0 <= cx < self.cols and 0 <= cy < self.rows and self.walkable[cy * self.cols + cx] == 1
+
+    def _steps(self, cell):
+        """Vecinos pisables de una celda (sin cortar esquinas en diagonal)"""
+        cx, cy = cell
+        for dx, dy, cost in NEIGHBORS:
+            n = (cx + dx, cy + dy)
+            if not self.is_walkable(n):
+                continue
+            if dx and dy and not (self.is_walkable((cx + dx, cy)) and self.is_walkable((cx, cy + dy))):
+                continue
+            yield n, cost
+
+    def nearest_walkable(self, cell, radius=8):
+        """La celda pisable más cercana (o None si no hay ninguna en `radius` celdas)"""
+        if self.is_walkable(cell):
+            return cell
+        for r in range(1, radius + 1):
+            best = None
+            for dy in range(-r, r + 1):
+                for dx in range(-r, r + 1):
+                    if max(abs(dx), abs(dy)) != r:
+                        continue
+                    n = (cell[0] + dx, cell[1] + dy)
+                    if self.is_walkable(n):
+                        d = dx * dx + dy * dy
+                        if best is None or d < best[0]:
+                            best = (d, n)
+            if best:
+                return best[1]
+        return None
+
+    def clear_line(self, a, b):
+        """True si el segmento a→b (en píxeles) pasa solo por celdas pisables"""
+        ax, ay = a
+        bx, by = b
+        steps = int(max(abs(bx - ax), abs(by - ay)) / (self.cell / 2)) + 1
+        for i in range(steps + 1):
+            t = i / steps
+            if not self.is_walkable(self.cell_of((ax + (bx - ax) * t, ay + (by - ay) * t))):
+                return False
+        return True
+
+    def find_path(self, start, goal):
+        """
+        Camino A* de `start` a `goal` (puntos en píxeles).
+        Devuelve la lista de puntos (centros de celda, sin los intermedios en línea recta)
+        terminando en `goal`, o None si no hay camino.
+        """
+        s = self.nearest_walkable(self.cell_of(start))
+        g = self.nearest_walkable(self.cell_of(goal))
+        if s is None or g is None:
+            return None
+
+        def h(c):
+            dx, dy = abs(c[0] - g[0]), abs(c[1] - g[1])
+            return 10 * max(dx, dy) + 4 * min(dx, dy)
+
+        came = {s: None}
+        cost = {s: 0}
+        heap = [(h(s), 0, s)]
+        while heap:
+            _, c_cost, current = heapq.heappop(heap)
+            if current == g:
+                break
+            if c_cost > cost[current]:
+                continue
+            for n, step in self._steps(current):
+                new = c_cost + step
+                if new < cost.get(n, 1 << 30):
+                    cost[n] = new
+                    came[n] = current
+                    heapq.heappush(heap, (new + h(n), new, n))
+        if g not in came:
+            return None
+
+        cells = []
+        c = g
+        while c is not None:
+            cells.append(c)
+            c = came[c]
+        cells.reverse()
+
+        # Sacar los puntos intermedios que siguen en la misma dirección
+        points = []
+        for i, c in enumerate(cells):
+            if 0 < i < len(cells) - 1:
+                p, n = cells[i - 1], cells[i + 1]
+                if (c[0] - p[0], c[1] - p[1]) == (n[0] - c[0], n[1] - c[1]):
+                    continue
+            points.append(self.center_of(c))
+        points[-1] = (int(goal[0]), int(goal[1])) if self.is_walkable(self.cell_of(goal)) else points[-1]
+        return points
+
+    # ---------- FLOW FIELD ----------
+    def _flow(self, goal_cell):
+        """Distancias (en pasos) de cada celda al destino, hasta NAV_FLOW_RADIUS celdas"""
+        if goal_cell == self._flow_goal:
+            return self._flow_dist
+        dist = {goal_cell: 0}
+        queue = deque([goal_cell])
+        radius = settings.NAV_FLOW_RADIUS
+        while queue:
+            c = queue.popleft()
+            d = dist[c]
+            if d >= radius:
+                continue
+            for n, _ in self._steps(c):
+                if n not in dist:
+                    dist[n] = d + 1
+                    queue.append(n)
+        self._flow_goal = goal_cell
+        self._flow_dist = dist
+        return dist
+
+    def flow_direction(self, position, goal):
+        """
+        Dirección (vector unitario) para acercarse a `goal` desde `position` rodeando paredes,
+        o None si `position` está fuera del alcance del flow field.
+        El flow field se arma una vez por celda de destino y cada consulta son 8 lecturas.
+        """
+        g = self.nearest_walkable(self.cell_of(goal))
+        if g is None:
+            return None
+        dist = self._flow(g)
+        here = self.cell_of(position)
+        if here not in dist:
+            here = self.nearest_walkable(here, radius=2)
+            if here is None or here not in dist:
+                return None
+
+        best = None
+        for n, _ in self._steps(here):
+            d = dist.get(n)
+            if d is not None and d < dist[here] and (best is None or d < best[0]):
+                best = (d, n)
+        if best is None:
+            return None
+
+        target = pygame.Vector2(self.center_of(best[1])) - pygame.Vector2(position)
+        if target.length_squared() == 0:
+            return None
+        return tuple(target.normalize())
+
+
+def route_path(grid, path):
+    """
+    Reemplaza cada tramo recto de un path de NPC por el camino A* entre sus puntos
+    (incluido el tramo de vuelta del último al primero, porque el path es circular).
+    Si algún tramo no tiene camino, ese tramo queda recto.
+    """
+    if len(path) < 2:
+        return path
+    routed = []
+    points = [tuple(p) for p in path]
+    for i, a in enumerate(points):
+        b = points[(i + 1) % len(points)]
+        leg = grid.find_path(a, b)
+        routed.append(list(a))
+        if leg:
+            routed += [list(p) for p in leg[1:-1]]  # sin la celda de salida ni el punto de llegada
+    return routed
@@ -0,0 +1,210 @@
+import pygame
+from core import settings
+
+
+# Prehorneado de capas estáticas: background + props que nunca se cruzan con algo que se mueve
+
+def reachable_cells(current_map):
+    """
+    Posiciones de hitbox (en una grilla de PREBAKE_GRID px) a las que el jugador puede llegar
+    caminando desde los spawn points, sin atravesar paredes ni props con colisión.
+    Es una sobreaproximación: se prueba una hitbox achicada, así nunca se deja afuera
+    una posición alcanzable de verdad.
+    """
+    g = settings.PREBAKE_GRID
+    hb_w, hb_h = settings.PREBAKE_HITBOX
+    # La hitbox no sale de los bordes del mapa (ahí se cambia de mapa o se frena)
+    cols = max(0, current_map["width"] - hb_w) // g + 1
+    rows = max(0, current_map["height"] - hb_h) // g + 1
+
+    # Hitbox de prueba de la celda (cx, cy): arranca en (cx*g + g-1, cy*g + g-1) con tamaño (pw, ph)
+    pw = max(1, hb_w - g + 1)
+    ph = max(1, hb_h - g + 1)
+
+    # Rasterizar paredes y props con colisión sobre la grilla (en vez de consultar celda por celda)
+    blocked = bytearray(cols * rows)
+    solids = list(current_map["collision"])
+    for prop in current_map["props"]:
+        solids += prop.solids()
+    for r in solids:
+        # Celdas cuya hitbox de prueba se superpone con r
+        cx0 = max(0, (r.left - pw - g + 1) // g + 1)
+        cx1 = min(cols - 1, -((g - 1 - r.right) // g) - 1)
+        cy0 = max(0, (r.top - ph - g + 1) // g + 1)
+        cy1 = min(rows - 1, -((g - 1 - r.bottom) // g) - 1)
+        for cy in range(cy0, cy1 + 1):
+            row = cy * cols
+            for cx in range(cx0, cx1 + 1):
+                blocked[row + cx] = 1
+
+    def free(cx, cy):
+        return not blocked[cy * cols + cx]
+
+    seeds = []
+    for sp in current_map.get("spawn_points", {}).values():
+        cell = (int(sp["x"]) // g, int(sp["y"]) // g)
+        if 0 <= cell[0] < cols and 0 <= cell[1] < rows and free(*cell):
+            seeds.append(cell)
+
+    # Sin spawns válidos no se puede saber qué es alcanzable: se toma todo lo libre
+    if not seeds:
+        return [(cx, cy) for cx in range(cols) for cy in range(rows) if free(cx, cy)]
+
+    seen = set(seeds)
+    stack = list(seeds)
+    while stack:
+        cx, cy = stack.pop()
+        for nx in (cx - 1, cx, cx + 1):
+            for ny in (cy - 1, cy, cy + 1):
+                if (nx, ny) in seen or not (0 <= nx < cols and 0 <= ny < rows):
+                    continue
+                if free(nx, ny):
+                    seen.add((nx, ny))
+                    stack.append((nx, ny))
+    return list(seen)
+
+
+def player_extents(current_map):
+    """
+    Zona de pantalla donde pueden dibujarse el player y la companion, como una lista de
+    (rect, bottom_min, bottom_max) agrupada por fila de la grilla.
+    El bottom es el valor con el que se ordenan en el pase por "z".
+    """
+    g = settings.PREBAKE_GRID
+    hb_w, hb_h = settings.PREBAKE_HITBOX
+    sprite_w, sprite_h = settings.PREBAKE_SPRITE_SIZE
+    margin = settings.PREBAKE_COMPANION_MARGIN
+
+    # Extensión para la celda (0, 0); las demás son la misma desplazada
+    hb = pygame.Rect(0, 0, hb_w + g, hb_h + g)  # cubre toda la celda
+    sprite = pygame.Rect(0, 0, sprite_w + g, sprite_h + g)  # el sprite va centrado y apoyado en la hitbox
+    sprite.midbottom = hb.midbottom
+    sprite.union_ip(hb)
+    sprite.inflate_ip(2 * margin, 2 * margin)
+
+    # Juntar las celdas alcanzables de cada fila en tramos horizontales
+    rows = {}
+    for cx, cy in reachable_cells(current_map):
+        rows.setdefault(cy, []).append(cx)
+
+    extents = []
+    for cy, xs in rows.items():
+        xs.sort()
+        start = prev = xs[0]
+        for cx in xs[1:] + [None]:
+            if cx is not None and cx == prev + 1:
+                prev = cx
+                continue
+            area = sprite.move(start * g, cy * g)
+            area.width += (prev - start) * g
+            bottom = cy * g + hb.bottom
+            extents.append((area, bottom - g - margin, bottom + margin))
+            if cx is not None:
+                start = prev = cx
+    return extents
+
+
+def dynamic_extents(current_map):
+    """
+    Zonas de pantalla donde puede dibujarse algo que se mueve, como (rect, bottom_min, bottom_max).
+    """
+    extents = player_extents(current_map)
+
+    # NPCs que caminan: todo el recorrido de su rect
+    for npc in current_map["npcs"]:
+        if npc.walk_speed > 0 and npc.path:
+            area = npc.rect.copy()
+            for px, py in npc.path:
+                area.union_ip(npc.rect.move(int(px) - npc.rect.centerx, int(py) - npc.rect.centery))
+            extents.append((area, area.top + npc.rect.height, area.bottom))
+
+    return extents
+
+
+def classify_props(current_map):
+    """
+    Separa los props en tres grupos:
+    behind  → siempre se dibujan debajo de todo lo que se mueve (se hornean en el background)
+    front   → siempre se dibujan encima de todo lo que se mueve (se hornean en una capa aparte)
+    dynamic → se cruzan con algo que se mueve y tienen que seguir en el orden por "z"
+    """
+    props = current_map["props"]
+    extents = dynamic_extents(current_map)
+
+    # NPCs quietos: se ordenan por su bottom fijo
+    for npc in current_map["npcs"]:
+        if not (npc.walk_speed > 0 and npc.path):
+            extents.append((npc.rect, npc.rect.bottom, npc.rect.bottom))
+
+    behind = set()
+    front = set()
+    for i, prop in enumerate(props):
+        # Solo importa la parte visible del PNG
+        visible = prop.image.get_bounding_rect().move(prop.rect.topleft)
+        hits = [(lo, hi) for rect, lo, hi in extents if rect.colliderect(visible)]
+        bottom = prop.rect.bottom
+        if all(bottom <= lo for lo, _ in hits):
+            behind.add(i)
+        elif all(bottom > hi for _, hi in hits):
+            front.add(i)
+
+    # Entre props el orden también se tiene que mantener: si un prop horneado se superpone
+    # con uno de otra capa y el orden original era el contrario, vuelve al pase dinámico
+    def drawn_before(a, b):
+        return (props[a].rect.bottom, a) < (props[b].rect.bottom, b)
+
+    changed = True
+    while changed:
+        changed = False
+        for i in list(behind):
+            for j in range(len(props)):
+                if j != i and j not in behind and props[i].rect.colliderect(props[j].rect) and not drawn_before(i, j):
+                    behind.discard(i)
+                    changed = True
+                    break
+        for i in list(front):
+            for j in range(len(props)):
+                if j != i and j not in front and props[i].rect.colliderect(props[j].rect) and drawn_before(i, j):
+                    front.discard(i)
+                    changed = True
+                    break
+
+    dynamic = [p for i, p in enumerate(props) if i not in behind and i not in front]
+    order = lambda i: (props[i].rect.bottom, i)
+    return ([props[i] for i in sorted(behind, key=order)],
+            [props[i] for i in sorted(front, key=order)],
+            dynamic)
+
+
+def prebake(current_map):
+    """
+    Arma las capas estáticas del mapa:
+    base    → background con los props "behind" ya pegados
+    front   → superficie con transparencia con los props "front" (o None si no hay)
+    dynamic → props que siguen en el pase por "z" cada frame
+    """
+    behind, front, dynamic = classify_props(current_map)
+    size = (current_map["width"], current_map["height"])
+
+    background = current_map.get("background")
+    if background:
+        base = background.copy()
+    else:
+        base = pygame.Surface(size).convert()
+        base.fill(current_map["color"])
+    for prop in behind:
+        prop.draw(base)
+
+    front_layer = None
+    if front:
+        front_layer = pygame.Surface(size, pygame.SRCALPHA).convert_alpha()
+        for prop in front:
+            prop.draw(front_layer)
+
+    return {
+        "base": base,
+        "front": front_layer,
+        "dynamic": dynamic,
+        "baked_behind": behind,
+        "baked_front": front,
+    }
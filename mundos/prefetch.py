@@ -0,0 +1,182 @@
+import threading
+from core import settings
+
+
+# Precarga en segundo plano de los mapas vecinos al actual
+class MapPrefetcher:
+    def __init__(self, map_manager, depth=None):
+        """
+        map_manager = MapManager dueño de los mapas (se usa su build_map)
+        depth = cuántos saltos del grafo de conexiones/teleports se precargan
+        """
+        self.map_manager = map_manager
+        self.depth = depth if depth is not None else settings.PREFETCH_DEPTH
+
+        self.ready = {}        # nombre -> mapa ya construido
+        self.failed = set()    # mapas que no se pudieron construir (se cargan normal)
+        self.wanted = []       # nombres ordenados por prioridad
+        self.building = None   # mapa que el hilo está construyendo ahora
+        self.stale = set()     # mapas descartados mientras se construían (esa construcción se tira)
+        self.current_name = None
+
+        # Estadísticas
+        self.hits = 0    # transiciones servidas desde un mapa precargado
+        self.misses = 0  # transiciones que tuvieron que construir el mapa en el momento
+
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="map-prefetch", daemon=True)
+        self._thread.start()
+
+    # ---------- GRAFO DE MAPAS ----------
+    @staticmethod
+    def exits(current_map):
+        """
+        Devuelve las salidas del mapa como lista de (nombre_destino, tipo, dato):
+        tipo "edge" → dato es la dirección, tipo "teleport" → dato es el Rect.
+        """
+        result = []
+        for direction, name in current_map.get("connections", {}).items():
+            result.append((name, "edge", direction))
+        for rect, tp in zip(current_map.get("teleports", []), current_map.get("teleports_data", [])):
+            result.append((tp["to_map"], "teleport", rect))
+        return result
+
+    @staticmethod
+    def exit_distance(current_map, player, kind, info):
+        """Distancia en píxeles entre la hitbox del jugador y una salida"""
+        hb = player.hitbox
+        if kind == "edge":
+            if info == "right":
+                return max(0, current_map["width"] - hb.right)
+            if info == "left":
+                return max(0, hb.left)
+            if info == "up":
+                return max(0, hb.top)
+            return max(0, current_map["height"] - hb.bottom)
+
+        # Teleport: distancia del centro de la hitbox al borde más cercano del rect
+        dx = max(info.left - hb.centerx, 0, hb.centerx - info.right)
+        dy = max(info.top - hb.centery, 0, hb.centery - info.bottom)
+        return (dx * dx + dy * dy) ** 0.5
+
+    def _order(self, player=None):
+        """
+        Ordena los mapas a precargar: primero por distancia en el grafo,
+        después por lo cerca que está el jugador de la salida correspondiente.
+        """
+        current = self.map_manager.current_map
+        best = {}  # nombre -> (distancia en grafo, distancia del jugador)
+
+        for name, kind, info in self.exits(current):
+            dist = self.exit_distance(current, player, kind, info) if player else 0
+            if name not in best or dist < best[name][1]:
+                best[name] = (1, dist)
+
+        # Saltos más lejanos: se descubren a partir de los mapas ya precargados
+        frontier = list(best)
+        for level in range(2, self.depth + 1):
+            next_frontier = []
+            for name in frontier:
+                built = self.ready.get(name)
+                if built is None:
+                    continue
+                for other, _, _ in self.exits(built):
+                    if other not in best:
+                        best[other] = (level, best[name][1])
+                        next_frontier.append(other)
+            frontier = next_frontier
+
+        best.pop(current["id"], None)
+        return sorted(best, key=lambda n: best[n])
+
+    # ---------- API USADA POR EL MAPMANAGER ----------
+    def plan(self, current_map, player=None):
+        """Se llama al entrar a un mapa: recalcula qué precargar y descarta lo que ya no hace falta"""
+        with self._cond:
+            self.current_name = current_map["id"]
+            self.wanted = self._order(player)
+            for name in list(self.ready):
+                if name not in self.wanted:
+                    del self.ready[name]
+            self.failed.clear()
+            self._cond.notify_all()
+
+    def update(self, player):
+        """Se llama cada frame: reordena la prioridad según la posición del jugador"""
+        order = self._order(player)
+        if order != self.wanted:
+            with self._cond:
+                self.wanted = order
+                self._cond.notify_all()
+
+    def take(self, name):
+        """
+        Devuelve el mapa precargado (y lo saca de la lista) o None si no está listo.
+        Si el hilo lo está construyendo justo ahora, espera a que termine.
+        """
+        with self._cond:
+            while self.building == name:
+                self._cond.wait()
+            built = self.ready.pop(name, None)
+            if built is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return built
+
+    def discard(self, name):
+        """
+        Descarta la copia precargada de un mapa (p. ej. porque cambió su JSON); se vuelve a armar.
+        Si el hilo lo está construyendo justo ahora, esa construcción (con los datos viejos) se tira.
+        """
+        with self._cond:
+            self.ready.pop(name, None)
+            if self.building == name:
+                self.stale.add(name)
+            self.failed.discard(name)
+            self._cond.notify_all()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "ready": list(self.ready)}
+
+    def stop(self):
+        """Detiene el hilo de precarga"""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+    # ---------- HILO DE PRECARGA ----------
+    def _next_job(self):
+        for name in self.wanted:
+            if name not in self.ready and name not in self.failed and name != self.current_name:
+                return name
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                name = self._next_job()
+                while self._running and name is None:
+                    self._cond.wait()
+                    name = self._next_job()
+                if not self._running:
+                    return
+                self.building = name
+
+            built = None
+            try:
+                built = self.map_manager.build_map(name)
+            except Exception as e:
+                print(f"[MapPrefetcher] No se pudo precargar {name}: {e}")
+
+            with self._cond:
+                self.building = None
+                if name in self.stale:
+                    self.stale.discard(name)  # cambió mientras se armaba: se vuelve a armar
+                elif built is None:
+                    self.failed.add(name)
+                elif name in self.wanted:
+                    self.ready[name] = built
+                self._cond.notify_all()
@@ -1,26 +1,134 @@
 import pygame
 import os
+from core import settings
+from core.assets import load_image
+
+# Máscaras por imagen (varios props pueden usar el mismo PNG): ruta -> (máscara, rects que la cubren)
+_masks = {}
+# Máscaras llenas del tamaño de cada hitbox que se prueba contra los props
+_rect_masks = {}
+
+
+def prop_mask(image_path, image):
+    """Máscara de colisión (canal alfa) de una imagen y los rects que la cubren, cacheados"""
+    entry = _masks.get(image_path)
+    if entry is None:
+        mask = pygame.mask.from_surface(image, settings.PROP_MASK_THRESHOLD)
+        entry = _masks[image_path] = (mask, covering_rects(mask, settings.PROP_MASK_CELL))
+    return entry
+
+
+def covering_rects(mask, cell):
+    """
+    Rects que cubren todos los píxeles de la máscara, en una grilla de `cell` píxeles:
+    una celda es sólida si tiene algún píxel; los tramos de celdas de cada fila se unen
+    y los tramos iguales de filas seguidas se apilan en un solo rect.
+    Sobreaproxima como mucho una celda, así sirven para navegación y prehorneado.
+    """
+    w, h = mask.get_size()
+    probe = pygame.mask.Mask((cell, cell), fill=True)
+    open_rects = {}  # (x0, x1) -> rect que viene creciendo desde filas anteriores
+    rects = []
+    for y in range(0, h, cell):
+        runs = []
+        start = None
+        for x in range(0, w, cell):
+            solid = mask.overlap(probe, (x, y)) is not None
+            if solid and start is None:
+                start = x
+            elif not solid and start is not None:
+                runs.append((start, x))
+                start = None
+        if start is not None:
+            runs.append((start, w))
+
+        still_open = {}
+        for run in runs:
+            rect = open_rects.pop(run, None)
+            if rect is None:
+                rect = pygame.Rect(run[0], y, run[1] - run[0], 0)
+                rects.append(rect)
+            rect.height = min(y + cell, h) - rect.y
+            still_open[run] = rect
+        open_rects = still_open
+    return rects
+
 
 class Prop:
     def __init__(self, x, y, image_path, collision=False, teleport_to=None):
         """
         image_path = ruta al PNG
-        collision = True → el player choca
+        collision = True → el player choca con todo el rect del PNG
+                    "mask" → el player choca solo con los píxeles visibles (canal alfa)
         teleport_to = {"map": "zona2", "spawn": "left"} → cambia de zona
         """
         if not os.path.exists(image_path):
             raise FileNotFoundError(image_path)
 
-        self.image = pygame.image.load(image_path).convert_alpha()
-        
+        self.image = load_image(image_path)
+        self.image_path = image_path
+
         # posición donde se dibuja el PNG
         self.rect = self.image.get_rect(topleft=(x, y))
 
         # colisión opcional (zona de choque)
-        self.collision = pygame.Rect(x, y, self.rect.width, self.rect.height) if collision else None
+        self.mask = None
+        self.mask_rects = []  # rects de mundo que cubren la máscara (para navegación y prehorneado)
+        if collision == "mask":
+            self.mask, rects = prop_mask(image_path, self.image)
+            self.mask_rects = [r.move(x, y) for r in rects]
+            # Broadphase: solo la parte visible del PNG (None si es transparente del todo)
+            self.collision = self.mask_rects[0].unionall(self.mask_rects[1:]) if self.mask_rects else None
+        else:
+            self.collision = pygame.Rect(x, y, self.rect.width, self.rect.height) if collision else None
 
         # cambio de zona opcional
         self.teleport_to = teleport_to
 
-    def draw(self, screen):
-        screen.blit(self.image, self.rect.topleft)
+    def solids(self):
+        """Rects que bloquean el paso (para rasterizar en grillas)"""
+        if self.mask is not None:
+            return self.mask_rects
+        return [self.collision] if self.collision else []
+
+    def overlap(self, rect):
+        """
+        Parte del rect de mundo `rect` que se superpone con el prop (un Rect), o None.
+        Con máscara es el bounding rect de los píxeles que chocan.
+        """
+        if self.collision is None or not rect.colliderect(self.collision):
+            return None
+        if self.mask is None:
+            return rect.clip(self.collision)
+
+        size = rect.size
+        probe = _rect_masks.get(size)
+        if probe is None:
+            probe = _rect_masks[size] = pygame.mask.Mask(size, fill=True)
+        offset = (rect.x - self.rect.x, rect.y - self.rect.y)
+        if self.mask.overlap(probe, offset) is None:
+            return None
+        # Se arma desde la hitbox (máscara chica) para no recorrer toda la del prop
+        hit = probe.overlap_mask(self.mask, (-offset[0], -offset[1])).get_bounding_rects()
+        return hit[0].unionall(hit[1:]).move(rect.topleft)
+
+    def push_out(self, rect, tries=4):
+        """
+        Saca `rect` (una hitbox) de los píxeles del prop, por el lado que menos hay que moverlo.
+        Devuelve True si lo movió.
+        """
+        moved = False
+        for _ in range(tries):
+            hit = self.overlap(rect)
+            if hit is None:
+                break
+            moves = [(hit.right - rect.left, 0), (hit.left - rect.right, 0),
+                     (0, hit.bottom - rect.top), (0, hit.top - rect.bottom)]
+            dx, dy = min(moves, key=lambda m: abs(m[0]) + abs(m[1]))
+            rect.move_ip(dx, dy)
+            moved = True
+        return moved
+
+    def draw(self, screen, offset=(0, 0)):
+        # offset = posición de la cámara (las coordenadas del prop son de mundo)
+        screen.blit(self.image, (self.rect.x - offset[0], self.rect.y - offset[1]))
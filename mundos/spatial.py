@@ -0,0 +1,125 @@
+import pygame
+from core import settings
+
+
+# Grilla uniforme (spatial hash) para no revisar todos los rects en cada consulta
+class SpatialHash:
+    def __init__(self, cell_size=None):
+        self.cell_size = cell_size or settings.SPATIAL_CELL_SIZE
+        self.cells = {}    # (cx, cy) -> set de claves
+        self.entries = {}  # clave -> [orden, objeto, rect, celdas]
+        self._seq = 0      # orden de inserción, para devolver resultados estables
+
+    @staticmethod
+    def _key(item):
+        # Los pygame.Rect no son hashables, así que se indexa por identidad
+        return id(item)
+
+    def _cells_for(self, rect):
+        cs = self.cell_size
+        x0 = rect.left // cs
+        y0 = rect.top // cs
+        x1 = (rect.right - 1) // cs if rect.width > 0 else x0
+        y1 = (rect.bottom - 1) // cs if rect.height > 0 else y0
+        return tuple((cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1))
+
+    def insert(self, item, rect):
+        """Agrega un objeto con su rect (si ya estaba, lo mueve)"""
+        key = self._key(item)
+        if key in self.entries:
+            self.move(item, rect)
+            return
+        cells = self._cells_for(rect)
+        self.entries[key] = [self._seq, item, pygame.Rect(rect), cells]
+        self._seq += 1
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, item):
+        key = self._key(item)
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for cell in entry[3]:
+            bucket = self.cells.get(cell)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+
+    def move(self, item, rect):
+        """
+        Actualiza la posición de un objeto que se movió.
+        Solo toca las celdas si cambió de celda (lo normal es que no).
+        """
+        key = self._key(item)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.insert(item, rect)
+            return
+        entry[2].update(rect)
+        cells = self._cells_for(rect)
+        if cells == entry[3]:
+            return
+        for cell in entry[3]:
+            bucket = self.cells.get(cell)
+            if bucket:
+                bucket.discard(key)
+                if not bucket:
+                    del self.cells[cell]
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(key)
+        entry[3] = cells
+
+    def _colliding(self, rect):
+        """Entradas cuyo rect choca con `rect` (sin orden)"""
+        found = {}
+        entries = self.entries
+        for cell in self._cells_for(rect):
+            bucket = self.cells.get(cell)
+            if not bucket:
+                continue
+            for key in bucket:
+                if key not in found:
+                    entry = entries[key]
+                    if entry[2].colliderect(rect):
+                        found[key] = entry
+        return found.values()
+
+    def query(self, rect):
+        """Devuelve los objetos cuyo rect choca con `rect`, en orden de inserción"""
+        found = self._colliding(rect)
+        if len(found) > 1:
+            return [e[1] for e in sorted(found, key=lambda e: e[0])]
+        return [e[1] for e in found]
+
+    def iter_colliding(self, rect):
+        """
+        Recorre en orden de inserción los objetos que chocan con `rect`,
+        volviendo a consultar si `rect` se modifica durante el recorrido
+        (igual que recorrer la lista completa y probar colliderect en cada paso).
+        """
+        last = -1
+        while True:
+            best = None
+            for entry in self._colliding(rect):
+                if entry[0] > last and (best is None or entry[0] < best[0]):
+                    best = entry
+            if best is None:
+                return
+            last = best[0]
+            yield best[1]
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def colliding(collisions, rect):
+    """
+    Recorre los rects de `collisions` que chocan con `rect`, en orden.
+    Acepta tanto un SpatialHash como una lista común de rects; `rect` se puede
+    empujar dentro del for (como hace move_both) y el resultado es el mismo.
+    """
+    if isinstance(collisions, SpatialHash):
+        return collisions.iter_colliding(rect)
+    return (c for c in collisions if rect.colliderect(c))
@@ -0,0 +1,147 @@
+"""
+Generador de mapas sintéticos para medir rendimiento (ver core/benchmark.py).
+
+Arma zonas con la misma estructura JSON que mundos/mapas/zonaN.json, pero con la cantidad
+de colisiones, props, NPCs que caminan y largo de diálogos que se pida.
+Los sprites también se generan (rectángulos de colores), así no dependen de los assets.
+
+Uso:
+    python -m mundos.stress_maps carpeta_salida
+"""
+import json
+import os
+import random
+import sys
+
+import pygame
+
+# Tamaños de prueba: nombre -> (colisiones, props, NPCs que caminan, líneas de diálogo por NPC)
+SIZES = {
+    "stress_s": (50, 10, 5, 5),
+    "stress_m": (200, 40, 20, 20),
+    "stress_l": (800, 120, 60, 60),
+}
+
+MAP_W = 800
+MAP_H = 600
+
+# Zona libre en el centro: ahí se ubica el player para medir (sin paredes encima)
+SAFE_AREA = pygame.Rect(MAP_W // 2 - 80, MAP_H // 2 - 80, 160, 160)
+
+WORDS = ("LENARD", "PIKA", "chico", "foco", "pueblo", "ruinas", "bosque", "reporte", "jefe",
+         "sombra", "camino", "luz", "extraño", "busquen", "noche", "radio", "paraguas")
+
+
+def _sprites(out_dir):
+    """Crea (una sola vez) los PNG de props y NPCs sintéticos y devuelve sus rutas"""
+    sprite_dir = os.path.join(out_dir, "sprites")
+    os.makedirs(sprite_dir, exist_ok=True)
+    paths = {}
+    specs = {
+        "prop_arbol": ((48, 72), (40, 120, 50)),
+        "prop_caja": ((40, 40), (140, 100, 60)),
+        "prop_cartel": ((32, 56), (200, 200, 80)),
+        "npc": ((32, 48), (180, 80, 160)),
+    }
+    for name, (size, color) in specs.items():
+        path = os.path.join(sprite_dir, f"{name}.png")
+        if not os.path.exists(path):
+            surf = pygame.Surface(size, pygame.SRCALPHA)
+            # Borde transparente para que el bounding rect no sea el PNG entero (como los props reales)
+            pygame.draw.rect(surf, color, surf.get_rect().inflate(-4, -4), border_radius=6)
+            pygame.image.save(surf, path)
+        paths[name] = path
+    return paths
+
+
+def _free_rect(rnd, w, h):
+    """Rect al azar dentro del mapa que no pisa la zona libre del centro"""
+    while True:
+        r = pygame.Rect(rnd.randrange(0, MAP_W - w), rnd.randrange(0, MAP_H - h), w, h)
+        if not r.colliderect(SAFE_AREA):
+            return r
+
+
+def _dialogue(rnd, lines):
+    """Líneas con el mismo formato que las reales: "Nombre: \\nrenglón \\nrenglón" """
+    result = []
+    for i in range(lines):
+        rows = [" ".join(rnd.choice(WORDS) for _ in range(rnd.randint(5, 9))) for _ in range(rnd.randint(1, 3))]
+        result.append(f"NPC {i}: \n" + " \n".join(rows) + ".")
+    return result
+
+
+def generate(name, collisions, props, npcs, dialogue_lines, seed=0, sprite_paths=None):
+    """Devuelve los datos de una zona sintética (mismo formato que los JSON de mundos/mapas)"""
+    rnd = random.Random(f"{name}:{seed}")
+    sprite_paths = sprite_paths or {}
+
+    data = {
+        "name": name,
+        "width": MAP_W,
+        "height": MAP_H,
+        "color": [40, 60, 40],
+        "collision": [],
+        "connections": {},
+        "spawn_points": {"left": {"x": SAFE_AREA.centerx, "y": SAFE_AREA.centery}},
+        "npcs": [],
+        "props": [],
+    }
+
+    for _ in range(collisions):
+        r = _free_rect(rnd, rnd.randint(8, 40), rnd.randint(8, 40))
+        data["collision"].append({"x": r.x, "y": r.y, "w": r.w, "h": r.h})
+
+    prop_kinds = ["prop_arbol", "prop_caja", "prop_cartel"]
+    for i in range(props):
+        r = _free_rect(rnd, 48, 72)
+        data["props"].append({
+            "x": r.x,
+            "y": r.y,
+            "image": sprite_paths.get(prop_kinds[i % 3], ""),
+            "collision": i % 2 == 0,
+        })
+
+    for i in range(npcs):
+        start = _free_rect(rnd, 32, 48)
+        path = [list(start.center)]
+        for _ in range(rnd.randint(1, 3)):
+            path.append(list(_free_rect(rnd, 32, 48).center))
+        data["npcs"].append({
+            "name": f"NPC {i}",
+            "x": start.x,
+            "y": start.y,
+            "sprite": sprite_paths.get("npc", ""),
+            "dialogue": _dialogue(rnd, dialogue_lines),
+            "walk_speed": rnd.randint(30, 90),
+            "path": path,
+        })
+
+    return data
+
+
+def write_all(out_dir, sizes=None, seed=0):
+    """Escribe todas las zonas sintéticas en out_dir y devuelve sus nombres"""
+    os.makedirs(out_dir, exist_ok=True)
+    sprite_paths = _sprites(out_dir)
+    names = []
+    for name, (collisions, props, npcs, lines) in (sizes or SIZES).items():
+        data = generate(name, collisions, props, npcs, lines, seed, sprite_paths)
+        with open(os.path.join(out_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        names.append(name)
+    return names
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__)
+        return 1
+    names = write_all(argv[0])
+    print(f"{len(names)} mapas sintéticos generados en {argv[0]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+import pygame
+from core.scene import Scene
+from core.boot import BootLoader
+from ui.menu import Menu
+
+
+# Menú principal como escena: mientras está en pantalla el BootLoader carga el juego detrás
+class MenuScene(Scene):
+    def __init__(self, game):
+        super().__init__(game)
+        self.menu = None
+        self.boot = None       # BootLoader (arranca al entrar al menú)
+        self.waiting = False   # se eligió "Jugar" y se espera a que termine el arranque
+
+    def preload(self):
+        # Solo el fondo: las imágenes grandes las carga el BootLoader (ver Menu.load_art)
+        self.menu = Menu(self.game.screen)
+
+    def unload(self):
+        self.menu = None
+
+    def on_enter(self):
+        if self.boot is None:
+            self.boot = BootLoader(self.menu)
+
+    def handle_events(self, events):
+        for event in events:
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                self.game.running = False
+                return
+
+            # Delegar eventos al menú
+            result = self.menu.handle_event(event)
+            if result == "Jugar":
+                self.waiting = True
+            elif result == "Salir":
+                self.game.running = False
+
+    def update(self, dt, events):
+        self.handle_events(events)
+        if self.game.running and self.waiting and self.boot.wait(0):
+            # Todo cargado: el overworld reemplaza al menú en la pila
+            self.game.enter_overworld(self.boot)
+            return
+        self.menu.update(dt)
+
+    def draw(self, screen):
+        self.menu.draw()
+        if self.waiting:
+            self.menu.draw_progress(self.boot.progress, self.boot.stage)
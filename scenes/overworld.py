@@ -2,13 +2,31 @@ import pygame
 from entidades.player import Player
 from entidades.companion import Companion
 from mundos.map_manager import MapManager
+from core.scene import Scene
 
-class OverworldScene:
+class OverworldScene(Scene):
     def __init__(self, game):
-        self.game = game  # referencia al objeto Game principal
+        super().__init__(game)  # referencia al objeto Game principal
         self.map_manager = MapManager(game)  # administrador de mapas
         self.player = Player(193, 360)  # crear player en coordenadas iniciales
         self.companion = Companion(160, 360)  # crear compañera (seguirá al player)
+        self.loaded = True  # se arma ya cargada (mapa inicial, player y companion)
+
+    def attach(self, game):
+        """Engancha al Game una escena que se armó antes que él (en el hilo de arranque)"""
+        self.game = game
+        self.map_manager.game = game
+
+    # ---------- CARGA (la llama la pila de escenas) ----------
+    def preload(self):
+        self.map_manager.restore_static()
+
+    def unload(self):
+        # El estado (mapa, posiciones, NPCs) se conserva: solo se sueltan las capas grandes
+        self.map_manager.release_static()
+
+    def memory_bytes(self):
+        return self.map_manager.memory_bytes()
 
     def handle_events(self, event_list):
         """
@@ -18,9 +36,14 @@ class OverworldScene:
         """
         for event in event_list:
             if event.type == pygame.QUIT:
+                self.game.shutdown()
                 pygame.quit()
                 exit()
 
+            # F3: resaltar qué props quedaron prehorneados (ayuda para armar mapas)
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.map_manager.debug_prebake = not self.map_manager.debug_prebake
+
             if event.type == pygame.KEYDOWN and event.key == pygame.K_z:
                 # 1) Si hay diálogo activo → avanzarlo
                 if self.game.dialogue.active:
@@ -28,7 +51,8 @@ class OverworldScene:
                     return
 
                 # 2) Si no hay diálogo, buscar NPC cercano para interactuar
-                for npc in self.map_manager.current_map.get("npcs", []):
+                # (inflar la hitbox del player 40px equivale a inflar la de cada NPC)
+                for npc in self.map_manager.npcs_near(self.player.hitbox.inflate(40, 40)):
                     # Inflar hitbox del NPC para zona de interacción
                     if self.player.hitbox.colliderect(npc.hitbox.inflate(40, 40)):
                         self.player.can_move = False  # bloquear movimiento del player
@@ -38,6 +62,10 @@ class OverworldScene:
                         # guardar referencia al NPC con el que se interactúa
                         self.game.scene.current_npc = npc
 
+                        # flag de historia: cuántas veces se habló con este NPC (se guarda con la partida)
+                        seen = f"visto/{self.map_manager.current_map['id']}/{npc.name}"
+                        self.game.flags[seen] = self.game.flags.get(seen, 0) + 1
+
                         # iniciar diálogo con el NPC
                         self.game.dialogue.start(
                             npc.dialogue,
@@ -57,13 +85,38 @@ class OverworldScene:
         """
         self.handle_events(events)  # manejar eventos antes que todo
 
-        collisions = self.map_manager.current_map["collision"]
+        collisions = self.map_manager.current_map["collision_index"]
         # actualizar player (su método se encarga de input y colisiones)
         self.player.update(dt, collisions)
-        # companion sigue al player
-        self.companion.follow(self.player, dt)
+        # companion sigue al player (rodeando paredes con la grilla de navegación del mapa)
+        nav = self.map_manager.current_map.get("nav")
+        self.companion.follow(self.player, dt, collisions, nav)
         # actualizar NPCs y colisiones del mapa
-        self.map_manager.update(self.player)
+        self.map_manager.update(self.player, dt)
+
+    def moving_entities(self):
+        """Lo que se mueve entre pasos de simulación: player, companion y NPCs que caminan"""
+        # (los NPCs de una multitud se interpolan todos juntos en su CrowdEngine)
+        entities = [self.player, self.companion]
+        entities += [npc for npc in self.map_manager.current_map.get("npcs", [])
+                     if npc.walk_speed > 0 and npc.crowd is None]
+        return entities
+
+    def snapshot(self):
+        """Guarda las posiciones actuales antes de un paso de simulación"""
+        for entity in self.moving_entities():
+            entity.snapshot()
+        crowd = self.map_manager.current_map.get("crowd")
+        if crowd:
+            crowd.snapshot()
+
+    def interpolate(self, alpha):
+        """Ubica los sprites entre el paso anterior y el actual antes de dibujar"""
+        for entity in self.moving_entities():
+            entity.interpolate(alpha)
+        crowd = self.map_manager.current_map.get("crowd")
+        if crowd:
+            crowd.interpolate(alpha)
 
     def draw(self, screen):
         """
@@ -71,3 +124,5 @@ class OverworldScene:
         """
         # MapManager dibuja background, props, NPCs, player y companion en orden correcto
         self.map_manager.draw(screen, self.player, self.companion)
+        # y el diálogo encima (también se ve debajo de la pausa)
+        self.game.dialogue.draw(screen)
@@ -0,0 +1,64 @@
+import pygame
+from core import memory
+from core.scene import Scene
+
+
+# Pausa: se dibuja encima del overworld (que queda suspendido tal como estaba)
+class PauseScene(Scene):
+    opaque = False        # se ve el mapa de fondo
+    keep_resident = True  # se abre y se cierra seguido: no vale la pena descargarla
+
+    OPTIONS = ["Continuar", "Salir"]
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.selected_index = 0
+        self.font = None
+        self.title_font = None
+        self.shade = None
+
+        self.YELLOW = (255, 255, 0)
+        self.WHITE = (255, 255, 255)
+
+    def preload(self):
+        self.font = pygame.font.SysFont("Comicsans", 40)
+        self.title_font = pygame.font.SysFont("Comicsans", 64)
+
+    def unload(self):
+        self.font = self.title_font = self.shade = None
+
+    def on_enter(self):
+        self.selected_index = 0
+
+    def handle_events(self, events):
+        for event in events:
+            if event.type != pygame.KEYDOWN:
+                continue
+            if event.key == pygame.K_ESCAPE:
+                self.game.scenes.pop()  # vuelve al juego
+                return
+            if event.key in [pygame.K_w, pygame.K_UP]:
+                self.selected_index = (self.selected_index - 1) % len(self.OPTIONS)
+            elif event.key in [pygame.K_s, pygame.K_DOWN]:
+                self.selected_index = (self.selected_index + 1) % len(self.OPTIONS)
+            elif event.key in [pygame.K_RETURN, pygame.K_z]:
+                if self.OPTIONS[self.selected_index] == "Continuar":
+                    self.game.scenes.pop()
+                else:
+                    self.game.running = False
+                return
+
+    def draw(self, screen):
+        # Oscurece lo que quedó abajo (la superficie se arma una vez por tamaño de pantalla)
+        if self.shade is None or self.shade.get_size() != screen.get_size():
+            self.shade = memory.track(pygame.Surface(screen.get_size(), pygame.SRCALPHA), "ui:pausa", "sombra")
+            self.shade.fill((0, 0, 0, 150))
+        screen.blit(self.shade, (0, 0))
+
+        cx = screen.get_width() // 2
+        title = self.title_font.render("Pausa", True, self.WHITE)
+        screen.blit(title, title.get_rect(center=(cx, 180)))
+        for i, texto in enumerate(self.OPTIONS):
+            color = self.YELLOW if i == self.selected_index else self.WHITE
+            text_surf = self.font.render(texto, True, color)
+            screen.blit(text_surf, text_surf.get_rect(center=(cx, 300 + i * 80)))
@@ -1,5 +1,13 @@
 import pygame
 import os
+from core.assets import load_image  # Cache compartida de imágenes
+from core import memory  # Cuenta de memoria por dueño
+from ui.text_layout import TextLayout  # Renglones prerenderizados para la máquina de escribir
+from ui import dialogue_db  # Líneas ya cortadas en renglones (base de diálogos)
+
+# Alto de las cajas de diálogo en pantalla
+BOX_HEIGHT = 450
+
 
 class DialogueSystem:
     def __init__(self, game):
@@ -10,23 +18,15 @@ class DialogueSystem:
         self.text_speed = 0.03  
         self.time_acc = 0.0  # Acumulador de tiempo para mostrar progresivamente texto
 
-        self.dialogues = []  # Lista de líneas de diálogo a mostrar
+        self.dialogues = []  # Lista de líneas de diálogo a mostrar (dialogue_db.Line)
         self.current_index = 0  # Índice de la línea de diálogo actual
 
         self.full_text = ""  # Texto completo de la línea actual
-        self.current_text = ""  # Texto mostrado progresivamente
-
-        # Cajas de diálogo para jugador y NPC
-        base = os.path.join("assets", "ui_assets")
-        self.box_player = pygame.image.load(os.path.join(base, "textboxplayer.png")).convert_alpha()
-        self.box_npc = pygame.image.load(os.path.join(base, "textboxnpc.png")).convert_alpha()
+        self.cursor = 0  # Cantidad de caracteres de full_text que ya se muestran
+        self.layout = []  # Renglones de full_text ya renderizados (ver TextLayout)
 
-        # Escalar cajas para altura fija
-        TARGET_HEIGHT = 450
-        SCALE = TARGET_HEIGHT / self.box_player.get_height()
-        TARGET_WIDTH = int(self.box_player.get_width() * SCALE)
-        self.box_player = pygame.transform.scale(self.box_player, (TARGET_WIDTH, TARGET_HEIGHT))
-        self.box_npc = pygame.transform.scale(self.box_npc, (TARGET_WIDTH, TARGET_HEIGHT))
+        # Cajas de diálogo para jugador y NPC (e imagen final opcional)
+        self.box_player, self.box_npc, self.final_image = self.preload()
 
         # Posición de las cajas en pantalla
         self.box_offset_x = -140
@@ -37,13 +37,16 @@ class DialogueSystem:
         self.text_offset_y = 205
         self.line_spacing = 28  # Espaciado entre líneas
 
-        self.font = pygame.font.Font("assets/fonts/DTM-Sans.otf", 22)  # Fuente del texto
+        # Fuente del texto (la misma para la que se cortaron los renglones de la base de diálogos)
+        self.font = pygame.font.Font(dialogue_db.FONT_PATH, dialogue_db.FONT_SIZE)
+        self.text = TextLayout(self.font, (255, 255, 255))  # Cache de renglones renderizados
         self.speaker = "npc"  # Quién habla ("npc" o "player")
 
         # Para mostrar retrato o sprite junto al diálogo
         self.portrait_image = None
         self.portrait_offset_x = 0
         self.portrait_offset_y = 0
+        self.npc_portrait = None  # retrato del NPC (para las líneas que no traen uno propio)
 
         # Variables para secuencia final especial
         self.special_end_sequence = False
@@ -52,44 +55,69 @@ class DialogueSystem:
         self.sequence_timer = 0
         self.final_text_1 = "Tu destino está escrito..."
         self.final_text_2 = "Pero aún puedes cambiarlo."
+        self.fade_surf = None  # Superficie del fade (se crea una vez)
+
+
+    @staticmethod
+    def preload():
+        """
+        Carga (en la cache compartida) las imágenes del diálogo y las devuelve:
+        (caja del jugador, caja del NPC, imagen final o None).
+        Se puede llamar desde el hilo de arranque antes de crear el DialogueSystem.
+        """
+        base = os.path.join("assets", "ui_assets")
+        # Escalar cajas para altura fija (la del NPC toma el mismo tamaño que la del jugador)
+        box_player = load_image(os.path.join(base, "textboxplayer.png"), height=BOX_HEIGHT)
+        box_npc = load_image(os.path.join(base, "textboxnpc.png"), size=box_player.get_size())
 
         # Imagen final opcional
         final_img_path = os.path.join("assets", "images", "Elfinal.png")
-        if os.path.exists(final_img_path):
-            self.final_image = pygame.image.load(final_img_path).convert_alpha()
-        else:
-            self.final_image = None
+        final_image = load_image(final_img_path) if os.path.exists(final_img_path) else None
+        for image in (box_player, box_npc, final_image):
+            memory.track(image, "ui:dialogo")
+        return box_player, box_npc, final_image
 
     # -------------------
     # INICIAR UN DIÁLOGO
     # -------------------
     def start(self, dialogue_list, speaker="npc", portrait=None):
+        """
+        dialogue_list = líneas de la base de diálogos (dialogue_db.Line) o textos sueltos
+        portrait = retrato del NPC (lo usan las líneas que no traen uno propio)
+        """
         if not dialogue_list:
             return  # No hacer nada si no hay líneas
+        if isinstance(dialogue_list[0], str):
+            dialogue_list = dialogue_db.lines(dialogue_list)
 
         self.active = True
         self.dialogues = dialogue_list
         self.current_index = 0
         self.speaker = speaker
+        self.npc_portrait = portrait
+
+        self.set_line(self.dialogues[0])  # Línea completa actual
+
+        # Bloquear movimiento del jugador durante el diálogo
+        self.game.scene.player.can_move = False
 
-        self.full_text = self.dialogues[0]  # Línea completa actual
-        self.current_text = ""  # Texto mostrado progresivamente
+    def set_line(self, line):
+        """Pasa a una línea nueva: se arma su layout una sola vez y el cursor vuelve a 0"""
+        self.full_text = line.text
+        self.layout = self.text.layout_rows(line.rows)  # los renglones ya vienen cortados
+        self.cursor = 0
         self.time_acc = 0.0
 
-        # Cargar retrato opcional
+        # Retrato de quien habla en esta línea (p. ej. Lenard o Pika), si no el del NPC
+        portrait = line.portrait or self.npc_portrait
         if portrait:
-            img = pygame.image.load(portrait["path"]).convert_alpha()
-            scale = portrait.get("scale", 1.0)
-            img = pygame.transform.scale(img, (int(img.get_width()*scale), int(img.get_height()*scale)))
-            self.portrait_image = img
+            self.portrait_image = load_image(portrait["path"], scale=portrait.get("scale", 1.0))
+            memory.track(self.portrait_image, "ui:retratos", portrait["path"])
             self.portrait_offset_x = portrait.get("offset_x", 0)
             self.portrait_offset_y = portrait.get("offset_y", 0)
         else:
             self.portrait_image = None
 
-        # Bloquear movimiento del jugador durante el diálogo
-        self.game.scene.player.can_move = False
-
     # -------------------
     # MANEJAR INPUT PARA AVANZAR EL DIÁLOGO
     # -------------------
@@ -98,8 +126,8 @@ class DialogueSystem:
             return
 
         # Mostrar toda la línea si aún no se completó
-        if len(self.current_text) < len(self.full_text):
-            self.current_text = self.full_text
+        if self.cursor < len(self.full_text):
+            self.cursor = len(self.full_text)
             return
 
         # Pasar a la siguiente línea
@@ -112,7 +140,7 @@ class DialogueSystem:
             # Secuencia especial si el NPC se llama "muerte"
             if npc and npc.name.lower() == "muerte":
                 final_line = "MUERTE: \nY ustedes tambien."
-                if self.dialogues[-1].strip() == final_line.strip():
+                if self.dialogues[-1].text.split() == final_line.split():
                     self.start_special_sequence()
                     return
 
@@ -122,9 +150,7 @@ class DialogueSystem:
             return
 
         # Actualizar línea y reiniciar texto progresivo
-        self.full_text = self.dialogues[self.current_index]
-        self.current_text = ""
-        self.time_acc = 0.0
+        self.set_line(self.dialogues[self.current_index])
 
     # -------------------
     # INICIAR SECUENCIA FINAL ESPECIAL
@@ -147,14 +173,13 @@ class DialogueSystem:
             self.update_special_sequence(dt)
             return
 
-        # Avanzar texto progresivamente
-        if len(self.current_text) < len(self.full_text):
+        # Avanzar texto progresivamente (solo se mueve el cursor, no se arman strings)
+        if self.cursor < len(self.full_text):
             self.time_acc += dt
-            while self.time_acc >= self.text_speed:
-                self.time_acc -= self.text_speed
-                n = len(self.current_text)
-                if n < len(self.full_text):
-                    self.current_text += self.full_text[n]
+            steps = int(self.time_acc // self.text_speed)
+            if steps:
+                self.time_acc -= steps * self.text_speed
+                self.cursor = min(len(self.full_text), self.cursor + steps)
 
     # -------------------
     # ACTUALIZAR SECUENCIA ESPECIAL FINAL
@@ -193,9 +218,31 @@ class DialogueSystem:
 
         # Finalizar juego
         if self.sequence_state == "end_game":
+            self.game.shutdown()
             pygame.quit()
             raise SystemExit
 
+    # -------------------
+    # REGIÓN Y ESTADO (para el renderer de rectángulos sucios)
+    # -------------------
+    def get_rect(self, screen):
+        """Rect de pantalla que ocupa la caja de diálogo junto con el retrato"""
+        box = self.box_npc if self.speaker == "npc" else self.box_player
+        box_x = self.box_offset_x
+        box_y = screen.get_height() - box.get_height() + self.box_offset_y
+        rect = box.get_rect(topleft=(box_x, box_y))
+        if self.portrait_image:
+            rect.union_ip(self.portrait_image.get_rect(
+                topleft=(box_x + self.portrait_offset_x, box_y + self.portrait_offset_y)))
+        return rect
+
+    def render_state(self):
+        """Todo lo que cambia lo que se ve del diálogo; si no cambió, no hace falta redibujarlo"""
+        if not self.active:
+            return None
+        return (self.speaker, self.current_index, self.cursor,
+                id(self.portrait_image), self.special_end_sequence)
+
     # -------------------
     # DIBUJAR DIÁLOGO
     # -------------------
@@ -222,33 +269,29 @@ class DialogueSystem:
         # Dibujar caja
         screen.blit(box, (box_x, box_y))
 
-        # Dibujar texto línea por línea
+        # Dibujar texto línea por línea (renglones ya renderizados, recortados hasta el cursor)
         text_x = box_x + self.text_offset_x
         text_y = box_y + self.text_offset_y
-        for line in self.current_text.split("\n"):
-            text_surface = self.font.render(line, True, (255, 255, 255))
-            screen.blit(text_surface, (text_x, text_y))
-            text_y += self.line_spacing
+        self.text.draw(screen, self.layout, text_x, text_y, self.line_spacing, self.cursor)
 
     # -------------------
     # DIBUJAR SECUENCIA ESPECIAL FINAL
     # -------------------
     def draw_special_sequence(self, screen):
         # Fade negro
-        fade_surf = pygame.Surface((screen.get_width(), screen.get_height()))
-        fade_surf.fill((0, 0, 0))
-        fade_surf.set_alpha(int(self.fade_alpha))
-        screen.blit(fade_surf, (0, 0))
-
-        text_color = (255, 255, 255)
+        if self.fade_surf is None or self.fade_surf.get_size() != screen.get_size():
+            self.fade_surf = memory.track(pygame.Surface(screen.get_size()), "ui:dialogo", "fade")
+            self.fade_surf.fill((0, 0, 0))
+        self.fade_surf.set_alpha(int(self.fade_alpha))
+        screen.blit(self.fade_surf, (0, 0))
 
         # Mostrar texto o imagen según el estado
         if self.sequence_state == "show_text_1":
-            text_surface = self.font.render(self.final_text_1, True, text_color)
+            text_surface = self.text.line(self.final_text_1)[0]
             screen.blit(text_surface, ((screen.get_width() - text_surface.get_width()) // 2,
                                        (screen.get_height() - text_surface.get_height()) // 2))
         elif self.sequence_state == "show_text_2":
-            text_surface = self.font.render(self.final_text_2, True, text_color)
+            text_surface = self.text.line(self.final_text_2)[0]
             screen.blit(text_surface, ((screen.get_width() - text_surface.get_width()) // 2,
                                        (screen.get_height() - text_surface.get_height()) // 2))
         elif self.sequence_state == "show_image" and self.final_image:
@@ -0,0 +1,331 @@
+"""
+Base de diálogos: los guiones de todos los NPCs en un solo lugar, compartidos por todos los
+mapas. En los JSON de mapas cada NPC solo dice qué diálogo usa ("dialogue": "zona1/el_jefe");
+las líneas se leen recién cuando se habla con él.
+
+Fuente: assets/dialogos/dialogos.json
+    portraits → retrato -> {"scale", "offset_x", "offset_y", "moods": humor -> ruta del PNG}
+    dialogues → id -> lista de líneas {"speaker", "text", "portrait", "mood"}
+                (speaker, portrait y mood son opcionales; sin retrato se usa el del NPC
+                 y sin humor el "def" del retrato; "\\n" en text fuerza un salto de renglón)
+
+La base compilada ya trae cada línea cortada en renglones para la caja de diálogo
+(DTM-Sans de FONT_SIZE en TEXT_WIDTH píxeles), así el juego no mide ni corta texto.
+
+Uso:
+    python -m ui.dialogue_db           # valida y compila
+    python -m ui.dialogue_db --check   # solo valida
+
+Formato compilado (assets/dialogos/compilados/dialogos.qdlg):
+    cabecera  "<4sHHHqq": magic, versión, tamaño de fuente, ancho del texto, mtime_ns y tamaño del JSON
+    strings   cantidad, cantidad + 1 offsets "<I" y los textos en utf-8 seguidos (hablantes,
+              renglones, rutas e ids; cada string se guarda una vez y se decodifica al pedirlo)
+    retratos  cantidad; "<iiidii": retrato, humor, ruta (strings), escala, offset x, offset y
+    índice    cantidad; "<iII": id del diálogo (string), offset de sus líneas, cantidad de líneas
+    líneas    "<iiH": hablante (string o -1), retrato (índice o -1), cantidad de renglones;
+              después un "<i" (string) por renglón
+"""
+import json
+import os
+import struct
+import sys
+import threading
+
+import pygame
+from core import settings
+
+MAGIC = b"QDLG"
+VERSION = 1
+
+# Texto de la caja de diálogo (ver DialogueSystem): fuente y ancho para el que se cortan los renglones
+FONT_PATH = os.path.join("assets", "fonts", "DTM-Sans.otf")
+FONT_SIZE = 22
+TEXT_WIDTH = 720  # de text_offset_x al borde derecho de la pantalla
+
+COMPILED_DIR = os.path.join(os.path.dirname(settings.DIALOGUE_DB), "compilados")
+COMPILED_PATH = os.path.join(COMPILED_DIR, "dialogos.qdlg")
+
+HEADER = struct.Struct("<4sHHHqq")
+PORTRAIT = struct.Struct("<iiidii")
+INDEX = struct.Struct("<iII")
+LINE = struct.Struct("<iiH")
+SID = struct.Struct("<i")
+COUNT = struct.Struct("<I")
+
+
+# Una línea de diálogo ya cortada en renglones
+class Line:
+    __slots__ = ("speaker", "portrait", "rows")
+
+    def __init__(self, speaker, portrait, rows):
+        self.speaker = speaker    # quién habla (o None si es narración)
+        self.portrait = portrait  # {"path", "scale", "offset_x", "offset_y"} o None (el del NPC)
+        self.rows = rows          # renglones tal cual se dibujan (el primero es "Hablante:")
+
+    @property
+    def text(self):
+        return "\n".join(self.rows)
+
+    @classmethod
+    def from_text(cls, text):
+        """Línea escrita a mano en un mapa ("Hablante: \\nrenglón \\nrenglón"): se respetan sus saltos"""
+        return cls(split_speaker(text)[0], None, text.split("\n"))
+
+
+def split_speaker(text):
+    """(hablante o None, resto) de un texto que empieza con "Hablante: \\n" """
+    head, sep, rest = text.partition("\n")
+    head = head.strip()
+    if sep and head.endswith(":") and len(head) < 40:
+        return head[:-1].strip(), rest
+    return None, text
+
+
+def wrap(text, font, width):
+    """Corta el texto en renglones que entren en `width` píxeles (respeta los \\n)"""
+    rows = []
+    for paragraph in text.split("\n"):
+        row = ""
+        for word in paragraph.split(" "):
+            candidate = f"{row} {word}" if row else word
+            if row and font.size(candidate)[0] > width:
+                rows.append(row)
+                row = word
+            else:
+                row = candidate
+        rows.append(row.rstrip())
+    return rows
+
+
+# ---------- COMPILACIÓN ----------
+def read_source(path=None):
+    path = path or settings.DIALOGUE_DB
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Base de diálogos no encontrada: {path}")
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def validate(source, root="."):
+    """Errores de la fuente: retratos o humores que no existen y PNG faltantes"""
+    errors = []
+    portraits = source.get("portraits", {})
+    for name, portrait in portraits.items():
+        for mood, path in portrait.get("moods", {}).items():
+            if not os.path.exists(os.path.join(root, path)):
+                errors.append(f"retrato {name}/{mood}: no existe {path}")
+    for did, lines in source.get("dialogues", {}).items():
+        for i, line in enumerate(lines):
+            portrait = line.get("portrait")
+            if portrait is None:
+                if line.get("mood"):
+                    errors.append(f"{did} línea {i + 1}: humor sin retrato")
+                continue
+            if portrait not in portraits:
+                errors.append(f"{did} línea {i + 1}: retrato desconocido: {portrait}")
+            elif line.get("mood", "def") not in portraits[portrait].get("moods", {}):
+                errors.append(f"{did} línea {i + 1}: {portrait} no tiene el humor {line.get('mood', 'def')}")
+    return errors
+
+
+def compile_db(source, font, mtime_ns=0, size=0):
+    """Convierte la fuente (dict del JSON) en bytes de la base compilada"""
+    strings = []
+    ids = {}
+
+    def sid(text):
+        if text is None:
+            return -1
+        if text not in ids:
+            ids[text] = len(strings)
+            strings.append(text)
+        return ids[text]
+
+    portraits = []
+    portrait_ids = {}
+    for name, portrait in source.get("portraits", {}).items():
+        for mood, path in portrait.get("moods", {}).items():
+            portrait_ids[(name, mood)] = len(portraits)
+            portraits.append(PORTRAIT.pack(sid(name), sid(mood), sid(path), portrait.get("scale", 1.0),
+                                           portrait.get("offset_x", 0), portrait.get("offset_y", 0)))
+
+    index = []
+    body = bytearray()
+    for did, lines in source.get("dialogues", {}).items():
+        index.append((sid(did), len(body), len(lines)))
+        for line in lines:
+            speaker = line.get("speaker")
+            rows = ([f"{speaker}:"] if speaker else []) + wrap(line.get("text", ""), font, TEXT_WIDTH)
+            portrait = line.get("portrait")
+            pid = portrait_ids.get((portrait, line.get("mood", "def")), -1) if portrait else -1
+            body += LINE.pack(sid(speaker), pid, len(rows))
+            for row in rows:
+                body += SID.pack(sid(row))
+
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = [0]
+    for raw in encoded:
+        offsets.append(offsets[-1] + len(raw))
+    out = bytearray(HEADER.pack(MAGIC, VERSION, FONT_SIZE, TEXT_WIDTH, mtime_ns, size))
+    out += COUNT.pack(len(encoded)) + struct.pack(f"<{len(offsets)}I", *offsets) + b"".join(encoded)
+    out += COUNT.pack(len(portraits)) + b"".join(portraits)
+    out += COUNT.pack(len(index))
+    lines_start = len(out) + INDEX.size * len(index)
+    for did, offset, count in index:
+        out += INDEX.pack(did, lines_start + offset, count)
+    out += body
+    return bytes(out)
+
+
+def open_font():
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.font.Font(FONT_PATH, FONT_SIZE)
+
+
+# ---------- LECTURA ----------
+class DialogueDB:
+    def __init__(self, raw):
+        magic, version, font_size, width, self.mtime_ns, self.size = HEADER.unpack_from(raw, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Base de diálogos con formato desconocido")
+        self.font_size = font_size
+        self.width = width
+        self.raw = raw
+
+        pos = HEADER.size
+        (count,) = COUNT.unpack_from(raw, pos)
+        pos += COUNT.size
+        self._offsets = struct.unpack_from(f"<{count + 1}I", raw, pos)
+        pos += 4 * (count + 1)
+        self._strings_start = pos
+        self._strings = {}  # id -> str ya decodificado
+        pos += self._offsets[-1]
+
+        (count,) = COUNT.unpack_from(raw, pos)
+        pos += COUNT.size
+        self.portraits = []
+        for name, mood, path, scale, off_x, off_y in PORTRAIT.iter_unpack(raw[pos:pos + count * PORTRAIT.size]):
+            self.portraits.append({"path": self.string(path), "scale": scale,
+                                   "offset_x": off_x, "offset_y": off_y})
+        pos += count * PORTRAIT.size
+
+        (count,) = COUNT.unpack_from(raw, pos)
+        pos += COUNT.size
+        self.index = {self.string(did): (offset, lines)
+                      for did, offset, lines in INDEX.iter_unpack(raw[pos:pos + count * INDEX.size])}
+        self._dialogues = {}  # id -> [Line] (solo los que ya se pidieron)
+
+    def string(self, sid):
+        if sid < 0:
+            return None
+        text = self._strings.get(sid)
+        if text is None:
+            start = self._strings_start
+            text = self.raw[start + self._offsets[sid]:start + self._offsets[sid + 1]].decode("utf-8")
+            self._strings[sid] = text
+        return text
+
+    def get(self, did):
+        """Líneas de un diálogo (se decodifican la primera vez que se piden)"""
+        lines = self._dialogues.get(did)
+        if lines is not None:
+            return lines
+        if did not in self.index:
+            raise KeyError(f"Diálogo inexistente: {did}")
+        pos, count = self.index[did]
+        lines = []
+        for _ in range(count):
+            speaker, portrait, rows = LINE.unpack_from(self.raw, pos)
+            pos += LINE.size
+            sids = struct.unpack_from(f"<{rows}i", self.raw, pos)
+            pos += SID.size * rows
+            lines.append(Line(self.string(speaker), self.portraits[portrait] if portrait >= 0 else None,
+                              [self.string(s) for s in sids]))
+        self._dialogues[did] = lines
+        return lines
+
+    def stats(self):
+        return {"dialogues": len(self.index), "loaded": len(self._dialogues),
+                "strings": len(self._offsets) - 1, "decoded": len(self._strings), "bytes": len(self.raw)}
+
+
+_db = None
+_lock = threading.Lock()  # los mapas (y sus NPCs) también se arman en el hilo de precarga
+
+
+def load_db():
+    """
+    La base de diálogos (una sola vez): la compilada si está al día con el JSON,
+    si no se compila en memoria a partir del JSON.
+    """
+    global _db
+    with _lock:
+        if _db is None:
+            st = os.stat(settings.DIALOGUE_DB) if os.path.exists(settings.DIALOGUE_DB) else None
+            if st is not None and os.path.exists(COMPILED_PATH):
+                with open(COMPILED_PATH, "rb") as f:
+                    raw = f.read()
+                try:
+                    db = DialogueDB(raw)
+                except (ValueError, struct.error):
+                    db = None
+                if db is not None and (db.mtime_ns, db.size) == (st.st_mtime_ns, st.st_size):
+                    _db = db
+            if _db is None:
+                source = read_source()
+                _db = DialogueDB(compile_db(source, open_font(), st.st_mtime_ns, st.st_size))
+        return _db
+
+
+def lines(ref):
+    """
+    Líneas del diálogo de un NPC: `ref` es un id de la base o, en mapas escritos a mano
+    (y los sintéticos del benchmark), directamente la lista de textos.
+    """
+    if not ref:
+        return []
+    if isinstance(ref, str):
+        return load_db().get(ref)
+    return [Line.from_text(text) for text in ref]
+
+
+def clear():
+    """Olvida la base cargada (se vuelve a leer al pedirla)"""
+    global _db
+    with _lock:
+        _db = None
+
+
+# ---------- LÍNEA DE COMANDOS ----------
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+
+    source = read_source()
+    errors = validate(source)
+    for e in errors:
+        print(f"[error] {e}")
+    if "--check" in argv:
+        return 1 if errors else 0
+
+    font = open_font()
+    st = os.stat(settings.DIALOGUE_DB)
+    raw = compile_db(source, font, st.st_mtime_ns, st.st_size)
+    os.makedirs(COMPILED_DIR, exist_ok=True)
+    with open(COMPILED_PATH, "wb") as f:
+        f.write(raw)
+
+    db = DialogueDB(raw)
+    wide = [(did, row) for did in db.index for line in db.get(did) for row in line.rows
+            if font.size(row)[0] > TEXT_WIDTH]
+    for did, row in wide:
+        print(f"[aviso] {did}: renglón más ancho que la caja (una sola palabra): {row}")
+    print(f"{len(db.index)} diálogos, {sum(n for _, n in db.index.values())} líneas "
+          f"({len(raw)} bytes) en {COMPILED_PATH}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,36 @@
 import pygame
 import math
 import os
+from core.assets import load_image  # Cache compartida de imágenes
+from core import memory  # Cuenta de memoria por dueño
 
 class Menu:
     def __init__(self, screen):
         self.screen = screen
         self.selected_index = 0
         self.font = pygame.font.SysFont("Comicsans", 40)
+        self.small_font = pygame.font.Font(None, 28)  # texto de la barra de carga
         self.time_levitation = 0
 
         self.YELLOW = (255, 255, 0)
         self.BLACK = (0, 0, 0)
 
-        # Cargar imágenes
-        base_path = os.path.join("assets", "images")
-        self.background = pygame.image.load(os.path.join(base_path, "Cielo_fondo.png")).convert()
-        self.background = pygame.transform.scale(self.background, self.screen.get_size())
+        # Cargar imágenes: el fondo ya, los personajes con load_art() (el BootLoader lo hace
+        # en segundo plano para que el primer frame del menú salga lo antes posible)
+        self.base_path = os.path.join("assets", "images")
+        self.background = load_image(os.path.join(self.base_path, "Cielo_fondo.png"), alpha=False,
+                                     size=self.screen.get_size())
+        memory.track(self.background, "ui:menu")
+        self.prota1 = None
+        self.npc1 = None
 
-        self.prota1 = pygame.image.load(os.path.join(base_path, "Lenard.png")).convert_alpha()
-        self.prota1 = pygame.transform.scale(self.prota1, (400, 400))  # ajustar tamaño
-
-        self.npc1 = pygame.image.load(os.path.join(base_path, "Pika.png")).convert_alpha()
-        self.npc1 = pygame.transform.scale(self.npc1, (300, 300))
+    def load_art(self):
+        """Carga las imágenes grandes de los personajes (mientras tanto no se dibujan)"""
+        npc1 = load_image(os.path.join(self.base_path, "Pika.png"), size=(300, 300))
+        self.prota1 = load_image(os.path.join(self.base_path, "Lenard.png"), size=(400, 400))  # ajustar tamaño
+        self.npc1 = npc1
+        memory.track(npc1, "ui:menu")
+        memory.track(self.prota1, "ui:menu")
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
@@ -42,9 +51,10 @@ class Menu:
         # Dibujar fondo
         self.screen.blit(self.background, (0, 0))
 
-        # Dibujar sprites en posiciones fijas 
-        self.screen.blit(self.prota1, (250, 50))
-        self.screen.blit(self.npc1, (500, 145))
+        # Dibujar sprites en posiciones fijas (si ya se cargaron)
+        if self.prota1 is not None and self.npc1 is not None:
+            self.screen.blit(self.prota1, (250, 50))
+            self.screen.blit(self.npc1, (500, 145))
 
         opciones_texto = ["Jugar", "Salir"]
 
@@ -62,3 +72,16 @@ class Menu:
             text_surf = self.font.render(texto, True, color)
             rect = text_surf.get_rect(center=(250 // 2, y))
             self.screen.blit(text_surf, rect)
+
+    def draw_progress(self, progress, label=None):
+        """Barra de carga (si se eligió "Jugar" antes de que termine el arranque)"""
+        bar = pygame.Rect(0, 0, 300, 16)
+        bar.midbottom = (self.screen.get_width() // 2, self.screen.get_height() - 40)
+        pygame.draw.rect(self.screen, self.BLACK, bar.inflate(6, 6))
+        fill = bar.copy()
+        fill.width = int(bar.width * max(0.0, min(1.0, progress)))
+        pygame.draw.rect(self.screen, self.YELLOW, fill)
+
+        text = "Cargando..." if not label else f"Cargando {label}..."
+        text_surf = self.small_font.render(text, True, self.BLACK)
+        self.screen.blit(text_surf, text_surf.get_rect(midbottom=(bar.centerx, bar.top - 8)))
@@ -0,0 +1,72 @@
+from collections import OrderedDict
+
+
+# Layout de texto para la caja de diálogo:
+# cada renglón se renderiza una sola vez y el efecto "máquina de escribir"
+# solo recorta cuánto de ese renglón ya renderizado se muestra.
+class TextLayout:
+    def __init__(self, font, color=(255, 255, 255), cache_size=128):
+        self.font = font
+        self.color = color
+        self.cache_size = cache_size
+        self._lines = OrderedDict()  # texto del renglón -> (superficie, anchos de cada prefijo)
+
+        # Contadores (útiles para ver que no se renderiza en cada frame)
+        self.renders = 0
+        self.hits = 0
+
+    def line(self, text):
+        """
+        Devuelve (superficie, anchos) de un renglón.
+        anchos[k] = ancho en píxeles de los primeros k caracteres.
+        """
+        entry = self._lines.get(text)
+        if entry is not None:
+            self._lines.move_to_end(text)
+            self.hits += 1
+            return entry
+
+        surface = self.font.render(text, True, self.color)
+        widths = [0] * (len(text) + 1)
+        for k in range(1, len(text) + 1):
+            widths[k] = self.font.size(text[:k])[0]
+        entry = (surface, widths)
+        self.renders += 1
+
+        self._lines[text] = entry
+        if len(self._lines) > self.cache_size:
+            self._lines.popitem(last=False)
+        return entry
+
+    def layout(self, text):
+        """
+        Arma el layout de una línea de diálogo completa (puede tener varios renglones con \\n).
+        Devuelve una lista de (índice del primer caracter en `text`, superficie, anchos).
+        """
+        return self.layout_rows(text.split("\n"))
+
+    def layout_rows(self, rows):
+        """Igual que layout() pero con los renglones ya cortados (base de diálogos compilada)"""
+        result = []
+        start = 0
+        for row in rows:
+            surface, widths = self.line(row)
+            result.append((start, surface, widths))
+            start += len(row) + 1  # +1 por el \n
+        return result
+
+    @staticmethod
+    def draw(screen, layout, x, y, line_spacing, cursor):
+        """
+        Dibuja los primeros `cursor` caracteres del layout.
+        Solo son blits de superficies ya renderizadas (un blit por renglón visible).
+        """
+        for start, surface, widths in layout:
+            if cursor < start:
+                break
+            visible = min(cursor - start, len(widths) - 1)
+            if visible == len(widths) - 1:
+                screen.blit(surface, (x, y))
+            elif visible > 0:
+                screen.blit(surface, (x, y), (0, 0, widths[visible], surface.get_height()))
+            y += line_spacing